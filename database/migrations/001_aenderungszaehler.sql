@@ -0,0 +1,24 @@
+-- Änderungszähler je Bereich
+-- Caches (z.B. der Fragen-Pool im Client) vergleichen die Version und laden nur nach Änderungen neu.
+-- Die Trigger zählen Änderungen aus allen Programmen (Client, quiz_manager.py, add_questions.py).
+CREATE TABLE IF NOT EXISTS Aenderungszaehler (
+    Bereich TEXT PRIMARY KEY,
+    Version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO Aenderungszaehler (Bereich, Version) VALUES ('Fragen', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_insert_version AFTER INSERT ON Frage
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragen';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_delete_version AFTER DELETE ON Frage
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragen';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_update_version AFTER UPDATE OF KategorieID, SchwierigkeitID ON Frage
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragen';
+END;
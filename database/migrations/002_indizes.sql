@@ -0,0 +1,26 @@
+-- Indizes für die Abfragen aus quiz_client.py / quiz_manager.py
+-- Fremdschlüsselspalten sind alle indiziert, damit ON DELETE CASCADE und
+-- FK-Prüfungen nicht die Kindtabellen komplett durchsuchen.
+
+-- Fragen-Pool und Filter nach Kategorie/Schwierigkeit (deckt auch FK KategorieID ab)
+CREATE INDEX IF NOT EXISTS idx_frage_kategorie_schwierigkeit ON Frage(KategorieID, SchwierigkeitID);
+CREATE INDEX IF NOT EXISTS idx_frage_schwierigkeit ON Frage(SchwierigkeitID);
+
+-- Antworten einer Frage (inkl. IstRichtig für die Auswahl richtig/falsch)
+CREATE INDEX IF NOT EXISTS idx_antwort_frage ON Antwort(FrageID, IstRichtig);
+
+-- Spielstände eines Spiels, Score-Update (SpielID, SpielerID) und Statistik je Spieler
+CREATE INDEX IF NOT EXISTS idx_teilnahme_spiel ON Teilnahme(SpielID, SpielerID, EndScore);
+CREATE INDEX IF NOT EXISTS idx_teilnahme_spieler ON Teilnahme(SpielerID, SpielID, EndScore);
+
+-- Antwortstatistik je Spieler (deckend) und Kaskaden/FK-Prüfungen
+CREATE INDEX IF NOT EXISTS idx_historie_spieler ON SpielHistorie(SpielerID, WarKorrekt);
+CREATE INDEX IF NOT EXISTS idx_historie_spiel ON SpielHistorie(SpielID);
+CREATE INDEX IF NOT EXISTS idx_historie_frage ON SpielHistorie(FrageID);
+CREATE INDEX IF NOT EXISTS idx_historie_antwort ON SpielHistorie(GegebeneAntwortID);
+
+CREATE INDEX IF NOT EXISTS idx_spiel_konfig ON Spiel(KonfigID);
+CREATE INDEX IF NOT EXISTS idx_spiel_schwierigkeit ON Spiel(GewaehlteSchwierigkeitID);
+
+-- Authentifizierung über X-Session-Key
+CREATE INDEX IF NOT EXISTS idx_spieler_sessionkey ON Spieler(SessionKey);
@@ -0,0 +1,72 @@
+-- Vorberechnete Spielerstatistik (eine Zeile pro Spieler)
+-- Wird von Triggern bei jeder Teilnahme, Antwort und jedem Spielende fortgeschrieben,
+-- "Meine Statistiken" liest dadurch nur noch eine Zeile per Primärschlüssel.
+CREATE TABLE IF NOT EXISTS SpielerStatistik (
+    SpielerID INTEGER PRIMARY KEY,
+    SpieleGespielt INTEGER NOT NULL DEFAULT 0,
+    DuelleGewonnen INTEGER NOT NULL DEFAULT 0,
+    AntwortenGesamt INTEGER NOT NULL DEFAULT 0,
+    AntwortenRichtig INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (SpielerID) REFERENCES Spieler(SpielerID) ON DELETE CASCADE
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_spieler_insert_statistik AFTER INSERT ON Spieler
+BEGIN
+    INSERT OR IGNORE INTO SpielerStatistik (SpielerID) VALUES (NEW.SpielerID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_teilnahme_insert_statistik AFTER INSERT ON Teilnahme
+BEGIN
+    INSERT OR IGNORE INTO SpielerStatistik (SpielerID) VALUES (NEW.SpielerID);
+    UPDATE SpielerStatistik SET SpieleGespielt = SpieleGespielt + 1 WHERE SpielerID = NEW.SpielerID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_teilnahme_delete_statistik AFTER DELETE ON Teilnahme
+BEGIN
+    UPDATE SpielerStatistik SET SpieleGespielt = SpieleGespielt - 1 WHERE SpielerID = OLD.SpielerID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_historie_insert_statistik AFTER INSERT ON SpielHistorie
+BEGIN
+    INSERT OR IGNORE INTO SpielerStatistik (SpielerID) VALUES (NEW.SpielerID);
+    UPDATE SpielerStatistik
+    SET AntwortenGesamt = AntwortenGesamt + 1,
+        AntwortenRichtig = AntwortenRichtig + (NEW.WarKorrekt = 1)
+    WHERE SpielerID = NEW.SpielerID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_historie_delete_statistik AFTER DELETE ON SpielHistorie
+BEGIN
+    UPDATE SpielerStatistik
+    SET AntwortenGesamt = AntwortenGesamt - 1,
+        AntwortenRichtig = AntwortenRichtig - (OLD.WarKorrekt = 1)
+    WHERE SpielerID = OLD.SpielerID;
+END;
+
+-- Duell gewonnen: beim Spielende alle Teilnehmer mit Höchstpunktzahl (bei >1 Teilnehmer)
+CREATE TRIGGER IF NOT EXISTS trg_spiel_ende_statistik AFTER UPDATE OF EndZeit ON Spiel
+WHEN OLD.EndZeit IS NULL AND NEW.EndZeit IS NOT NULL
+BEGIN
+    UPDATE SpielerStatistik
+    SET DuelleGewonnen = DuelleGewonnen + 1
+    WHERE SpielerID IN (
+        SELECT t.SpielerID FROM Teilnahme t
+        WHERE t.SpielID = NEW.SpielID
+        AND t.EndScore = (SELECT MAX(EndScore) FROM Teilnahme WHERE SpielID = NEW.SpielID)
+        AND (SELECT COUNT(*) FROM Teilnahme WHERE SpielID = NEW.SpielID) > 1
+    );
+END;
+
+-- Erstbefüllung aus dem Bestand (gleiche Logik wie QuizDatabase.rebuild_user_statistics)
+INSERT OR REPLACE INTO SpielerStatistik
+    (SpielerID, SpieleGespielt, DuelleGewonnen, AntwortenGesamt, AntwortenRichtig)
+SELECT
+    s.SpielerID,
+    (SELECT COUNT(DISTINCT t.SpielID) FROM Teilnahme t WHERE t.SpielerID = s.SpielerID),
+    (SELECT COUNT(*) FROM Teilnahme t1 JOIN Spiel sp ON sp.SpielID = t1.SpielID
+     WHERE t1.SpielerID = s.SpielerID AND sp.EndZeit IS NOT NULL
+     AND t1.EndScore = (SELECT MAX(t2.EndScore) FROM Teilnahme t2 WHERE t2.SpielID = t1.SpielID)
+     AND (SELECT COUNT(*) FROM Teilnahme t3 WHERE t3.SpielID = t1.SpielID) > 1),
+    (SELECT COUNT(*) FROM SpielHistorie h WHERE h.SpielerID = s.SpielerID),
+    (SELECT COUNT(*) FROM SpielHistorie h WHERE h.SpielerID = s.SpielerID AND h.WarKorrekt = 1)
+FROM Spieler s;
@@ -0,0 +1,6 @@
+-- Inhalts-Hash je Frage für den Import (add_questions.py)
+-- Bereits vorhandene Fragen werden beim erneuten Import übersprungen.
+-- Fragen ohne Hash (z.B. aus quiz_manager.py) ergänzt der Importer vor jedem Lauf.
+ALTER TABLE Frage ADD COLUMN InhaltHash TEXT;
+
+CREATE INDEX IF NOT EXISTS idx_frage_inhalthash ON Frage(InhaltHash);
@@ -0,0 +1,4 @@
+-- Seitenweise Fragenliste im Manager (Keyset über FrageID)
+-- Filter nur nach Kategorie: Index liefert die Zeilen bereits nach FrageID sortiert,
+-- ohne den zusammengesetzten Index (KategorieID, SchwierigkeitID) nachsortieren zu müssen.
+CREATE INDEX IF NOT EXISTS idx_frage_kategorie ON Frage(KategorieID);
@@ -0,0 +1,55 @@
+-- Volltextsuche über Fragen und Antworten (FTS5)
+-- Eine Zeile pro Frage, rowid = FrageID. Die Spalte Antworten enthält alle
+-- Antworttexte der Frage und wird von den Antwort-Triggern neu zusammengesetzt.
+-- Trigger-Namen enden auf _suche: add_questions.py setzt sie beim Massenimport
+-- aus und indiziert die neuen Fragen danach in einem Schritt.
+CREATE VIRTUAL TABLE IF NOT EXISTS FrageSuche USING fts5(
+    FrageText,
+    Antworten,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_insert_suche AFTER INSERT ON Frage
+BEGIN
+    INSERT INTO FrageSuche (rowid, FrageText, Antworten) VALUES (NEW.FrageID, NEW.FrageText, '');
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_update_suche AFTER UPDATE OF FrageText ON Frage
+BEGIN
+    UPDATE FrageSuche SET FrageText = NEW.FrageText WHERE rowid = NEW.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_delete_suche AFTER DELETE ON Frage
+BEGIN
+    DELETE FROM FrageSuche WHERE rowid = OLD.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_insert_suche AFTER INSERT ON Antwort
+BEGIN
+    UPDATE FrageSuche
+    SET Antworten = (SELECT group_concat(AntwortText, ' ') FROM Antwort WHERE FrageID = NEW.FrageID)
+    WHERE rowid = NEW.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_update_suche AFTER UPDATE OF AntwortText, FrageID ON Antwort
+BEGIN
+    UPDATE FrageSuche
+    SET Antworten = (SELECT group_concat(AntwortText, ' ') FROM Antwort WHERE FrageID = OLD.FrageID)
+    WHERE rowid = OLD.FrageID;
+    UPDATE FrageSuche
+    SET Antworten = (SELECT group_concat(AntwortText, ' ') FROM Antwort WHERE FrageID = NEW.FrageID)
+    WHERE rowid = NEW.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_delete_suche AFTER DELETE ON Antwort
+BEGIN
+    UPDATE FrageSuche
+    SET Antworten = (SELECT group_concat(AntwortText, ' ') FROM Antwort WHERE FrageID = OLD.FrageID)
+    WHERE rowid = OLD.FrageID;
+END;
+
+-- Bestehende Fragen übernehmen
+INSERT INTO FrageSuche (rowid, FrageText, Antworten)
+SELECT f.FrageID, f.FrageText,
+       COALESCE((SELECT group_concat(a.AntwortText, ' ') FROM Antwort a WHERE a.FrageID = f.FrageID), '')
+FROM Frage f;
@@ -0,0 +1,48 @@
+-- Änderungszähler für die Nachschlagetabellen (Kategorie, Schwierigkeitsgrad, Konfiguration)
+-- Der Metadaten-Cache im Client lädt sie nur neu, wenn sich diese Version ändert.
+INSERT OR IGNORE INTO Aenderungszaehler (Bereich, Version) VALUES ('Metadaten', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_kategorie_insert_version AFTER INSERT ON Kategorie
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_kategorie_update_version AFTER UPDATE ON Kategorie
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_kategorie_delete_version AFTER DELETE ON Kategorie
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_schwierigkeit_insert_version AFTER INSERT ON Schwierigkeitsgrad
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_schwierigkeit_update_version AFTER UPDATE ON Schwierigkeitsgrad
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_schwierigkeit_delete_version AFTER DELETE ON Schwierigkeitsgrad
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_konfiguration_insert_version AFTER INSERT ON Konfiguration
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_konfiguration_update_version AFTER UPDATE ON Konfiguration
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_konfiguration_delete_version AFTER DELETE ON Konfiguration
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Metadaten';
+END;
@@ -0,0 +1,3 @@
+-- Gegnersuche nach Namensanfang (Groß-/Kleinschreibung egal) und seitenweises Blättern
+-- Der UNIQUE-Index auf Username ist BINARY und taugt daher nicht für die NOCASE-Sortierung.
+CREATE INDEX IF NOT EXISTS idx_spieler_username_nocase ON Spieler(Username COLLATE NOCASE);
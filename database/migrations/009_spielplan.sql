@@ -0,0 +1,18 @@
+-- Spielplan: Fragen und Antwortauswahl eines Spiels, festgelegt bei create_game
+-- Eine Zeile pro angezeigter Antwort. Position ist die 0-basierte Nummer der
+-- Frage im Spiel (Runde = Position / FragenProRunde + 1), Reihenfolge die
+-- Anzeigereihenfolge der Antworten. Alle Spieler eines Duells bekommen denselben Plan.
+CREATE TABLE IF NOT EXISTS SpielPlan (
+    SpielID INTEGER NOT NULL,
+    Position INTEGER NOT NULL,
+    Reihenfolge INTEGER NOT NULL,
+    FrageID INTEGER NOT NULL,
+    AntwortID INTEGER NOT NULL,
+    PRIMARY KEY (SpielID, Position, Reihenfolge),
+    FOREIGN KEY (SpielID) REFERENCES Spiel(SpielID) ON DELETE CASCADE,
+    FOREIGN KEY (FrageID) REFERENCES Frage(FrageID) ON DELETE CASCADE,
+    FOREIGN KEY (AntwortID) REFERENCES Antwort(AntwortID) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_spielplan_frage ON SpielPlan(FrageID);
+CREATE INDEX IF NOT EXISTS idx_spielplan_antwort ON SpielPlan(AntwortID);
@@ -0,0 +1,89 @@
+-- Ranglisten (vorberechnet, eine Zeile pro Spieler und Kategorie/Schwierigkeit)
+-- KategorieID bzw. SchwierigkeitID 0 steht für "alle": jede Antwort zählt in
+-- (0, 0), (Kategorie, 0), (0, Schwierigkeit) und (Kategorie, Schwierigkeit).
+-- Punkte wie im Spiel: 10 pro richtiger Antwort.
+--
+-- Kein Trigger pro Antwort (vier Upserts je Antwort kosten ein Vielfaches des
+-- Einfügens selbst): leaderboard.refresh() verdichtet alle Antworten oberhalb
+-- von Verarbeitungsstand.HistorieID mengenbasiert, das Antwort-Journal ruft
+-- es nach jedem Bündel in derselben Transaktion auf.
+CREATE TABLE IF NOT EXISTS Rangliste (
+    KategorieID INTEGER NOT NULL,
+    SchwierigkeitID INTEGER NOT NULL,
+    SpielerID INTEGER NOT NULL,
+    Punkte INTEGER NOT NULL DEFAULT 0,
+    AntwortenGesamt INTEGER NOT NULL DEFAULT 0,
+    AntwortenRichtig INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (KategorieID, SchwierigkeitID, SpielerID),
+    FOREIGN KEY (SpielerID) REFERENCES Spieler(SpielerID) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+-- Top-N nach Punkten bzw. Trefferquote und Rang eines Spielers (Zählen über den Index)
+CREATE INDEX IF NOT EXISTS idx_rangliste_punkte
+    ON Rangliste(KategorieID, SchwierigkeitID, Punkte DESC);
+CREATE INDEX IF NOT EXISTS idx_rangliste_quote
+    ON Rangliste(KategorieID, SchwierigkeitID, (AntwortenRichtig * 1.0 / AntwortenGesamt) DESC);
+CREATE INDEX IF NOT EXISTS idx_rangliste_spieler ON Rangliste(SpielerID);
+
+-- Tageswerte je Spieler für Ranglisten über die letzten N Tage (Tag in UTC)
+CREATE TABLE IF NOT EXISTS RanglisteTag (
+    Tag TEXT NOT NULL,
+    SpielerID INTEGER NOT NULL,
+    Punkte INTEGER NOT NULL DEFAULT 0,
+    AntwortenGesamt INTEGER NOT NULL DEFAULT 0,
+    AntwortenRichtig INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (Tag, SpielerID),
+    FOREIGN KEY (SpielerID) REFERENCES Spieler(SpielerID) ON DELETE CASCADE
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_ranglistetag_spieler ON RanglisteTag(SpielerID);
+
+-- Gewonnene Duelle (nur gesamt, Spiel kennt keine Kategorie)
+CREATE INDEX IF NOT EXISTS idx_spielerstatistik_duelle ON SpielerStatistik(DuelleGewonnen DESC);
+
+-- Bis zu welcher HistorieID eine Auswertung schon verdichtet ist (eine Zeile je Bereich)
+CREATE TABLE IF NOT EXISTS Verarbeitungsstand (
+    Bereich TEXT PRIMARY KEY,
+    HistorieID INTEGER NOT NULL DEFAULT 0
+);
+
+-- Gelöschte Antworten (z.B. mit ihrem Spiel) wieder abziehen, sofern schon verdichtet
+CREATE TRIGGER IF NOT EXISTS trg_historie_delete_rangliste AFTER DELETE ON SpielHistorie
+WHEN OLD.HistorieID <= (SELECT HistorieID FROM Verarbeitungsstand WHERE Bereich = 'Rangliste')
+BEGIN
+    UPDATE Rangliste
+    SET Punkte = Punkte - 10 * (OLD.WarKorrekt = 1),
+        AntwortenGesamt = AntwortenGesamt - 1,
+        AntwortenRichtig = AntwortenRichtig - (OLD.WarKorrekt = 1)
+    WHERE SpielerID = OLD.SpielerID
+    AND KategorieID IN (0, (SELECT KategorieID FROM Frage WHERE FrageID = OLD.FrageID))
+    AND SchwierigkeitID IN (0, (SELECT SchwierigkeitID FROM Frage WHERE FrageID = OLD.FrageID));
+
+    UPDATE RanglisteTag
+    SET Punkte = Punkte - 10 * (OLD.WarKorrekt = 1),
+        AntwortenGesamt = AntwortenGesamt - 1,
+        AntwortenRichtig = AntwortenRichtig - (OLD.WarKorrekt = 1)
+    WHERE Tag = date(OLD.Zeitstempel) AND SpielerID = OLD.SpielerID;
+END;
+
+-- Erstbefüllung aus dem Bestand (gleiche Logik wie leaderboard.refresh)
+INSERT INTO Rangliste (KategorieID, SchwierigkeitID, SpielerID, Punkte, AntwortenGesamt, AntwortenRichtig)
+SELECT
+    CASE WHEN k.Alle THEN 0 ELSE f.KategorieID END AS Kat,
+    CASE WHEN s.Alle THEN 0 ELSE f.SchwierigkeitID END AS Schw,
+    h.SpielerID, 10 * SUM(h.WarKorrekt = 1), COUNT(*), SUM(h.WarKorrekt = 1)
+FROM SpielHistorie h
+JOIN Frage f ON f.FrageID = h.FrageID
+CROSS JOIN (SELECT 0 AS Alle UNION ALL SELECT 1) k
+CROSS JOIN (SELECT 0 AS Alle UNION ALL SELECT 1) s
+GROUP BY Kat, Schw, h.SpielerID
+ON CONFLICT DO NOTHING;
+
+INSERT INTO RanglisteTag (Tag, SpielerID, Punkte, AntwortenGesamt, AntwortenRichtig)
+SELECT date(Zeitstempel) AS Tag, SpielerID, 10 * SUM(WarKorrekt = 1), COUNT(*), SUM(WarKorrekt = 1)
+FROM SpielHistorie
+GROUP BY Tag, SpielerID
+ON CONFLICT DO NOTHING;
+
+INSERT OR IGNORE INTO Verarbeitungsstand (Bereich, HistorieID)
+SELECT 'Rangliste', COALESCE(MAX(HistorieID), 0) FROM SpielHistorie;
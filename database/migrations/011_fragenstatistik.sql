@@ -0,0 +1,53 @@
+-- Auswertung je Frage und je Antwortmöglichkeit (Kalibrierung der Schwierigkeit)
+-- Wird von question_stats.refresh() ab Verarbeitungsstand 'Fragen' fortgeschrieben,
+-- nur neue Zeilen aus SpielHistorie werden gelesen.
+CREATE TABLE IF NOT EXISTS FrageStatistik (
+    FrageID INTEGER PRIMARY KEY,
+    AntwortenGesamt INTEGER NOT NULL DEFAULT 0,  -- wie oft gestellt
+    AntwortenRichtig INTEGER NOT NULL DEFAULT 0,
+    OhneAntwort INTEGER NOT NULL DEFAULT 0,      -- Zeit abgelaufen
+    FOREIGN KEY (FrageID) REFERENCES Frage(FrageID) ON DELETE CASCADE
+);
+
+-- Wie oft jede Antwort gewählt wurde (Ablenker-Häufigkeit)
+CREATE TABLE IF NOT EXISTS AntwortStatistik (
+    AntwortID INTEGER PRIMARY KEY,
+    FrageID INTEGER NOT NULL,
+    Gewaehlt INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (AntwortID) REFERENCES Antwort(AntwortID) ON DELETE CASCADE,
+    FOREIGN KEY (FrageID) REFERENCES Frage(FrageID) ON DELETE CASCADE
+);
+
+CREATE INDEX IF NOT EXISTS idx_antwortstatistik_frage ON AntwortStatistik(FrageID);
+
+-- Gelöschte Antworten wieder abziehen, sofern schon verdichtet
+CREATE TRIGGER IF NOT EXISTS trg_historie_delete_fragenstatistik AFTER DELETE ON SpielHistorie
+WHEN OLD.HistorieID <= (SELECT HistorieID FROM Verarbeitungsstand WHERE Bereich = 'Fragen')
+BEGIN
+    UPDATE FrageStatistik
+    SET AntwortenGesamt = AntwortenGesamt - 1,
+        AntwortenRichtig = AntwortenRichtig - (OLD.WarKorrekt = 1),
+        OhneAntwort = OhneAntwort - (OLD.GegebeneAntwortID IS NULL)
+    WHERE FrageID = OLD.FrageID;
+
+    UPDATE AntwortStatistik
+    SET Gewaehlt = Gewaehlt - 1
+    WHERE AntwortID = OLD.GegebeneAntwortID;
+END;
+
+-- Erstbefüllung aus dem Bestand (gleiche Logik wie question_stats.refresh)
+INSERT INTO FrageStatistik (FrageID, AntwortenGesamt, AntwortenRichtig, OhneAntwort)
+SELECT FrageID, COUNT(*), SUM(WarKorrekt = 1), SUM(GegebeneAntwortID IS NULL)
+FROM SpielHistorie
+GROUP BY FrageID
+ON CONFLICT DO NOTHING;
+
+INSERT INTO AntwortStatistik (AntwortID, FrageID, Gewaehlt)
+SELECT GegebeneAntwortID, MIN(FrageID), COUNT(*)
+FROM SpielHistorie
+WHERE GegebeneAntwortID IS NOT NULL
+GROUP BY GegebeneAntwortID
+ON CONFLICT DO NOTHING;
+
+INSERT OR IGNORE INTO Verarbeitungsstand (Bereich, HistorieID)
+SELECT 'Fragen', COALESCE(MAX(HistorieID), 0) FROM SpielHistorie;
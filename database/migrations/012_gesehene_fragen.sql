@@ -0,0 +1,12 @@
+-- Gesehene und zuletzt falsch beantwortete Fragen je Spieler (adaptive Auswahl)
+-- Zwei zlib-komprimierte Bitmaps über die FrageID, siehe src/player_history.py.
+-- Der Stand 'Gesehen' beginnt bei 0: die erste Verdichtung liest die ganze Historie.
+-- Gelöschte Antworten bleiben "gesehen" (Bits lassen sich nicht abziehen).
+CREATE TABLE IF NOT EXISTS SpielerFragen (
+    SpielerID INTEGER PRIMARY KEY,
+    Gesehen BLOB NOT NULL,
+    Falsch BLOB NOT NULL,
+    FOREIGN KEY (SpielerID) REFERENCES Spieler(SpielerID) ON DELETE CASCADE
+);
+
+INSERT OR IGNORE INTO Verarbeitungsstand (Bereich, HistorieID) VALUES ('Gesehen', 0);
@@ -0,0 +1,3 @@
+-- Ablauf von Sessions (src/session_store.py): abgelaufene Keys werden gebündelt
+-- über SessionTime gelöscht. Der Teilindex enthält nur angemeldete Spieler.
+CREATE INDEX IF NOT EXISTS idx_spieler_sessiontime ON Spieler(SessionTime) WHERE SessionKey IS NOT NULL;
@@ -0,0 +1,35 @@
+-- Änderungszähler für den gesamten Fragenbestand samt Texten und Antworten
+-- 'Fragen' zählt nur, was den Fragen-Pool betrifft (IDs, Kategorie, Schwierigkeit).
+-- Der Snapshot in src/question_bank.py enthält auch Fragetexte und Antworten
+-- und wird bei jeder Änderung an ihnen neu aufgebaut.
+INSERT OR IGNORE INTO Aenderungszaehler (Bereich, Version) VALUES ('Fragenbank', 0);
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_insert_bank AFTER INSERT ON Frage
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragenbank';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_update_bank AFTER UPDATE OF FrageText ON Frage
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragenbank';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_delete_bank AFTER DELETE ON Frage
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragenbank';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_insert_bank AFTER INSERT ON Antwort
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragenbank';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_update_bank AFTER UPDATE ON Antwort
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragenbank';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_delete_bank AFTER DELETE ON Antwort
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragenbank';
+END;
@@ -0,0 +1,81 @@
+-- Spielbarkeit je Frage: Anzahl richtiger und falscher Antworten
+-- Eine Frage mit m Antwortmöglichkeiten braucht mindestens 1 richtige und m - 1
+-- falsche Antworten. (Richtige > 0) * Falsche ist die Zahl nutzbarer falscher
+-- Antworten (0 ohne richtige), spielbar heißt also (Richtige > 0) * Falsche >= m - 1.
+-- Der Fragen-Pool (src/question_pool.py) zieht nur aus spielbaren Fragen.
+CREATE TABLE IF NOT EXISTS FrageSpielbarkeit (
+    FrageID INTEGER PRIMARY KEY,
+    KategorieID INTEGER NOT NULL,
+    SchwierigkeitID INTEGER NOT NULL,
+    Richtige INTEGER NOT NULL DEFAULT 0,
+    Falsche INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (FrageID) REFERENCES Frage(FrageID) ON DELETE CASCADE
+);
+
+-- Auswahl (>= m - 1) und Bericht über nicht spielbare Fragen (< m - 1) als Bereich,
+-- Kategorie/Schwierigkeit im Index, damit der Pool die Tabelle nicht lesen muss
+CREATE INDEX IF NOT EXISTS idx_fragespielbarkeit_falsche
+ON FrageSpielbarkeit((Richtige > 0) * Falsche, KategorieID, SchwierigkeitID);
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_insert_spielbarkeit AFTER INSERT ON Frage
+BEGIN
+    INSERT OR REPLACE INTO FrageSpielbarkeit (FrageID, KategorieID, SchwierigkeitID, Richtige, Falsche)
+    VALUES (NEW.FrageID, NEW.KategorieID, NEW.SchwierigkeitID,
+            (SELECT COUNT(*) FROM Antwort WHERE FrageID = NEW.FrageID AND IstRichtig = 1),
+            (SELECT COUNT(*) FROM Antwort WHERE FrageID = NEW.FrageID AND IstRichtig = 0));
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_frage_update_spielbarkeit AFTER UPDATE OF KategorieID, SchwierigkeitID ON Frage
+BEGIN
+    UPDATE FrageSpielbarkeit SET KategorieID = NEW.KategorieID, SchwierigkeitID = NEW.SchwierigkeitID
+    WHERE FrageID = NEW.FrageID;
+END;
+
+-- Auch ohne PRAGMA foreign_keys (z.B. quiz_manager.py) entfernen
+CREATE TRIGGER IF NOT EXISTS trg_frage_delete_spielbarkeit AFTER DELETE ON Frage
+BEGIN
+    DELETE FROM FrageSpielbarkeit WHERE FrageID = OLD.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_insert_spielbarkeit AFTER INSERT ON Antwort
+BEGIN
+    UPDATE FrageSpielbarkeit
+    SET Richtige = Richtige + (NEW.IstRichtig = 1), Falsche = Falsche + (NEW.IstRichtig = 0)
+    WHERE FrageID = NEW.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_update_spielbarkeit AFTER UPDATE OF IstRichtig, FrageID ON Antwort
+BEGIN
+    UPDATE FrageSpielbarkeit
+    SET Richtige = Richtige - (OLD.IstRichtig = 1), Falsche = Falsche - (OLD.IstRichtig = 0)
+    WHERE FrageID = OLD.FrageID;
+    UPDATE FrageSpielbarkeit
+    SET Richtige = Richtige + (NEW.IstRichtig = 1), Falsche = Falsche + (NEW.IstRichtig = 0)
+    WHERE FrageID = NEW.FrageID;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_antwort_delete_spielbarkeit AFTER DELETE ON Antwort
+BEGIN
+    UPDATE FrageSpielbarkeit
+    SET Richtige = Richtige - (OLD.IstRichtig = 1), Falsche = Falsche - (OLD.IstRichtig = 0)
+    WHERE FrageID = OLD.FrageID;
+END;
+
+-- Ändert sich, ob/ab wie vielen Antwortmöglichkeiten eine Frage spielbar ist,
+-- lädt der Fragen-Pool neu (wie bei neuen oder gelöschten Fragen)
+CREATE TRIGGER IF NOT EXISTS trg_spielbarkeit_update_version AFTER UPDATE OF Richtige, Falsche ON FrageSpielbarkeit
+WHEN (OLD.Richtige > 0) * OLD.Falsche <> (NEW.Richtige > 0) * NEW.Falsche
+BEGIN
+    UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragen';
+END;
+
+-- Erstbefüllung aus dem Bestand
+INSERT INTO FrageSpielbarkeit (FrageID, KategorieID, SchwierigkeitID, Richtige, Falsche)
+SELECT f.FrageID, f.KategorieID, f.SchwierigkeitID,
+       COALESCE(SUM(a.IstRichtig = 1), 0), COALESCE(SUM(a.IstRichtig = 0), 0)
+FROM Frage f
+LEFT JOIN Antwort a ON a.FrageID = f.FrageID
+GROUP BY f.FrageID
+ON CONFLICT DO NOTHING;
+
+UPDATE Aenderungszaehler SET Version = Version + 1 WHERE Bereich = 'Fragen';
@@ -0,0 +1,43 @@
+-- Massenimport ohne Trigger-DDL
+-- add_questions.py trägt während des Imports eine Zeile in Massenimport ein
+-- (in derselben Transaktion, andere Verbindungen sehen sie nie) und füllt
+-- Suchindex und FrageSpielbarkeit danach in einem Schritt. Die Insert-Trigger
+-- prüfen die Zeile per WHEN, statt vom Import gelöscht und neu angelegt zu werden.
+CREATE TABLE IF NOT EXISTS Massenimport (
+    ID INTEGER PRIMARY KEY CHECK (ID = 1)
+);
+
+DROP TRIGGER IF EXISTS trg_frage_insert_suche;
+CREATE TRIGGER trg_frage_insert_suche AFTER INSERT ON Frage
+WHEN NOT EXISTS (SELECT 1 FROM Massenimport)
+BEGIN
+    INSERT INTO FrageSuche (rowid, FrageText, Antworten) VALUES (NEW.FrageID, NEW.FrageText, '');
+END;
+
+DROP TRIGGER IF EXISTS trg_antwort_insert_suche;
+CREATE TRIGGER trg_antwort_insert_suche AFTER INSERT ON Antwort
+WHEN NOT EXISTS (SELECT 1 FROM Massenimport)
+BEGIN
+    UPDATE FrageSuche
+    SET Antworten = (SELECT group_concat(AntwortText, ' ') FROM Antwort WHERE FrageID = NEW.FrageID)
+    WHERE rowid = NEW.FrageID;
+END;
+
+DROP TRIGGER IF EXISTS trg_frage_insert_spielbarkeit;
+CREATE TRIGGER trg_frage_insert_spielbarkeit AFTER INSERT ON Frage
+WHEN NOT EXISTS (SELECT 1 FROM Massenimport)
+BEGIN
+    INSERT OR REPLACE INTO FrageSpielbarkeit (FrageID, KategorieID, SchwierigkeitID, Richtige, Falsche)
+    VALUES (NEW.FrageID, NEW.KategorieID, NEW.SchwierigkeitID,
+            (SELECT COUNT(*) FROM Antwort WHERE FrageID = NEW.FrageID AND IstRichtig = 1),
+            (SELECT COUNT(*) FROM Antwort WHERE FrageID = NEW.FrageID AND IstRichtig = 0));
+END;
+
+DROP TRIGGER IF EXISTS trg_antwort_insert_spielbarkeit;
+CREATE TRIGGER trg_antwort_insert_spielbarkeit AFTER INSERT ON Antwort
+WHEN NOT EXISTS (SELECT 1 FROM Massenimport)
+BEGIN
+    UPDATE FrageSpielbarkeit
+    SET Richtige = Richtige + (NEW.IstRichtig = 1), Falsche = Falsche + (NEW.IstRichtig = 0)
+    WHERE FrageID = NEW.FrageID;
+END;
@@ -0,0 +1,18 @@
+-- Verarbeitungsstand 'Fragen' (question_stats) hieß wie der Bereich des
+-- Änderungszählers für den Fragen-Pool; er heißt jetzt nach seiner Tabelle.
+UPDATE Verarbeitungsstand SET Bereich = 'FrageStatistik' WHERE Bereich = 'Fragen';
+
+DROP TRIGGER IF EXISTS trg_historie_delete_fragenstatistik;
+CREATE TRIGGER trg_historie_delete_fragenstatistik AFTER DELETE ON SpielHistorie
+WHEN OLD.HistorieID <= (SELECT HistorieID FROM Verarbeitungsstand WHERE Bereich = 'FrageStatistik')
+BEGIN
+    UPDATE FrageStatistik
+    SET AntwortenGesamt = AntwortenGesamt - 1,
+        AntwortenRichtig = AntwortenRichtig - (OLD.WarKorrekt = 1),
+        OhneAntwort = OhneAntwort - (OLD.GegebeneAntwortID IS NULL)
+    WHERE FrageID = OLD.FrageID;
+
+    UPDATE AntwortStatistik
+    SET Gewaehlt = Gewaehlt - 1
+    WHERE AntwortID = OLD.GegebeneAntwortID;
+END;
@@ -0,0 +1,6 @@
+-- Stand 'Gesehen' zurücksetzen, solange es noch keine Bitmaps gibt
+-- Die Bitmaps gesehener Fragen baut nur Python: QuizDatabase ruft beim Start
+-- player_history.seed() auf, das sie bei leerer SpielerFragen einmal aus der
+-- ganzen SpielHistorie aufbaut (statt beim ersten Spiel unter der Schreibsperre).
+UPDATE Verarbeitungsstand SET HistorieID = 0
+WHERE Bereich = 'Gesehen' AND NOT EXISTS (SELECT 1 FROM SpielerFragen);
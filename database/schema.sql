@@ -12,6 +12,21 @@ DROP TABLE IF EXISTS Kategorie;
 DROP TABLE IF EXISTS Schwierigkeitsgrad;
 DROP TABLE IF EXISTS Konfiguration;
 
+-- Tabellen aus database/migrations (werden beim ersten Start neu angelegt)
+DROP TABLE IF EXISTS SpielerStatistik;
+DROP TABLE IF EXISTS Aenderungszaehler;
+DROP TABLE IF EXISTS FrageSuche;
+DROP TABLE IF EXISTS SpielPlan;
+DROP TABLE IF EXISTS Rangliste;
+DROP TABLE IF EXISTS RanglisteTag;
+DROP TABLE IF EXISTS Verarbeitungsstand;
+DROP TABLE IF EXISTS FrageStatistik;
+DROP TABLE IF EXISTS AntwortStatistik;
+DROP TABLE IF EXISTS SpielerFragen;
+DROP TABLE IF EXISTS FrageSpielbarkeit;
+DROP TABLE IF EXISTS Massenimport;
+PRAGMA user_version = 0;
+
 PRAGMA foreign_keys = ON;
 
 -- 1. Konfigurationstabelle (Für flexible Spielregeln)
@@ -1,12 +1,35 @@
-import sqlite3
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fragen-Import für die Quiz App
+Liest Fragen aus JSON-, JSONL- oder CSV-Dateien (oder der eingebauten Liste unten)
+und fügt sie gebündelt in einer Transaktion ein. Bereits vorhandene Fragen
+werden über einen Inhalts-Hash erkannt und übersprungen, ähnliche Fragen
+(gleiche Wörter) meldet --aehnliche über den Volltextindex. Danach wird die
+Bank-Datei (bank_file.py) neu geschrieben, falls sich der Bestand geändert hat.
+
+Aufruf: python add_questions.py [DATEI ...] [--db PFAD] [--batch N] [--aehnliche]
+"""
+
+import argparse
+import csv
+import hashlib
+import json
 import os
+import sqlite3
+import time
 
-# Verbindung zur Datenbank (Pfad relativ zum Skript)
+import bank_file
+from db_pool import ConnectionPool, apply_migrations
+from question_bank import bank_key, export_bank
+from question_search import find_similar
+
+# Standardpfad zur Datenbank (relativ zum Skript)
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'database'))
-os.makedirs(base_dir, exist_ok=True)
-db_path = os.path.join(base_dir, 'quiz_app.db')
-conn = sqlite3.connect(db_path)
-cursor = conn.cursor()
+DEFAULT_DB_PATH = os.path.join(base_dir, 'quiz_app.db')
+
+# Eine Frage braucht mindestens 1 richtige und 3 falsche Antworten (siehe get_random_question)
+MIN_WRONG_ANSWERS = 3
 
 # Deine Fragen (Format: Frage, Kategorie, Schwierigkeit, [(Antwort, IstRichtig), ...])
 meine_fragen = [
@@ -290,45 +313,311 @@ meine_fragen = [
      [("598", True), ("500", False), ("600", False), ("550", False)]),
 ]
 
-    
-    
 
+def content_hash(question_text, category):
+    """Hash über normalisierten Fragetext + Kategorie (Groß-/Kleinschreibung, Leerzeichen egal)"""
+    normalized = ' '.join(question_text.lower().split()) + '\x1f' + ' '.join(category.lower().split())
+    return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
 
-# Fragen in Datenbank einfügen
-# Ensure categories from `meine_fragen` exist in Kategorie table
-categories = set(k for _, k, _, _ in meine_fragen)
-for cat in categories:
-    cursor.execute("INSERT OR IGNORE INTO Kategorie (Bezeichnung) VALUES (?)", (cat,))
-conn.commit()
 
-# Hole Kategorie-IDs
-cursor.execute("SELECT KategorieID, Bezeichnung FROM Kategorie")
-kat_map = {name: id for id, name in cursor.fetchall()}
+# --- Eingabeformate ---
 
-# Hole Schwierigkeits-IDs  
-cursor.execute("SELECT SchwierigkeitID, Bezeichnung FROM Schwierigkeitsgrad")
-diff_map = {name: id for id, name in cursor.fetchall()}
+def parse_answers(raw_answers):
+    """Antworten als [(Text, IstRichtig)] aus Listen- oder Objektform"""
+    answers = []
+    for answer in raw_answers or []:
+        if isinstance(answer, dict):
+            answers.append((str(answer.get('text', '')).strip(), bool(answer.get('richtig'))))
+        else:
+            answers.append((str(answer[0]).strip(), bool(answer[1])))
+    return answers
 
-for frage_text, kategorie, schwierigkeit, antworten in meine_fragen:
-    kat_id = kat_map[kategorie]
-    diff_id = diff_map[schwierigkeit]
-    
-    # Frage einfügen
-    cursor.execute(
-        "INSERT INTO Frage (FrageText, KategorieID, SchwierigkeitID) VALUES (?, ?, ?)",
-        (frage_text, kat_id, diff_id)
+
+def question_from_record(record):
+    """Frage-Tupel aus einem JSON-Objekt
+
+    Format: {"frage": ..., "kategorie": ..., "schwierigkeit": ...,
+             "antworten": [{"text": ..., "richtig": true}, ...]}
+    """
+    return (
+        str(record.get('frage', '')).strip(),
+        str(record.get('kategorie', '')).strip(),
+        str(record.get('schwierigkeit', '')).strip(),
+        parse_answers(record.get('antworten'))
     )
-    frage_id = cursor.lastrowid
-    
-    # Antworten einfügen
-    for antwort_text, ist_richtig in antworten:
-        cursor.execute(
-            "INSERT INTO Antwort (AntwortText, IstRichtig, FrageID) VALUES (?, ?, ?)",
-            (antwort_text, ist_richtig, frage_id)
-        )
-    
-    print(f"✓ Frage hinzugefügt: {frage_text[:50]}...")
 
-conn.commit()
-conn.close()
-print(f"\n✅ {len(meine_fragen)} Fragen erfolgreich hinzugefügt!")
\ No newline at end of file
+
+def iter_json_array(path, chunk_size=1 << 16):
+    """Liest ein JSON-Array Element für Element, ohne die ganze Datei zu laden"""
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{path}: JSON-Array erwartet")
+        pos = 1
+        eof = False
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buffer) and buffer[pos] == ']':
+                return
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                continue
+            yield record
+            pos = end
+            # Verarbeiteten Teil des Puffers verwerfen
+            if pos > chunk_size:
+                buffer = buffer[pos:]
+                pos = 0
+
+
+def iter_jsonl(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_csv(path):
+    """CSV mit Spalten frage, kategorie, schwierigkeit, richtig, falsch
+
+    Mehrere Antworten in richtig/falsch werden mit | getrennt.
+    """
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=',;\t')
+        for row in csv.DictReader(f, dialect=dialect):
+            answers = [(a.strip(), True) for a in (row.get('richtig') or '').split('|') if a.strip()]
+            answers += [(a.strip(), False) for a in (row.get('falsch') or '').split('|') if a.strip()]
+            yield (
+                (row.get('frage') or '').strip(),
+                (row.get('kategorie') or '').strip(),
+                (row.get('schwierigkeit') or '').strip(),
+                answers
+            )
+
+
+def iter_questions(paths):
+    """Liefert Frage-Tupel aus allen Dateien (Format nach Dateiendung)"""
+    for path in paths:
+        extension = os.path.splitext(path)[1].lower()
+        if extension == '.csv':
+            yield from iter_csv(path)
+        elif extension == '.jsonl':
+            for record in iter_jsonl(path):
+                yield question_from_record(record)
+        elif extension == '.json':
+            for record in iter_json_array(path):
+                yield question_from_record(record)
+        else:
+            raise ValueError(f"Unbekanntes Dateiformat: {path}")
+
+
+# --- Import ---
+
+def backfill_hashes(cursor):
+    """Ergänzt fehlende Hashes (z.B. für Fragen aus quiz_manager.py)"""
+    cursor.execute("""
+        SELECT f.FrageID, f.FrageText, k.Bezeichnung
+        FROM Frage f JOIN Kategorie k ON f.KategorieID = k.KategorieID
+        WHERE f.InhaltHash IS NULL
+    """)
+    rows = [(content_hash(text, category), frage_id) for frage_id, text, category in cursor.fetchall()]
+    cursor.executemany("UPDATE Frage SET InhaltHash=? WHERE FrageID=?", rows)
+    return len(rows)
+
+
+def begin_bulk_import(cursor):
+    """Setzt die Insert-Trigger für Suchindex und FrageSpielbarkeit aus
+
+    Ein FTS-Insert bzw. UPDATE pro Zeile aus einem Trigger ist beim Massenimport
+    ein Vielfaches langsamer als ein einzelnes INSERT ... SELECT am Ende
+    (index_new_questions, count_new_answers). Die Trigger prüfen die Zeile in
+    Massenimport (Migration 016); sie gilt nur für die laufende Transaktion.
+    """
+    cursor.execute("INSERT INTO Massenimport (ID) VALUES (1)")
+
+
+def end_bulk_import(cursor):
+    """Schaltet die Insert-Trigger wieder ein"""
+    cursor.execute("DELETE FROM Massenimport")
+
+
+def count_new_answers(cursor, first_id):
+    """Trägt richtige/falsche Antworten aller Fragen ab first_id in FrageSpielbarkeit ein"""
+    cursor.execute("""
+        INSERT OR REPLACE INTO FrageSpielbarkeit (FrageID, KategorieID, SchwierigkeitID, Richtige, Falsche)
+        SELECT f.FrageID, f.KategorieID, f.SchwierigkeitID,
+               COALESCE(SUM(a.IstRichtig = 1), 0), COALESCE(SUM(a.IstRichtig = 0), 0)
+        FROM Frage f
+        LEFT JOIN Antwort a ON a.FrageID = f.FrageID
+        WHERE f.FrageID >= ?
+        GROUP BY f.FrageID
+    """, (first_id,))
+
+
+def index_new_questions(cursor, first_id):
+    """Nimmt alle Fragen ab first_id in den Suchindex auf"""
+    cursor.execute("""
+        INSERT INTO FrageSuche (rowid, FrageText, Antworten)
+        SELECT f.FrageID, f.FrageText,
+               COALESCE((SELECT group_concat(a.AntwortText, ' ') FROM Antwort a WHERE a.FrageID = f.FrageID), '')
+        FROM Frage f
+        WHERE f.FrageID >= ?
+    """, (first_id,))
+
+
+def import_questions(conn, questions, batch_size=5000, similar=None):
+    """Importiert Fragen gebündelt in einer einzigen Transaktion
+
+    Gibt ein Dict mit Zählern (gelesen, eingefügt, duplikate, ungueltig, antworten) zurück.
+    Ist similar eine Liste, wird jede neue Frage mit dem vorhandenen Bestand verglichen
+    und (Fragetext, [(FrageID, FrageText), ...]) für mögliche Dubletten angehängt.
+    """
+    stats = {'gelesen': 0, 'eingefuegt': 0, 'duplikate': 0, 'ungueltig': 0, 'antworten': 0}
+    cursor = conn.cursor()
+
+    conn.commit()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        backfill_hashes(cursor)
+        cursor.execute("SELECT InhaltHash FROM Frage WHERE InhaltHash IS NOT NULL")
+        known_hashes = {row[0] for row in cursor.fetchall()}
+
+        cursor.execute("SELECT KategorieID, Bezeichnung FROM Kategorie")
+        kat_map = {name: id for id, name in cursor.fetchall()}
+        cursor.execute("SELECT SchwierigkeitID, Bezeichnung FROM Schwierigkeitsgrad")
+        diff_map = {name: id for id, name in cursor.fetchall()}
+
+        # IDs selbst vergeben, damit Antworten ohne Rückfrage zugeordnet werden können
+        cursor.execute("""
+            SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name='Frage'), 0),
+                       COALESCE((SELECT MAX(FrageID) FROM Frage), 0))
+        """)
+        next_id = cursor.fetchone()[0] + 1
+        first_id = next_id
+
+        # Nicht festgeschrieben: andere Verbindungen sehen die Trigger nie ausgesetzt
+        begin_bulk_import(cursor)
+
+        frage_rows = []
+        antwort_rows = []
+
+        def flush():
+            cursor.executemany(
+                "INSERT INTO Frage (FrageID, FrageText, KategorieID, SchwierigkeitID, InhaltHash) "
+                "VALUES (?, ?, ?, ?, ?)",
+                frage_rows
+            )
+            cursor.executemany(
+                "INSERT INTO Antwort (AntwortText, IstRichtig, FrageID) VALUES (?, ?, ?)",
+                antwort_rows
+            )
+            frage_rows.clear()
+            antwort_rows.clear()
+
+        for frage_text, kategorie, schwierigkeit, antworten in questions:
+            stats['gelesen'] += 1
+            correct = sum(1 for _, ist_richtig in antworten if ist_richtig)
+            if (not frage_text or not kategorie or schwierigkeit not in diff_map
+                    or correct < 1 or len(antworten) - correct < MIN_WRONG_ANSWERS):
+                stats['ungueltig'] += 1
+                continue
+
+            digest = content_hash(frage_text, kategorie)
+            if digest in known_hashes:
+                stats['duplikate'] += 1
+                continue
+            known_hashes.add(digest)
+
+            if similar is not None:
+                # Suchindex enthält während des Imports nur den bisherigen Bestand
+                matches = find_similar(conn, frage_text)
+                if matches:
+                    similar.append((frage_text, matches))
+
+            if kategorie not in kat_map:
+                cursor.execute("INSERT INTO Kategorie (Bezeichnung) VALUES (?)", (kategorie,))
+                kat_map[kategorie] = cursor.lastrowid
+
+            frage_id = next_id
+            next_id += 1
+            frage_rows.append((frage_id, frage_text, kat_map[kategorie], diff_map[schwierigkeit], digest))
+            for antwort_text, ist_richtig in antworten:
+                antwort_rows.append((antwort_text, int(ist_richtig), frage_id))
+            stats['eingefuegt'] += 1
+            stats['antworten'] += len(antworten)
+
+            if len(frage_rows) >= batch_size:
+                flush()
+
+        flush()
+        index_new_questions(cursor, first_id)
+        # Den Fragen-Pool laden andere Programme schon über die Frage-Trigger neu
+        count_new_answers(cursor, first_id)
+        end_bulk_import(cursor)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return stats
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Fragen in die Quiz-Datenbank importieren")
+    parser.add_argument('files', nargs='*', help="JSON-, JSONL- oder CSV-Dateien (ohne: eingebaute Fragen)")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="Pfad zur SQLite-Datenbank")
+    parser.add_argument('--batch', type=int, default=5000, help="Zeilen pro executemany")
+    parser.add_argument('--aehnliche', action='store_true',
+                        help="Mögliche Dubletten (gleiche Wörter im Fragetext) melden")
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    for pragma in ConnectionPool.PRAGMAS:
+        conn.execute(pragma)
+    # Trigger (Änderungszähler) anlegen, damit laufende Clients ihren Fragen-Pool neu laden
+    apply_migrations(conn)
+
+    questions = iter_questions(args.files) if args.files else iter(meine_fragen)
+
+    start = time.perf_counter()
+    similar = [] if args.aehnliche else None
+    stats = import_questions(conn, questions, args.batch, similar)
+    duration = time.perf_counter() - start
+
+    rate = stats['gelesen'] / duration if duration > 0 else 0
+    print(f"✅ {stats['eingefuegt']} Fragen mit {stats['antworten']} Antworten hinzugefügt")
+    print(f"   {stats['duplikate']} bereits vorhanden, {stats['ungueltig']} ungültig übersprungen")
+    print(f"   {stats['gelesen']} Fragen in {duration:.2f}s ({rate:,.0f} Fragen/s)")
+
+    # Server mit --snapshot öffnen die Datei beim Start, statt den Bestand zu scannen
+    bank_path = bank_file.default_path(args.db)
+    if bank_file.read_key(bank_path) != bank_key(conn):
+        start = time.perf_counter()
+        snapshot, size = export_bank(conn, bank_path)
+        print(f"   Bank-Datei {bank_path} neu geschrieben ({len(snapshot)} Fragen, "
+              f"{size / 2 ** 20:.1f} MiB, {time.perf_counter() - start:.2f}s)")
+    conn.close()
+
+    if similar:
+        print(f"⚠️  {len(similar)} importierte Fragen ähneln vorhandenen Fragen:")
+        for frage_text, matches in similar[:20]:
+            print(f"  {frage_text}")
+            for frage_id, vorhandene in matches:
+                print(f"      ~ [{frage_id}] {vorhandene}")
+        if len(similar) > 20:
+            print(f"  ... und {len(similar) - 20} weitere")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Antwort-Journal (Write-Behind mit Group Commit)
+Sammelt Antworten aus allen Spielen und schreibt sie gebündelt in einer
+Transaktion in SpielHistorie/Teilnahme. Ein Aufrufer gilt erst als bestätigt,
+wenn der Commit seines Bündels auf der Platte ist (synchronous=FULL). Sein
+Future liefert dann den neuen Punktestand des Spielers in diesem Spiel.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+INSERT_HISTORY = """
+    INSERT INTO SpielHistorie
+    (SpielID, SpielerID, FrageID, RundeNr, GegebeneAntwortID, WarKorrekt)
+    VALUES (?, ?, ?, ?, ?, ?)
+"""
+
+ADD_SCORE = """
+    UPDATE Teilnahme
+    SET EndScore = EndScore + ?
+    WHERE SpielID=? AND SpielerID=?
+    RETURNING EndScore
+"""
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerJournal:
+    """Schreib-Thread, der Antworten bündelt
+
+    Ein Bündel umfasst alles, was beim Schreiben bereits wartet (höchstens
+    max_batch). Während ein Commit läuft, sammeln sich die nächsten Antworten
+    für das folgende Bündel. max_delay_ms > 0 wartet nach der ersten Antwort
+    zusätzlich auf weitere - das lohnt nur, wenn die Aufrufer nicht selbst auf
+    ihre Bestätigung warten (z.B. der asynchrone Server).
+
+    after_batch sind Funktionen f(conn), die nach dem Commit jedes Bündels in
+    einer eigenen Transaktion laufen (z.B. Ranglisten nachführen). Schlägt eine
+    fehl, bleiben die Antworten gespeichert; der Fehler wird protokolliert.
+    """
+
+    def __init__(self, pool, max_batch=256, max_delay_ms=0, after_batch=()):
+        self.pool = pool
+        self.after_batch = list(after_batch)
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.answers = 0
+        self.max_batch_seen = 0
+        self._thread = threading.Thread(target=self._run, name="quiz-journal", daemon=True)
+        self._thread.start()
+
+    def submit(self, game_id, player_id, question_id, answer_id, is_correct, round_nr):
+        """Reiht eine Antwort ein; das Future ist erfüllt, sobald sie dauerhaft gespeichert ist
+
+        Ergebnis ist der Punktestand (EndScore) des Spielers nach dem Commit.
+        """
+        future = Future()
+        # Unter der Sperre: nach dem Endezeichen von close() landet nichts mehr in der Queue
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Antwort-Journal ist geschlossen")
+            self.queue.put((future, (game_id, player_id, question_id, round_nr, answer_id, is_correct)))
+        return future
+
+    def flush(self):
+        """Wartet, bis alle bisher eingereihten Antworten geschrieben sind
+
+        Nach close() schreibt der Schreib-Thread noch alles vor dem Endezeichen;
+        flush() wartet dann nur auf sein Ende.
+        """
+        marker = Future()
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self.queue.put((marker, None))
+        if closed:
+            self._thread.join()
+        else:
+            marker.result()
+
+    def close(self):
+        """Schreibt ausstehende Antworten und beendet den Schreib-Thread"""
+        with self._lock:
+            if not self._closed:
+                self._closed = True
+                self.queue.put(None)
+        self._thread.join()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'batches': self.batches,
+                'answers': self.answers,
+                'avg_batch': self.answers / self.batches if self.batches else 0,
+                'max_batch': self.max_batch_seen,
+            }
+
+    # --- Schreib-Thread ---
+
+    def _run(self):
+        conn = self.pool.get_connection()
+        # Bestätigte Antworten müssen auch einen Stromausfall überstehen
+        conn.execute("PRAGMA synchronous=FULL")
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = time.perf_counter() + self.max_delay
+            while len(batch) < self.max_batch:
+                timeout = deadline - time.perf_counter()
+                try:
+                    item = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write(batch)
+
+        # Sollte leer sein (submit/flush prüfen _closed unter der Sperre); trotzdem
+        # darf kein Aufrufer auf ein Future warten, das niemand mehr erfüllt
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                continue
+            future, row = item
+            if row is None:
+                future.set_result(None)
+            else:
+                future.set_exception(RuntimeError("Antwort-Journal ist geschlossen"))
+
+    def _write(self, batch):
+        answers = [(future, row) for future, row in batch if row is not None]
+        if answers:
+            try:
+                scores = self._write_rows([row for _, row in answers])
+            except Exception:
+                # Einzeln wiederholen, damit eine fehlerhafte Antwort nicht das ganze Bündel kostet
+                for future, row in answers:
+                    try:
+                        scores = self._write_rows([row])
+                    except Exception as e:
+                        future.set_exception(e)
+                    else:
+                        future.set_result(scores.get((row[0], row[1])))
+            else:
+                for future, row in answers:
+                    future.set_result(scores.get((row[0], row[1])))
+            with self._lock:
+                self.batches += 1
+                self.answers += len(answers)
+                self.max_batch_seen = max(self.max_batch_seen, len(answers))
+            self._run_hooks()
+
+        # flush()-Marker erst nach dem Commit der Antworten davor (und den Hooks) erfüllen
+        for future, row in batch:
+            if row is None:
+                future.set_result(None)
+
+    def _write_rows(self, rows):
+        """Eine Transaktion: Historie einfügen, Punkte je (Spiel, Spieler) zusammengefasst
+
+        Liefert {(SpielID, SpielerID): EndScore} nach dem Hochzählen. Das UPDATE
+        rechnet in der Datenbank (EndScore + ?), gleichzeitige Antworten beider
+        Duell-Spieler können sich daher nicht gegenseitig überschreiben.
+        """
+        points = {}
+        for game_id, player_id, _, _, _, is_correct in rows:
+            points[(game_id, player_id)] = points.get((game_id, player_id), 0) + (10 if is_correct else 0)
+
+        scores = {}
+        with self.pool.connection() as db:
+            db.cursor.executemany(INSERT_HISTORY, rows)
+            # RETURNING geht nicht mit executemany, es ist aber nur eine Zeile je Spieler im Bündel
+            for (game_id, player_id), added in points.items():
+                row = db.cursor.execute(ADD_SCORE, (added, game_id, player_id)).fetchone()
+                scores[(game_id, player_id)] = row[0] if row else None
+        return scores
+
+    def _run_hooks(self):
+        """after_batch-Funktionen, jede in ihrer eigenen Transaktion"""
+        for hook in self.after_batch:
+            try:
+                with self.pool.connection() as db:
+                    hook(db.conn)
+            except Exception:
+                # Die Hooks holen beim nächsten Bündel nach (Verarbeitungsstand)
+                logger.exception("after_batch-Funktion %s fehlgeschlagen", getattr(hook, '__name__', hook))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Binäres Dateiformat für den Fragen-Snapshot (database/quiz_app.bank)
+Schreibgeschützt per mmap geöffnet, ohne die Inhalte zu parsen: jeder Abschnitt
+ist direkt ein memoryview auf die Datei. Alle Prozesse teilen sich so eine
+Kopie im Page-Cache. Aufbau (little-endian, Abschnitte auf 8 Bytes ausgerichtet):
+
+    Kopf        MAGIC, Formatversion, Anzahl Abschnitte, Stand (4 x int64), CRC32
+    Tabelle     je Abschnitt (Offset, Länge in Bytes), Reihenfolge wie SECTIONS
+    Abschnitte  Arrays im Typ aus SECTIONS, Texte als UTF-8, metadata als JSON
+
+Die CRC32 deckt alles hinter dem Kopf ab. Geschrieben wird in eine temporäre
+Datei, die danach atomar die alte ersetzt.
+"""
+
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+
+MAGIC = b'QUIZBANK'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<8sII4qII')  # Magic, Format, Abschnitte, Stand, CRC32, reserviert
+SECTION = struct.Struct('<qq')       # Offset, Länge
+
+# Abschnitte und ihr array-Typ ('B' = Bytes)
+SECTIONS = (
+    ('question_ids', 'q'),
+    ('question_category', 'q'),
+    ('question_difficulty', 'q'),
+    ('text_offsets', 'I'),
+    ('texts', 'B'),
+    ('answer_start', 'I'),
+    ('correct_count', 'H'),
+    ('answer_ids', 'q'),
+    ('answer_offsets', 'I'),
+    ('answer_texts', 'B'),
+    ('metadata', 'B'),
+)
+
+ALIGNMENT = 8
+
+
+def default_path(db_path):
+    """Bank-Datei neben der Datenbank (quiz_app.db -> quiz_app.bank)"""
+    return os.path.splitext(db_path)[0] + '.bank'
+
+
+def _check_platform():
+    # Die Arrays werden ohne Umwandlung geschrieben und gelesen
+    if sys.byteorder != 'little':
+        raise ValueError("Bank-Dateien werden nur auf little-endian Systemen unterstützt")
+
+
+def write(path, key, sections):
+    """Schreibt die Abschnitte (Name -> array/bytes) mit Stand key; liefert die Dateigröße"""
+    _check_platform()
+    table_end = HEADER.size + SECTION.size * len(SECTIONS)
+    offset = table_end + (-table_end % ALIGNMENT)
+    layout = []
+    for name, typecode in SECTIONS:
+        data = memoryview(sections[name]).cast('B')
+        layout.append((offset, data))
+        offset += len(data)
+        offset += -offset % ALIGNMENT
+    size = offset
+
+    table = b''.join(SECTION.pack(start, len(data)) for start, data in layout)
+    crc = zlib.crc32(table)
+    position = HEADER.size + len(table)
+    for start, data in layout:
+        crc = zlib.crc32(bytes(start - position), crc)
+        crc = zlib.crc32(data, crc)
+        position = start + len(data)
+    crc = zlib.crc32(bytes(size - position), crc)
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.bank_', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS), *key, crc, 0))
+            f.write(table)
+            for start, data in layout:
+                f.write(bytes(start - f.tell()))
+                f.write(data)
+            f.write(bytes(size - f.tell()))
+            f.flush()
+            os.fsync(f.fileno())
+        # Prozesse mit der alten Datei behalten ihre Abbildung (unter Windows schlägt
+        # das Ersetzen fehl, solange ein Prozess sie geöffnet hat)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return size
+
+
+def read_key(path):
+    """Stand einer Bank-Datei aus dem Kopf (None, wenn sie fehlt oder unbrauchbar ist)"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, count, *rest = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION or count != len(SECTIONS):
+        return None
+    return tuple(rest[:4])
+
+
+def read(path, verify=True):
+    """Öffnet eine Bank-Datei per mmap
+
+    Liefert (Stand, {Name: memoryview}, Dateigröße). ValueError bei falschem
+    Format oder (mit verify) falscher Prüfsumme. Die memoryviews halten die
+    Abbildung offen, solange sie benutzt werden.
+    """
+    _check_platform()
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(mapped)
+    if len(view) < HEADER.size:
+        raise ValueError(f"{path}: keine Bank-Datei (zu kurz)")
+    magic, version, count, *rest = HEADER.unpack_from(view)
+    key, crc = tuple(rest[:4]), rest[4]
+    if magic != MAGIC:
+        raise ValueError(f"{path}: keine Bank-Datei")
+    if version != FORMAT_VERSION or count != len(SECTIONS):
+        raise ValueError(f"{path}: Formatversion {version} wird nicht unterstützt")
+    if verify and zlib.crc32(view[HEADER.size:]) != crc:
+        raise ValueError(f"{path}: Prüfsumme falsch (Datei beschädigt)")
+
+    sections = {}
+    for nr, (name, typecode) in enumerate(SECTIONS):
+        start, length = SECTION.unpack_from(view, HEADER.size + nr * SECTION.size)
+        if start + length > len(view):
+            raise ValueError(f"{path}: Abschnitt {name} reicht über das Dateiende")
+        sections[name] = view[start:start + length].cast(typecode)
+    return key, sections, len(view)
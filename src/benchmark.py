@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark der QuizDatabase-Methoden auf den heißen Pfaden
+Misst Latenz (Mittel, p50, p95, p99) und Durchsatz je Methode auf einer Kopie
+der Datenbank oder auf einem mit generate_data.py erzeugten Datenbestand.
+Mit --json werden die Werte samt Commit gespeichert, --compare zeigt die
+Abweichung gegenüber einem früheren Lauf (z.B. vor einer Änderung).
+
+Aufruf: python benchmark.py [--db PFAD | --questions N --players N --history N ...]
+                            [--iterations N] [--only NAME ...] [--json DATEI] [--compare DATEI]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from add_questions import import_questions
+from generate_data import WORDS, generate
+from quiz_client import QuizDatabase
+
+
+BENCH_PASSWORD = "bench"
+BENCH_USERS = 20
+
+
+def percentile(sorted_values, share):
+    """Wert zum Anteil share (0..1) einer sortierten Liste (nächster Rang)"""
+    index = min(len(sorted_values) - 1, max(0, round(share * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(durations):
+    """Kennzahlen in Millisekunden aus einer Liste von Laufzeiten in Sekunden"""
+    values = sorted(durations)
+    total = sum(values)
+    return {
+        'n': len(values),
+        'mean_ms': total / len(values) * 1000,
+        'p50_ms': percentile(values, 0.50) * 1000,
+        'p95_ms': percentile(values, 0.95) * 1000,
+        'p99_ms': percentile(values, 0.99) * 1000,
+        'ops_per_s': len(values) / total if total else 0.0,
+    }
+
+
+class Fixture:
+    """Zufällige, aber gültige Argumente für die Methoden aus dem Datenbestand"""
+
+    def __init__(self, db, seed):
+        self.rng = random.Random(seed)
+        self.usernames = []
+        for nr in range(BENCH_USERS):
+            name = f"bench_{nr}_{seed}"
+            db.register_user(name, BENCH_PASSWORD)
+            self.usernames.append(name)
+
+        with db.pool.connection() as conn:
+            # Kategorie/Schwierigkeit mit den meisten Fragen (kleine Bestände: die größten)
+            self.pools = conn.cursor.execute("""
+                SELECT KategorieID, SchwierigkeitID FROM Frage
+                GROUP BY KategorieID, SchwierigkeitID
+                ORDER BY COUNT(*) >= 10 DESC, random() LIMIT 50
+            """).fetchall()
+            max_player = conn.cursor.execute("SELECT MAX(SpielerID) FROM Spieler").fetchone()[0]
+            self.player_ids = [row[0] for row in conn.cursor.execute(
+                "SELECT SpielerID FROM Spieler WHERE SpielerID IN (%s)" % ','.join(
+                    str(self.rng.randint(1, max_player)) for _ in range(500)
+                )
+            )]
+            self.answers = conn.cursor.execute("""
+                SELECT FrageID, AntwortID, IstRichtig FROM Antwort
+                WHERE FrageID IN (SELECT FrageID FROM Frage ORDER BY random() LIMIT 200)
+            """).fetchall()
+
+        # Laufende Spiele für Spielplan, Punktestand und Antworten
+        self.games = []
+        for _ in range(50):
+            category_id, difficulty_id = self.pool()
+            players = self.rng.sample(self.player_ids, 2)
+            self.games.append((db.create_game(players, difficulty_id, category_id=category_id), players))
+        self.deck_games = iter(range(10 ** 9, 2 * 10 ** 9))
+
+    def pool(self):
+        return self.rng.choice(self.pools)
+
+    def player(self):
+        return self.rng.choice(self.player_ids)
+
+    def game(self):
+        return self.rng.choice(self.games)
+
+
+def build_cases(db, fx):
+    """Messfälle: Name -> Funktion ohne Argumente (ein Aufruf = eine Messung)"""
+
+    def random_question_deck():
+        # Neuer Stapel alle 10 Fragen, wie ein Spiel mit 10 Fragen
+        if fx.rng.random() < 0.1:
+            fx.deck_game = next(fx.deck_games)
+        category_id, difficulty_id = fx.pool()
+        db.get_random_question(category_id, difficulty_id, game_id=getattr(fx, 'deck_game', 0))
+
+    def round_adaptive():
+        category_id, difficulty_id = fx.pool()
+        db.get_round_questions(category_id, difficulty_id, 10, player_ids=fx.rng.sample(fx.player_ids, 2))
+
+    def create_game():
+        category_id, difficulty_id = fx.pool()
+        db.create_game(fx.rng.sample(fx.player_ids, 2), difficulty_id, category_id=category_id)
+
+    def save_answer():
+        game_id, players = fx.game()
+        question_id, answer_id, is_correct = fx.rng.choice(fx.answers)
+        db.save_answer(game_id, fx.rng.choice(players), question_id, answer_id, is_correct, 1)
+
+    return {
+        'login_user': lambda: db.login_user(fx.rng.choice(fx.usernames), BENCH_PASSWORD),
+        'get_random_question': lambda: db.get_random_question(*fx.pool()),
+        'get_random_question_deck': random_question_deck,
+        'get_round_questions_adaptive': round_adaptive,
+        'create_game_planned': create_game,
+        'get_game_plan': lambda: db.get_game_plan(fx.game()[0]),
+        'save_answer': save_answer,
+        'get_game_scores': lambda: db.get_game_scores(fx.game()[0]),
+        'get_user_statistics': lambda: db.get_user_statistics(fx.player()),
+        'get_leaderboard': lambda: db.get_leaderboard(by=fx.rng.choice(('points', 'accuracy', 'duels'))),
+        'get_leaderboard_7d': lambda: db.get_leaderboard(days=7),
+        'get_player_rank': lambda: db.get_player_rank(fx.player()),
+        'search_questions': lambda: db.search_questions(' '.join(fx.rng.sample(WORDS, 2))),
+    }
+
+
+def run_case(function, iterations, warmup):
+    """Ruft function warmup + iterations mal auf und misst die letzten iterations"""
+    for _ in range(warmup):
+        function()
+    durations = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        function()
+        durations.append(time.perf_counter() - start)
+    return summarize(durations)
+
+
+def run_import(db_path, count, seed):
+    """Durchsatz des Fragen-Imports (eigene Verbindung, eine Transaktion)"""
+    rng = random.Random(seed)
+    questions = [
+        (f"Import {seed}-{nr}: {' '.join(rng.choice(WORDS) for _ in range(6))}?",
+         f"Import {nr % 5}", rng.choice(("Leicht", "Mittel", "Schwer")),
+         [(f"richtig {nr}", True)] + [(f"falsch {nr}-{k}", False) for k in range(3)])
+        for nr in range(count)
+    ]
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA foreign_keys=ON")
+    try:
+        start = time.perf_counter()
+        stats = import_questions(conn, questions)
+        duration = time.perf_counter() - start
+    finally:
+        conn.close()
+    return {
+        'n': stats['eingefuegt'],
+        'mean_ms': duration / max(1, stats['eingefuegt']) * 1000,
+        'p50_ms': None,
+        'p95_ms': None,
+        'p99_ms': None,
+        'ops_per_s': stats['eingefuegt'] / duration,
+    }
+
+
+def git_commit():
+    """Aktueller Commit (oder None außerhalb eines Git-Repos)"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def fmt(value):
+    return f"{value:>9.3f}" if value is not None else f"{'-':>9}"
+
+
+def print_results(results, base=None):
+    """Tabelle der Ergebnisse, mit base zusätzlich die Abweichung von p50/p95"""
+    header = f"  {'Methode':<30} {'n':>6} {'Mittel':>9} {'p50':>9} {'p95':>9} {'p99':>9} {'Ops/s':>11}"
+    if base:
+        header += f" {'Δp50':>8} {'Δp95':>8}"
+    print(header + "   (Zeiten in ms)")
+    for name, result in results.items():
+        line = (f"  {name:<30} {result['n']:>6} {fmt(result['mean_ms'])} {fmt(result['p50_ms'])}"
+                f" {fmt(result['p95_ms'])} {fmt(result['p99_ms'])} {result['ops_per_s']:>11,.0f}")
+        if base:
+            before = base.get(name) or {}
+            for key in ('p50_ms', 'p95_ms'):
+                # Ohne Perzentile (Import) zählt die mittlere Zeit pro Frage
+                if result[key] is None and key == 'p50_ms':
+                    key = 'mean_ms'
+                if result[key] is None or not before.get(key):
+                    line += f" {'-':>8}"
+                else:
+                    line += f" {(result[key] / before[key] - 1) * 100:>+7.1f}%"
+        print(line)
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Latenz und Durchsatz der QuizDatabase-Methoden messen")
+    parser.add_argument('--db', help="Vorlage für die DB-Kopie (sonst wird ein Datenbestand erzeugt)")
+    parser.add_argument('--questions', type=int, default=5000, help="Erzeugte Fragen")
+    parser.add_argument('--players', type=int, default=5000, help="Erzeugte Spieler")
+    parser.add_argument('--games', type=int, default=20000, help="Erzeugte Spiele")
+    parser.add_argument('--history', type=int, default=300000, help="Erzeugte Antworten in SpielHistorie")
+    parser.add_argument('--seed', type=int, default=1, help="Seed für Datenbestand und Messfolge")
+    parser.add_argument('--iterations', type=int, default=200, help="Messungen je Methode")
+    parser.add_argument('--warmup', type=int, default=10, help="Ungemessene Aufrufe vorab")
+    parser.add_argument('--import-size', type=int, default=5000, help="Fragen für den Import-Durchsatz (0 = aus)")
+    parser.add_argument('--snapshot', action='store_true', help="Mit Fragen-Snapshot im Speicher messen")
+    parser.add_argument('--only', nargs='+', metavar='NAME', help="Nur diese Methoden messen")
+    parser.add_argument('--json', metavar='DATEI', help="Ergebnisse als JSON speichern")
+    parser.add_argument('--compare', metavar='DATEI', help="Mit einem früheren JSON-Ergebnis vergleichen")
+    args = parser.parse_args()
+
+    # Die Messfälle greifen erst beim Aufruf auf db zu, die Namen gibt es vorab
+    available = list(build_cases(None, None)) + ['import_questions']
+    names = args.only or available
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        parser.error(f"Unbekannte Methode(n): {', '.join(unknown)} (möglich: {', '.join(available)})")
+
+    base = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare = json.load(f)
+        base = compare['results']
+        print(f"Vergleich mit {args.compare} (Commit {compare['meta'].get('commit')}, {compare['meta'].get('time')})")
+
+    tmp_dir = tempfile.mkdtemp(prefix="quiz_bench_")
+    try:
+        db_path = os.path.join(tmp_dir, "quiz_app.db")
+        if args.db:
+            shutil.copy(args.db, db_path)
+            dataset = {'db': os.path.abspath(args.db)}
+        else:
+            dataset = {'questions': args.questions, 'players': args.players,
+                       'games': args.games, 'history': args.history, 'seed': args.seed}
+            print(f"Erzeuge Datenbestand {dataset} ...")
+            start = time.perf_counter()
+            generate(db_path, questions=args.questions, players=args.players, games=args.games,
+                     history=args.history, seed=args.seed)
+            print(f"  fertig in {time.perf_counter() - start:.1f}s")
+
+        random.seed(args.seed)
+        db = QuizDatabase(db_path, snapshot=args.snapshot)
+        try:
+            cases = build_cases(db, Fixture(db, args.seed))
+            results = {}
+            for name in names:
+                if name == 'import_questions':
+                    continue
+                results[name] = run_case(cases[name], args.iterations, args.warmup)
+        finally:
+            db.close()
+        if 'import_questions' in names and args.import_size:
+            results['import_questions'] = run_import(db_path, args.import_size, args.seed)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print()
+    print_results(results, base)
+
+    if args.json:
+        meta = {
+            'commit': git_commit(),
+            'time': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'iterations': args.iterations,
+            'snapshot': args.snapshot,
+            'dataset': dataset,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'meta': meta, 'results': results}, f, indent=2)
+        print(f"\nErgebnisse gespeichert: {args.json}")
+
+
+if __name__ == "__main__":
+    main()
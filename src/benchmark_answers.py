@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: gespeicherte Antworten pro Sekunde
+Vergleicht das bisherige Speichern (eine Transaktion pro Antwort) mit dem
+Antwort-Journal (Group Commit). Läuft auf einer Kopie der Datenbank.
+
+Aufruf: python benchmark_answers.py [--db PFAD] [--threads N] [--answers N]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from answer_journal import ADD_SCORE, INSERT_HISTORY
+from quiz_client import QuizDatabase
+
+
+def save_answer_single(db, game_id, player_id, question_id, answer_id, is_correct, round_nr):
+    """Bisheriger Weg: eigene Transaktion (und eigener Commit) pro Antwort"""
+    with db.pool.connection() as conn:
+        conn.cursor.execute(INSERT_HISTORY, (game_id, player_id, question_id, round_nr, answer_id, is_correct))
+        if is_correct:
+            conn.cursor.execute(ADD_SCORE, (10, game_id, player_id)).fetchone()
+
+
+def prepare(db, games):
+    """Legt Spieler und Spiele an und liefert (SpielID, SpielerID) sowie Fragen mit Antworten"""
+    players = []
+    for nr in range(2):
+        name = f"bench_{nr}_{random.randrange(10 ** 9)}"
+        db.register_user(name, "bench")
+        players.append(db.get_player(name)[0])
+    seats = []
+    for _ in range(games):
+        game_id = db.create_game(players, 1)
+        seats.extend((game_id, player_id) for player_id in players)
+
+    with db.pool.connection() as conn:
+        conn.cursor.execute("""
+            SELECT a.FrageID, a.AntwortID, a.IstRichtig
+            FROM Antwort a JOIN Frage f ON f.FrageID = a.FrageID
+            LIMIT 500
+        """)
+        answers = conn.cursor.fetchall()
+    return seats, answers
+
+
+def run(label, save, db, threads, total, seats, answers, synchronous):
+    """Speichert total Antworten aus threads Threads und misst die Rate"""
+    per_thread = total // threads
+
+    def worker(nr):
+        # Gleiche Dauerhaftigkeit wie das Journal (oder bewusst schwächer)
+        db.pool.get_connection().execute(f"PRAGMA synchronous={synchronous}")
+        rng = random.Random(nr)
+        for round_nr in range(per_thread):
+            game_id, player_id = seats[(nr + round_nr * threads) % len(seats)]
+            question_id, answer_id, is_correct = rng.choice(answers)
+            save(game_id, player_id, question_id, answer_id, is_correct, round_nr % 5 + 1)
+
+    workers = [threading.Thread(target=worker, args=(nr,)) for nr in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    duration = time.perf_counter() - start
+    rate = per_thread * threads / duration
+    print(f"  {label:<28} {rate:>10,.0f} Antworten/s  ({duration:.2f}s)")
+    return rate
+
+
+def main():
+    """Hauptfunktion"""
+    default_db = os.path.join(os.path.dirname(__file__), "../database/quiz_app.db")
+
+    parser = argparse.ArgumentParser(description="Benchmark für das Speichern von Antworten")
+    parser.add_argument('--db', default=default_db, help="Vorlage für die DB-Kopie")
+    parser.add_argument('--threads', type=int, default=16, help="Gleichzeitig speichernde Threads")
+    parser.add_argument('--answers', type=int, default=4000, help="Antworten pro Durchlauf")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="quiz_bench_")
+    try:
+        db_path = os.path.join(tmp_dir, "quiz_app.db")
+        shutil.copy(args.db, db_path)
+        db = QuizDatabase(db_path)
+        seats, answers = prepare(db, games=50)
+
+        print(f"{args.answers} Antworten aus {args.threads} Threads:")
+        single_normal = run("einzeln, synchronous=NORMAL", lambda *a: save_answer_single(db, *a),
+                            db, args.threads, args.answers, seats, answers, "NORMAL")
+        single_full = run("einzeln, synchronous=FULL", lambda *a: save_answer_single(db, *a),
+                          db, args.threads, args.answers, seats, answers, "FULL")
+        journal = run("Journal (Group Commit)", db.save_answer,
+                      db, args.threads, args.answers, seats, answers, "NORMAL")
+
+        stats = db.journal.stats()
+        print(f"  Journal: {stats['batches']} Commits, Ø {stats['avg_batch']:.1f} / max {stats['max_batch']} Antworten je Commit")
+        print(f"  Faktor gegenüber einzeln (FULL): {journal / single_full:.1f}x, (NORMAL): {journal / single_normal:.1f}x")
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark: Logins pro Sekunde je Anzahl Hash-Prozesse
+Prüft viele Passwörter gleichzeitig (wie ein Login-Ansturm) über den
+Prozess-Pool von password_hasher und vergleicht mit dem alten SHA-256
+und dem Prüfen im aufrufenden Thread.
+
+Aufruf: python benchmark_passwords.py [--logins N] [--workers 1 2 4 ...] [--pbkdf2] [--cost N]
+"""
+
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import wait
+
+from password_hasher import Pbkdf2Hasher, PasswordHasher, ScryptHasher
+
+
+PASSWORD = "geheim123"
+
+
+def measure(hasher, workers, logins, encoded):
+    """Prüft logins Passwörter auf einmal und liefert (Logins/s, mittlere Wartezeit in ms)"""
+    passwords = PasswordHasher(hasher, workers=workers)
+    try:
+        # Prozesse starten und warmlaufen lassen, bevor gemessen wird
+        wait([passwords.verify_async(PASSWORD, encoded) for _ in range(max(1, workers))])
+        start = time.perf_counter()
+        futures = [passwords.verify_async(PASSWORD, encoded) for _ in range(logins)]
+        finished = []
+        for future in futures:
+            assert future.result() == (True, None)
+            finished.append(time.perf_counter() - start)
+        duration = time.perf_counter() - start
+    finally:
+        passwords.close()
+    return logins / duration, sum(finished) / len(finished) * 1000
+
+
+def main():
+    """Hauptfunktion"""
+    cores = os.cpu_count() or 1
+    default_workers = sorted({workers for workers in (1, 2, 4, 8, 16) if workers < cores} | {cores})
+
+    parser = argparse.ArgumentParser(description="Benchmark für Passwort-Hashes im Prozess-Pool")
+    parser.add_argument('--logins', type=int, default=64, help="Gleichzeitige Logins je Durchlauf")
+    parser.add_argument('--workers', type=int, nargs='+', default=default_workers, help="Zu messende Prozesszahlen")
+    parser.add_argument('--pbkdf2', action='store_true', help="PBKDF2 statt scrypt messen")
+    parser.add_argument('--cost', type=int, help="scrypt n bzw. PBKDF2-Iterationen (Standard: wie im Betrieb)")
+    args = parser.parse_args()
+
+    if args.pbkdf2:
+        hasher = Pbkdf2Hasher(args.cost) if args.cost else Pbkdf2Hasher()
+    else:
+        hasher = ScryptHasher(args.cost) if args.cost else ScryptHasher()
+    encoded = hasher.hash(PASSWORD)
+    print(f"{args.logins} gleichzeitige Logins, {encoded.rsplit('$', 2)[0]}, {cores} Kern(e):")
+
+    start = time.perf_counter()
+    for _ in range(10000):
+        hashlib.sha256(PASSWORD.encode()).hexdigest()
+    print(f"  {'SHA-256 ohne Salt (bisher)':<30} {10000 / (time.perf_counter() - start):>12,.0f} Logins/s")
+
+    rate, latency = measure(hasher, 0, max(1, args.logins // 8), encoded)
+    print(f"  {'im aufrufenden Thread':<30} {rate:>12,.1f} Logins/s")
+    single = None
+    for workers in args.workers:
+        rate, latency = measure(hasher, workers, args.logins, encoded)
+        single = single or rate
+        print(f"  {f'{workers} Prozess(e)':<30} {rate:>12,.1f} Logins/s  (Ø Wartezeit {latency:.0f} ms,"
+              f" {rate / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
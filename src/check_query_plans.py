@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prüft die Abfragepläne aller Produktionsabfragen
+Baut eine frische Datenbank aus schema.sql + Migrationen, zeichnet die SQL-Befehle
+von QuizDatabase auf, nimmt die Anweisungen aller Trigger dazu und meldet jeden
+vollständigen Tabellenscan (Exit-Code 1). tests/test_query_plans.py prüft
+dieselben Abfragen einzeln mit pytest.
+
+Aufruf: python check_query_plans.py
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+from answer_journal import ADD_SCORE, INSERT_HISTORY
+from db_pool import apply_migrations
+from leaderboard import FOLD_DAYS, FOLD_TOTALS
+import player_history
+from quiz_client import QuizDatabase
+from quiz_manager import question_page_query
+from question_stats import FOLD_ANSWERS, FOLD_QUESTIONS, answer_distribution
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'schema.sql')
+
+# Kleine Nachschlagetabellen dürfen komplett gelesen werden
+SMALL_TABLES = {'Kategorie', 'Schwierigkeitsgrad', 'Konfiguration', 'Aenderungszaehler', 'Massenimport'}
+
+
+def normalize(sql):
+    """Vergleichsform einer Abfrage: Leerraum zusammengefasst, Literale als ?
+
+    Der Trace enthält die Parameter eingesetzt (z.B. Tag >= '2024-01-01'),
+    die Liste bekannter Scans soll aber genau eine Anweisung beschreiben.
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'(?<![\w.])\d+(?:\.\d+)?\b', '?', sql)
+    return ' '.join(sql.split())
+
+
+# Bewusste Komplettlesungen: genau diese Anweisungen (verglichen per normalize()) -> Begründung
+KNOWN_FULL_SCANS = {normalize(sql): reason for sql, reason in (
+    ("""
+        SELECT SpielerID, SpieleGespielt, DuelleGewonnen, AntwortenGesamt, AntwortenRichtig
+        FROM SpielerStatistik
+    """, "Neuberechnung der Statistik (Wartungsbefehl)"),
+    ("""
+        SELECT
+            s.SpielerID,
+            (SELECT COUNT(DISTINCT t.SpielID) FROM Teilnahme t WHERE t.SpielerID = s.SpielerID),
+            (SELECT COUNT(*) FROM Teilnahme t1 JOIN Spiel sp ON sp.SpielID = t1.SpielID
+             WHERE t1.SpielerID = s.SpielerID AND sp.EndZeit IS NOT NULL
+             AND t1.EndScore = (SELECT MAX(t2.EndScore) FROM Teilnahme t2 WHERE t2.SpielID = t1.SpielID)
+             AND (SELECT COUNT(*) FROM Teilnahme t3 WHERE t3.SpielID = t1.SpielID) > 1),
+            (SELECT COUNT(*) FROM SpielHistorie h WHERE h.SpielerID = s.SpielerID),
+            (SELECT COUNT(*) FROM SpielHistorie h WHERE h.SpielerID = s.SpielerID AND h.WarKorrekt = 1)
+        FROM Spieler s
+    """, "Neuberechnung der Statistik (Wartungsbefehl)"),
+    (FOLD_TOTALS, "Zwei feste Zeilen (einzeln/alle), Historie nur neue IDs"),
+    ("""
+        SELECT f.FrageID, k.Bezeichnung, f.SchwierigkeitID, s.Bezeichnung, s.LevelWert, f.FrageText,
+               st.AntwortenGesamt, st.AntwortenRichtig, st.OhneAntwort
+        FROM FrageStatistik st
+        JOIN Frage f ON f.FrageID = st.FrageID
+        JOIN Kategorie k ON k.KategorieID = f.KategorieID
+        JOIN Schwierigkeitsgrad s ON s.SchwierigkeitID = f.SchwierigkeitID
+        WHERE st.AntwortenGesamt > 0
+    """, "Auswertung über alle gespielten Fragen (Manager/Wartung)"),
+    ("""
+        SELECT Punkte, w.SpielerID, s.Username, w.Punkte, w.Antworten, w.Richtige
+        FROM (
+            SELECT SpielerID, SUM(Punkte) AS Punkte, SUM(AntwortenGesamt) AS Antworten,
+                   SUM(AntwortenRichtig) AS Richtige
+            FROM RanglisteTag
+            WHERE Tag >= ?
+            GROUP BY +SpielerID
+        ) w
+        JOIN Spieler s ON s.SpielerID = w.SpielerID
+        ORDER BY Punkte DESC, w.SpielerID
+        LIMIT ?
+    """, "Rangliste über N Tage summiert die Tageswerte (zwischengespeichert)"),
+    ("SELECT FrageID, FrageText, KategorieID, SchwierigkeitID FROM Frage ORDER BY FrageID",
+     "Fragen-Snapshot wird nur nach Änderungen neu gebaut"),
+    ("SELECT FrageID, 1 - IstRichtig, AntwortID, AntwortText FROM Antwort",
+     "Fragen-Snapshot wird nur nach Änderungen neu gebaut"),
+)}
+
+# Abfragen aus quiz_manager.py (laufen dort über den DbWorker)
+MANAGER_QUERIES = [
+    ("INSERT INTO Kategorie (Bezeichnung) VALUES (?)", ('Neu',)),
+    ("DELETE FROM Kategorie WHERE KategorieID=?", (99,)),
+    ("INSERT INTO Frage (FrageText, KategorieID, SchwierigkeitID) VALUES (?, ?, ?)", ('Text', 1, 1)),
+    # Seiten der Fragenliste mit allen Filterkombinationen
+    question_page_query(),
+    question_page_query(10, category_id=1),
+    question_page_query(10, difficulty_id=1),
+    question_page_query(10, category_id=1, difficulty_id=1),
+    question_page_query(10, text="Frage"),
+    question_page_query(10, category_id=1, text="Frage"),
+    question_page_query(10, category_id=1, difficulty_id=1, text="Frage Antwort"),
+    ("DELETE FROM Frage WHERE FrageID=?", (1,)),
+    ("INSERT INTO Antwort (AntwortText, IstRichtig, FrageID) VALUES (?, ?, ?)", ('A', 1, 1)),
+    ("SELECT AntwortText, IstRichtig FROM Antwort WHERE FrageID=?", (1,)),
+]
+
+# Schreibzugriffe des Antwort-Journals (laufen in dessen eigenem Thread) und der Verdichtung
+JOURNAL_QUERIES = [
+    (INSERT_HISTORY, (1, 1, 1, 1, 1, 1)),
+    (ADD_SCORE, (10, 1, 1)),
+    (FOLD_TOTALS, (0, 1)),
+    (FOLD_DAYS, (0, 1)),
+    (FOLD_QUESTIONS, (0, 1)),
+    (FOLD_ANSWERS, (0, 1)),
+]
+
+
+def create_database(path):
+    """Frische Datenbank mit etwas Beispielinhalt"""
+    conn = sqlite3.connect(path)
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+    apply_migrations(conn)
+    conn.execute("INSERT INTO Kategorie (Bezeichnung) VALUES ('Test')")
+    for nr in range(20):
+        cursor = conn.execute(
+            "INSERT INTO Frage (FrageText, KategorieID, SchwierigkeitID) VALUES (?, 1, 1)",
+            (f"Frage {nr}",)
+        )
+        for a_nr in range(4):
+            conn.execute(
+                "INSERT INTO Antwort (AntwortText, IstRichtig, FrageID) VALUES (?, ?, ?)",
+                (f"Antwort {a_nr}", int(a_nr == 0), cursor.lastrowid)
+            )
+    conn.commit()
+    conn.close()
+
+
+def record_client_queries(db):
+    """Ruft alle QuizDatabase-Methoden auf und zeichnet die SQL-Befehle auf"""
+    statements = []
+    db.pool.get_connection().set_trace_callback(statements.append)
+
+    db.register_user("alice", "geheim")
+    db.register_user("bob", "geheim")
+    db.login_user("alice", "geheim")
+    session = db.create_session("alice", "geheim")
+    db.get_session_player(session['session_key'])
+    db.get_session_player("unbekannt")
+    # Rückschreiben und Aufräumen laufen sonst im Session-Thread
+    db.sessions.flush()
+    db.sessions.expire()
+    db.get_player("bob")
+    db.get_categories()
+    db.get_difficulties()
+    db.get_game_config()
+    game_id = db.create_game([1, 2], 1, config_id=1)
+    question = db.get_random_question(1, 1, [], game_id=game_id)
+    db.get_random_question(1, 1, [question['id']])
+    db.get_round_questions(1, 1, 3, [question['id']], game_id=game_id)
+    planned_id = db.create_game([1], 1, category_id=1)
+    db.create_game([1, 2], 1, category_id=1, adaptive=True)
+    db.join_game(planned_id, 2)
+    db.get_game_plan(planned_id)
+    db.get_planned_question(planned_id, 0)
+    db.save_answer(game_id, 1, question['id'], question['correct_id'], True, 1)
+    db.save_answer(game_id, 2, question['id'], None, False, 1)
+    db.get_game_scores(game_id)
+    db.get_game_players(game_id)
+    db.get_player_score(game_id, 1)
+    db.is_game_finished(game_id)
+    db.finish_game(game_id)
+    db.get_user_statistics(1)
+    for by in ('points', 'accuracy', 'duels'):
+        db.get_leaderboard(by)
+        db.get_leaderboard(by, limit=1, offset=1)
+    db.get_leaderboard('points', category_id=1, difficulty_id=1)
+    db.get_leaderboard('points', days=7)
+    db.get_leaderboard('points', limit=1, offset=1, days=7)
+    db.get_player_rank(1)
+    db.get_player_rank(1, 'accuracy', category_id=1)
+    db.get_question_report()
+    db.get_question_report(only_flagged=True, category_id=1)
+    answer_distribution(db.pool.get_connection(), question['id'])
+    # Bitmaps schreibt sonst nur der Journal-Thread fort
+    with db.pool.connection() as conn:
+        player_history.rebuild(conn.conn)
+    db.rebuild_user_statistics()
+    db.search_users()
+    db.search_users("al", exclude_id=2)
+    db.search_users("", exclude_id=1, after=(1, "alice"))
+    db.search_users("b", after=(2, "bob"), limit=5)
+    db.search_questions("frage antwort")
+    db.search_questions("frage", category_id=1)
+    db.find_similar_questions("Frage 3")
+    db.get_unplayable_questions()
+    db.get_unplayable_questions(4, category_id=1)
+    db.get_question_bank_stats()
+    db.export_question_bank()
+
+    db.pool.get_connection().set_trace_callback(None)
+    return statements
+
+
+def trigger_queries(conn):
+    """Anweisungen aller Trigger als (Name, SQL) zum Prüfen per EXPLAIN
+
+    NEW.x/OLD.x werden zu Parametern, die WHEN-Bedingung zu einem SELECT.
+    """
+    queries = []
+    for name, sql in conn.execute("SELECT name, sql FROM sqlite_master WHERE type='trigger' ORDER BY name"):
+        head, _, body = re.split(r'\b(BEGIN)\b', sql, maxsplit=1, flags=re.I)
+        body = re.sub(r'\bEND\s*$', '', body.strip(), flags=re.I)
+        parts = []
+        when = re.search(r'\bWHEN\b(.*)$', head, re.I | re.S)
+        if when:
+            parts.append("SELECT " + when.group(1))
+        parts.extend(statement for statement in body.split(';') if statement.strip())
+        for nr, statement in enumerate(parts):
+            queries.append((f"{name}#{nr}", re.sub(r'\b(?:NEW|OLD)\.\w+', '?', statement, flags=re.I)))
+    return queries
+
+
+def collect_queries(db_path):
+    """Alle zu prüfenden Abfragen als (Bezeichnung, SQL, Parameter), je Anweisung einmal"""
+    db = QuizDatabase(db_path)
+    try:
+        statements = record_client_queries(db)
+    finally:
+        db.close()
+
+    conn = sqlite3.connect(db_path)
+    triggers = trigger_queries(conn)
+    conn.close()
+
+    candidates = (
+        [(f"client {nr}", sql, ()) for nr, sql in enumerate(statements)]
+        + [(f"manager {nr}", sql, params) for nr, (sql, params) in enumerate(MANAGER_QUERIES)]
+        + [(f"journal {nr}", sql, params) for nr, (sql, params) in enumerate(JOURNAL_QUERIES)]
+        + [(f"trigger {name}", sql, (None,) * sql.count('?')) for name, sql in triggers]
+    )
+    queries = []
+    seen = set()
+    for label, sql, params in candidates:
+        stripped = sql.strip()
+        if not stripped or stripped.startswith('--') or re.match(r'(PRAGMA|BEGIN|COMMIT|ROLLBACK)\b', stripped, re.I):
+            continue
+        normalized = normalize(stripped)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        queries.append((label, sql, params))
+    return queries
+
+
+def table_aliases(sql):
+    """Ordnet Aliasnamen (FROM Frage f) den Tabellennamen zu"""
+    aliases = {}
+    for table, alias in re.findall(r'(?:FROM|JOIN|UPDATE|INTO)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', sql, re.I):
+        aliases[table] = table
+        if alias and alias.upper() not in ('WHERE', 'JOIN', 'ON', 'SET', 'ORDER', 'GROUP', 'LEFT', 'INNER', 'VALUES'):
+            aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql, params=()):
+    """Liefert die Tabellen, die laut Abfrageplan komplett gelesen werden
+
+    Auch ein Scan über einen (deckenden) Index liest alle Zeilen und zählt mit.
+    """
+    aliases = table_aliases(sql)
+    scans = []
+    for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params):
+        detail = row[-1]
+        match = re.match(r'SCAN (\w+)( USING .*)?$', detail.strip())
+        if match and match.group(1) != 'CONSTANT':
+            scans.append(aliases.get(match.group(1), match.group(1)))
+    return scans
+
+
+def plan_failure(conn, sql, params=()):
+    """Fehlermeldung für einen unerwarteten Tabellenscan, sonst None"""
+    scanned = [t for t in full_scans(conn, sql, params) if t not in SMALL_TABLES]
+    if not scanned or normalize(sql) in KNOWN_FULL_SCANS:
+        return None
+    return f"Tabellenscan auf {', '.join(scanned)}: {normalize(sql)}"
+
+
+def unindexed_foreign_keys(conn):
+    """Fremdschlüssel ohne Index, dessen erste Spalte die FK-Spalte ist"""
+    missing = []
+    tables = [r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"
+    )]
+    for table in tables:
+        # INTEGER PRIMARY KEY ist die rowid und damit immer indiziert
+        indexed = {col[1] for col in conn.execute(f"PRAGMA table_info({table})") if col[5] == 1}
+        for index in conn.execute(f"PRAGMA index_list({table})"):
+            first = conn.execute(f"PRAGMA index_info({index[1]})").fetchone()
+            if first:
+                indexed.add(first[2])
+        for fk in conn.execute(f"PRAGMA foreign_key_list({table})"):
+            if fk[3] not in indexed:
+                missing.append(f"{table}.{fk[3]} -> {fk[2]}")
+    return missing
+
+
+def check(db_path):
+    failures = []
+    queries = collect_queries(db_path)
+    conn = sqlite3.connect(db_path)
+    used = set()
+    for _, sql, params in queries:
+        normalized = normalize(sql)
+        failure = plan_failure(conn, sql, params)
+        if failure:
+            failures.append(failure)
+        elif normalized in KNOWN_FULL_SCANS:
+            used.add(normalized)
+            print(f"  [bekannt] {KNOWN_FULL_SCANS[normalized]}: {normalized[:90]}")
+
+    # Veraltete Einträge würden sonst eine spätere, andere Abfrage durchlassen
+    for normalized in KNOWN_FULL_SCANS.keys() - used:
+        failures.append(f"Bekannter Scan kommt nicht mehr vor: {normalized}")
+    for fk in unindexed_foreign_keys(conn):
+        failures.append(f"Fremdschlüssel ohne Index: {fk}")
+    conn.close()
+
+    print(f"{len(queries)} Abfragen geprüft")
+    return failures
+
+
+def main():
+    """Hauptfunktion"""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "plan_check.db")
+        create_database(db_path)
+        failures = check(db_path)
+
+    if failures:
+        print("\nFEHLER:")
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print("✅ Keine vollständigen Tabellenscans")
+
+
+if __name__ == "__main__":
+    main()
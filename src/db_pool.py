@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Connection-Pool für die Quiz-Datenbank
+Hält pro Thread eine langlebige SQLite-Verbindung offen
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'migrations')
+
+
+def _split_statements(script):
+    """Zerlegt ein SQL-Skript in einzelne Anweisungen (Trigger bleiben zusammen)"""
+    statements = []
+    current = ""
+    for line in script.splitlines(keepends=True):
+        current += line
+        if sqlite3.complete_statement(current):
+            if current.strip():
+                statements.append(current)
+            current = ""
+    if current.strip() and not current.strip().startswith('--'):
+        statements.append(current)
+    return statements
+
+
+def apply_migrations(conn, migrations_dir=MIGRATIONS_DIR):
+    """Spielt fehlende Migrationen (NNN_name.sql) ein, Stand steht in PRAGMA user_version
+
+    Läuft in einer IMMEDIATE-Transaktion, damit parallel startende Programme
+    eine Migration nicht doppelt ausführen.
+    """
+    if not os.path.isdir(migrations_dir):
+        return 0
+
+    migrations = []
+    for name in sorted(os.listdir(migrations_dir)):
+        if name.endswith('.sql') and name[:3].isdigit():
+            migrations.append((int(name[:3]), os.path.join(migrations_dir, name)))
+
+    # Schnelltest ohne Schreibsperre
+    current = conn.execute("PRAGMA user_version").fetchone()[0]
+    if all(number <= current for number, _ in migrations):
+        return 0
+
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        current = conn.execute("PRAGMA user_version").fetchone()[0]
+        applied = 0
+        for number, path in migrations:
+            if number <= current:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                script = f.read()
+            for statement in _split_statements(script):
+                conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {number}")
+            applied += 1
+        conn.commit()
+        return applied
+    except BaseException:
+        conn.rollback()
+        raise
+
+
+def fold_history(conn, area, statements):
+    """Verdichtet neue SpielHistorie-Zeilen in Auswertungstabellen (True, wenn es welche gab)
+
+    Der Stand (höchste verarbeitete HistorieID) steht je area in Verarbeitungsstand.
+    Jede Anweisung in statements bekommt die Grenzen (untere, obere HistorieID] als
+    Parameter; statt SQL geht auch eine Funktion f(conn, untere, obere). Läuft in
+    der Transaktion des Aufrufers; ist nichts offen, bleibt es bei einem Lesezugriff.
+    """
+    mark = "SELECT HistorieID FROM Verarbeitungsstand WHERE Bereich = ?"
+    newest = "SELECT COALESCE(MAX(HistorieID), 0) FROM SpielHistorie"
+    if conn.execute(newest).fetchone()[0] <= conn.execute(mark, (area,)).fetchone()[0]:
+        return False
+
+    # Erst die Schreibsperre, dann den Stand lesen: zwei Verbindungen dürfen
+    # denselben Bereich nicht doppelt verdichten
+    conn.execute("UPDATE Verarbeitungsstand SET HistorieID = HistorieID WHERE Bereich = ?", (area,))
+    low = conn.execute(mark, (area,)).fetchone()[0]
+    high = conn.execute(newest).fetchone()[0]
+    if high <= low:
+        return False
+    for statement in statements:
+        if callable(statement):
+            statement(conn, low, high)
+        else:
+            conn.execute(statement, (low, high))
+    conn.execute("UPDATE Verarbeitungsstand SET HistorieID = ? WHERE Bereich = ?", (high, area))
+    return True
+
+
+class PooledConnection:
+    """Handle auf die Thread-Verbindung (gleiche Attribute wie früher DatabaseConnection)"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.cursor = conn.cursor()
+
+
+class ConnectionPool:
+    """Verwaltet genau eine SQLite-Verbindung pro Thread"""
+
+    # Werden beim Öffnen jeder Verbindung einmalig gesetzt
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL",
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA foreign_keys=ON",
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA cache_size=-8000",
+        "PRAGMA busy_timeout=5000",
+    )
+
+    def __init__(self, db_path, cached_statements=256, migrations_dir=MIGRATIONS_DIR):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        self.migrations_dir = migrations_dir
+        self._migrated = False
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []  # (Thread, Verbindung)
+        self.opened = 0
+        self.reused = 0
+
+    def _open(self):
+        """Öffnet eine neue Verbindung und setzt die Pragmas"""
+        # check_same_thread=False nur, damit close_all() aus einem anderen
+        # Thread schließen darf - benutzt wird jede Verbindung von genau einem Thread
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=self.cached_statements
+        )
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+
+        with self._lock:
+            if not self._migrated:
+                apply_migrations(conn, self.migrations_dir)
+                self._migrated = True
+            self._prune_dead_threads()
+            self._connections.append((threading.current_thread(), conn))
+            self.opened += 1
+        return conn
+
+    def _prune_dead_threads(self):
+        """Schließt Verbindungen von beendeten Threads (Lock muss gehalten werden)"""
+        alive = []
+        for thread, conn in self._connections:
+            if thread.is_alive():
+                alive.append((thread, conn))
+            else:
+                conn.close()
+        self._connections = alive
+
+    def get_connection(self):
+        """Liefert die Verbindung des aktuellen Threads (öffnet sie bei Bedarf)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.depth = 0
+        else:
+            with self._lock:
+                self.reused += 1
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Transaktion auf der Thread-Verbindung
+
+        Verschachtelte Aufrufe teilen sich die Transaktion, nur der äußerste
+        Block macht commit bzw. rollback.
+        """
+        conn = self.get_connection()
+        local = self._local
+        local.depth += 1
+        try:
+            yield PooledConnection(conn)
+        except BaseException:
+            local.depth -= 1
+            if local.depth == 0:
+                conn.rollback()
+            raise
+        else:
+            local.depth -= 1
+            if local.depth == 0:
+                conn.commit()
+
+    def stats(self):
+        """Zähler für geöffnete und wiederverwendete Verbindungen"""
+        with self._lock:
+            return {
+                'opened': self.opened,
+                'reused': self.reused,
+                'open_connections': len(self._connections)
+            }
+
+    def close_all(self):
+        """Schließt alle Verbindungen (z.B. beim Beenden der Anwendung)"""
+        with self._lock:
+            for thread, conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Datenbank-Worker für die Tk-Oberflächen
+Führt Datenbankaufrufe in einem Hintergrund-Thread aus und ruft die
+Callbacks wieder in der Tk-Ereignisschleife auf (über root.after)
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+class DbWorker:
+    """Brücke zwischen Tk-Ereignisschleife und Datenbank-Thread
+
+    Mit einem Worker-Thread (Standard) werden die Aufträge in der Reihenfolge
+    ausgeführt, in der sie abgeschickt wurden - z.B. save_answer vor get_game_scores.
+    """
+
+    def __init__(self, root, workers=1, poll_ms=10, frame_budget_ms=16, monitor_ms=None):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.frame_budget_ms = frame_budget_ms
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="quiz-db")
+        self.results = queue.Queue()
+
+        self._lock = threading.Lock()
+        self._polling = False
+        self.pending = 0
+        self.max_queue_depth = 0
+        self.latencies = {}  # Name -> letzte Gesamtlatenzen in ms
+        self.callback_stalls = 0
+        self.max_callback_ms = 0.0
+        self.max_ui_lag_ms = 0.0
+
+        if monitor_ms:
+            self._monitor(monitor_ms, time.perf_counter())
+
+    def submit(self, func, *args, callback=None, errback=None, name=None):
+        """Führt func(*args) im Hintergrund aus
+
+        callback(result) bzw. errback(exception) laufen danach im Tk-Thread.
+        Muss aus dem Tk-Thread aufgerufen werden.
+        """
+        name = name or getattr(func, '__name__', 'query')
+        with self._lock:
+            self.pending += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.pending)
+        submitted = time.perf_counter()
+        future = self.executor.submit(self._run, func, args, callback, errback, name, submitted)
+        self._ensure_polling()
+        return future
+
+    def _run(self, func, args, callback, errback, name, submitted):
+        """Läuft im Worker-Thread"""
+        started = time.perf_counter()
+        try:
+            result, error = func(*args), None
+        except Exception as e:
+            result, error = None, e
+        finished = time.perf_counter()
+        self.results.put((callback, errback, result, error, name, submitted, started, finished))
+        if error is not None:
+            raise error
+        return result
+
+    def _ensure_polling(self):
+        if not self._polling:
+            self._polling = True
+            self.root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Liefert fertige Ergebnisse im Tk-Thread aus"""
+        while True:
+            try:
+                item = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self._deliver(*item)
+
+        with self._lock:
+            idle = self.pending == 0
+        if idle:
+            self._polling = False
+        else:
+            self.root.after(self.poll_ms, self._poll)
+
+    def _deliver(self, callback, errback, result, error, name, submitted, started, finished):
+        with self._lock:
+            self.pending -= 1
+            history = self.latencies.setdefault(name, deque(maxlen=500))
+            history.append({
+                'wait_ms': (started - submitted) * 1000,
+                'query_ms': (finished - started) * 1000,
+                'total_ms': (time.perf_counter() - submitted) * 1000,
+            })
+
+        handler = errback if error is not None else callback
+        if handler is None:
+            if error is not None:
+                logger.error("Datenbankfehler in %s", name, exc_info=error)
+            return
+
+        begin = time.perf_counter()
+        handler(error if error is not None else result)
+        elapsed = (time.perf_counter() - begin) * 1000
+        self.max_callback_ms = max(self.max_callback_ms, elapsed)
+        if elapsed > self.frame_budget_ms:
+            self.callback_stalls += 1
+
+    def _monitor(self, interval_ms, last):
+        """Misst, wie stark Timer-Ereignisse verspätet ausgeführt werden (UI-Hänger)"""
+        now = time.perf_counter()
+        lag = (now - last) * 1000 - interval_ms
+        self.max_ui_lag_ms = max(self.max_ui_lag_ms, lag)
+        self.root.after(interval_ms, self._monitor, interval_ms, now)
+
+    def stats(self):
+        """Queue-Tiefe, Latenzen je Abfrage und UI-Hänger"""
+        with self._lock:
+            queries = {}
+            for name, history in self.latencies.items():
+                totals = sorted(entry['total_ms'] for entry in history)
+                queries[name] = {
+                    'count': len(totals),
+                    'p50_ms': totals[len(totals) // 2],
+                    'p95_ms': totals[min(len(totals) - 1, int(len(totals) * 0.95))],
+                    'max_query_ms': max(entry['query_ms'] for entry in history),
+                }
+            return {
+                'queue_depth': self.pending,
+                'max_queue_depth': self.max_queue_depth,
+                'queries': queries,
+                'callback_stalls': self.callback_stalls,
+                'max_callback_ms': self.max_callback_ms,
+                'max_ui_lag_ms': self.max_ui_lag_ms,
+                'frame_budget_ms': self.frame_budget_ms,
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Spiel-Engine für Einzelspiele und Duelle
+Hält laufende Spiele im Speicher. Alle Spieler eines Spiels gehen denselben
+Spielplan durch und geben ihre Antworten unabhängig voneinander ab; die Punkte
+werden in der Datenbank atomar hochgezählt (Antwort-Journal) und über einen
+Ereignisbus an alle Teilnehmer verteilt. Spiele ohne Aktivität seit
+IDLE_TIMEOUT_SEC werden abgebrochen und aus dem Speicher entfernt.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future
+
+
+# Laufende Spiele ohne Abruf oder Abgabe so lange im Speicher halten
+IDLE_TIMEOUT_SEC = 30 * 60
+
+logger = logging.getLogger(__name__)
+
+
+class DuelError(Exception):
+    """Ungültiger Spielzug; reason ist einer der Werte unten"""
+
+    NOT_FOUND = 'not_found'
+    NOT_PLAYER = 'not_player'
+    ALL_ANSWERED = 'all_answered'
+    NO_QUESTIONS = 'no_questions'
+    NOT_OPEN = 'not_open'
+    INVALID_ANSWER = 'invalid_answer'
+    NOT_INVITED = 'not_invited'
+
+    def __init__(self, reason, message):
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+
+class EventBus:
+    """Einfacher Publish/Subscribe-Bus innerhalb des Prozesses
+
+    Callbacks laufen im Thread des Absenders (meist der Schreib-Thread des
+    Journals). Oberflächen reichen Ereignisse daher über eine Queue weiter.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, topic, callback):
+        """Meldet callback(event) für topic an und liefert eine Abmelde-Funktion"""
+        with self._lock:
+            self._subscribers.setdefault(topic, []).append(callback)
+
+        def unsubscribe():
+            with self._lock:
+                callbacks = self._subscribers.get(topic, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._subscribers.pop(topic, None)
+        return unsubscribe
+
+    def publish(self, topic, event):
+        with self._lock:
+            callbacks = list(self._subscribers.get(topic, ()))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception:
+                # Ein fehlerhafter Empfänger darf die anderen nicht aufhalten
+                logger.exception("Fehler im Ereignis-Empfänger für %s", topic)
+
+
+class GameSession:
+    """Laufzustand eines Spiels (Einzel oder Duell)
+
+    Fortschritt und offene Frage gehören jeweils einem Spieler; die Engine
+    ändert sie unter ihrer Sperre (auch ein fehlgeschlagener Commit setzt sie
+    aus dem Journal-Thread zurück). scores ist der zuletzt bestätigte Stand aus
+    der Datenbank. invited sind eingeladene Spieler, die noch nicht beigetreten
+    sind (DuelEngine.join); solange es welche gibt, ist das Spiel nicht fertig.
+    """
+
+    def __init__(self, game_id, players, category_id, difficulty_id, config, questions, invited=()):
+        self.game_id = game_id
+        self.player_ids = [player_id for player_id, _ in players]
+        self.names = dict(players)
+        self.category_id = category_id
+        self.difficulty_id = difficulty_id
+        self.config = config
+        self.max_questions = config['rounds'] * config['questions_per_round']
+
+        # Spielplan aus create_game: alle Spieler bekommen dieselbe Fragenfolge
+        self.questions = questions
+        self.progress = {player_id: 0 for player_id in self.player_ids}
+        self.pending = {}
+        self.scores = {player_id: 0 for player_id in self.player_ids}
+        self.invited = set(invited)
+        self.finished = False
+        self.last_activity = time.monotonic()
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+
+    def add_player(self, player_id, name):
+        """Nimmt einen beigetretenen Spieler auf (beginnt bei der ersten Frage)"""
+        self.names[player_id] = name
+        self.progress[player_id] = 0
+        self.scores[player_id] = 0
+        self.player_ids.append(player_id)
+
+    def round_nr(self, index):
+        """Rundennummer (1-basiert) für die Frage an Position index"""
+        return index // self.config['questions_per_round'] + 1
+
+    def player_done(self, player_id):
+        return self.progress[player_id] >= min(self.max_questions, len(self.questions))
+
+    def all_done(self):
+        return not self.invited and all(self.player_done(player_id) for player_id in list(self.player_ids))
+
+    def score_list(self):
+        """[(Username, Punkte), ...] absteigend wie get_game_scores"""
+        return sorted(
+            ((self.names[player_id], score) for player_id, score in list(self.scores.items())),
+            key=lambda entry: -entry[1]
+        )
+
+
+class DuelEngine:
+    """Verwaltet laufende Spiele und verteilt Punktestände über den EventBus
+
+    Ereignisse (Topic = SpielID):
+      {'type': 'score', 'player_id', 'score', 'correct', 'position'}
+      {'type': 'joined', 'player_id', 'username'}
+      {'type': 'finished', 'scores': [(Username, Punkte), ...]}
+      {'type': 'cancelled', 'message'}
+    """
+
+    def __init__(self, db, bus=None, idle_timeout=IDLE_TIMEOUT_SEC):
+        self.db = db
+        self.bus = bus or EventBus()
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self.games = {}
+
+    def create(self, player_ids, category_id, difficulty_id, config_id=1, invited_ids=(), adaptive=False):
+        """Legt ein Spiel samt Spielplan an (blockiert, im Worker-Thread aufrufen)
+
+        invited_ids nehmen erst teil, wenn sie mit join() beitreten. adaptive
+        siehe QuizDatabase.create_game.
+        """
+        # Neue Spiele sind das Einzige, was den Speicher wachsen lässt
+        self.reap_idle()
+        config = self.db.get_game_config(config_id)
+        if config is None:
+            raise DuelError(DuelError.NOT_FOUND, f"Konfiguration {config_id} nicht gefunden")
+        game_id = self.db.create_game(player_ids, difficulty_id, config_id, category_id, adaptive)
+        questions = self.db.get_game_plan(game_id)
+        players = self.db.get_game_players(game_id)
+        session = GameSession(game_id, players, category_id, difficulty_id, config, questions, invited_ids)
+        with self._lock:
+            self.games[game_id] = session
+        return session
+
+    def join(self, session, player_id):
+        """Eingeladener Spieler tritt bei (blockiert, im Worker-Thread aufrufen)"""
+        with self._lock:
+            if player_id not in session.invited or session.finished:
+                raise DuelError(DuelError.NOT_INVITED, "Keine offene Einladung für dieses Spiel")
+            # Vorab austragen, damit ein doppelter Beitritt nicht zwei Teilnahmen anlegt
+            session.invited.discard(player_id)
+        try:
+            name = self.db.join_game(session.game_id, player_id)
+        except BaseException:
+            with self._lock:
+                session.invited.add(player_id)
+            raise
+        with self._lock:
+            session.add_player(player_id, name)
+            session.touch()
+        self.bus.publish(session.game_id, {'type': 'joined', 'player_id': player_id, 'username': name})
+
+    def get(self, game_id, player_id=None):
+        """Laufendes Spiel; mit player_id wird zusätzlich die Teilnahme geprüft"""
+        with self._lock:
+            session = self.games.get(game_id)
+        if session is None:
+            raise DuelError(DuelError.NOT_FOUND, "Spiel nicht gefunden oder nicht aktiv")
+        if player_id is not None and player_id not in session.progress:
+            if player_id in session.invited:
+                raise DuelError(DuelError.NOT_PLAYER, "Einladung noch nicht angenommen")
+            raise DuelError(DuelError.NOT_PLAYER, "Kein Teilnehmer dieses Spiels")
+        return session
+
+    def subscribe(self, game_id, callback):
+        return self.bus.subscribe(game_id, callback)
+
+    def next_question(self, session, player_id):
+        """Offene Frage des Spielers (bei erneutem Abruf dieselbe)"""
+        with self._lock:
+            if session.finished:
+                raise DuelError(DuelError.NOT_FOUND, "Spiel nicht gefunden oder nicht aktiv")
+            session.touch()
+            question = session.pending.get(player_id)
+            if question is None:
+                index = session.progress[player_id]
+                if index >= session.max_questions:
+                    raise DuelError(DuelError.ALL_ANSWERED, "Alle Fragen wurden bereits beantwortet")
+                if index >= len(session.questions):
+                    # Spielplan kürzer als das Spiel (zu wenige Fragen im Bestand)
+                    raise DuelError(DuelError.NO_QUESTIONS, "Keine weiteren Fragen verfügbar!")
+                question = session.questions[index]
+                session.pending[player_id] = question
+        return question
+
+    def submit_answer(self, session, player_id, question_id, answer_id):
+        """Gibt eine Antwort ab (answer_id None = Zeit abgelaufen)
+
+        Liefert ein Future mit {'correct', 'correct_id', 'score', 'done'}, das
+        nach dem Commit erfüllt wird. score ist der neue Punktestand aus der
+        Datenbank (UPDATE ... RETURNING), done sagt, ob alle Spieler fertig sind.
+        """
+        with self._lock:
+            if session.finished:
+                raise DuelError(DuelError.NOT_FOUND, "Spiel nicht gefunden oder nicht aktiv")
+            question = session.pending.get(player_id)
+            if question is None or question['id'] != question_id:
+                raise DuelError(DuelError.NOT_OPEN, "Diese Frage ist nicht offen")
+            if answer_id is not None and answer_id not in [a[0] for a in question['answers']]:
+                raise DuelError(DuelError.INVALID_ANSWER, "Antwort gehört nicht zur Frage")
+
+            is_correct = answer_id == question['correct_id']
+            index = session.progress[player_id]
+            # Vor dem Commit austragen, damit doppelte Abgaben nicht zweimal zählen
+            del session.pending[player_id]
+            session.progress[player_id] = index + 1
+            session.touch()
+
+        result = Future()
+        saved = self.db.save_answer_async(
+            session.game_id, player_id, question_id, answer_id, is_correct, session.round_nr(index)
+        )
+
+        def on_saved(saved):
+            error = saved.exception()
+            if error is not None:
+                with self._lock:
+                    # Nur zurücksetzen, solange der Spieler nicht schon weiterspielt
+                    rollback = session.progress[player_id] == index + 1 and player_id not in session.pending
+                    if rollback:
+                        session.pending[player_id] = question
+                        session.progress[player_id] = index
+                if not rollback:
+                    self.cancel(session, "Antwort konnte nicht gespeichert werden")
+                result.set_exception(error)
+                return
+            score = saved.result()
+            session.scores[player_id] = score
+            self.bus.publish(session.game_id, {
+                'type': 'score',
+                'player_id': player_id,
+                'score': score,
+                'correct': is_correct,
+                'position': index
+            })
+            result.set_result({
+                'correct': is_correct,
+                'correct_id': question['correct_id'],
+                'score': score,
+                'done': session.all_done()
+            })
+
+        saved.add_done_callback(on_saved)
+        return result
+
+    def finish(self, session):
+        """Beendet das Spiel in der Datenbank (einmalig, im Worker-Thread aufrufen)"""
+        with self._lock:
+            if session.finished:
+                return
+            session.finished = True
+            self.games.pop(session.game_id, None)
+        self.db.finish_game(session.game_id)
+        self.bus.publish(session.game_id, {'type': 'finished', 'scores': session.score_list()})
+
+    def cancel(self, session, message="Spiel abgebrochen"):
+        """Entfernt ein Spiel ohne Abschluss (EndZeit bleibt leer, gespeicherte Antworten zählen)"""
+        with self._lock:
+            if session.finished:
+                return
+            session.finished = True
+            self.games.pop(session.game_id, None)
+        self.bus.publish(session.game_id, {'type': 'cancelled', 'message': message})
+
+    def reap_idle(self):
+        """Bricht Spiele ab, die seit idle_timeout niemand mehr benutzt hat; liefert ihre Anzahl"""
+        deadline = time.monotonic() - self.idle_timeout
+        with self._lock:
+            idle = [session for session in self.games.values() if session.last_activity < deadline]
+        for session in idle:
+            self.cancel(session, "Spiel wegen Inaktivität abgebrochen")
+        return len(idle)
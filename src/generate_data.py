@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Synthetische Testdaten für Benchmarks
+Baut eine neue Datenbank nach database/schema.sql mit beliebig vielen Fragen,
+Antworten, Spielern, Spielen und Antworten in SpielHistorie. Die Basistabellen
+werden gebündelt ohne Trigger gefüllt, danach legen die Migrationen ihre
+abgeleiteten Tabellen (Statistik, Suchindex, Ranglisten ...) in einem Schritt an.
+Gleicher Seed = gleiche Datenbank, damit Benchmarks zwischen Commits vergleichbar sind.
+
+Aufruf: python generate_data.py ZIEL.db [--questions N] [--players N] [--games N] [--history N] ...
+"""
+
+import argparse
+import hashlib
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+
+from db_pool import apply_migrations
+import leaderboard
+import player_history
+
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database', 'schema.sql')
+
+# Passwort aller erzeugten Spieler (Benutzername spieler_<n>)
+PASSWORD = "passwort"
+
+# Wörter für Frage- und Antworttexte, damit die Volltextsuche echte Treffer hat
+WORDS = (
+    "welche welcher wann wo wer stadt land fluss berg jahr erfinder sprache planet tier "
+    "pflanze farbe spiel film buch lied maler komponist element formel sportart verein "
+    "hauptstadt insel meer kontinent kaiser könig partei gesetz währung instrument"
+).split()
+
+# Trefferquote je LevelWert (Leicht, Mittel, Schwer), je Frage leicht gestreut
+ACCURACY = {1: 0.8, 2: 0.6, 3: 0.4}
+TIMEOUT_SHARE = 0.05
+DUEL_SHARE = 0.3
+
+
+def words(rng, count):
+    return ' '.join(rng.choice(WORDS) for _ in range(count))
+
+
+def generate(path, questions=2000, answers=4, categories=10, players=1000, games=5000,
+             history=100000, days=30, seed=1, batch_size=10000):
+    """Legt die Datenbank path neu an und liefert die Anzahl Zeilen je Tabelle"""
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    with open(SCHEMA_FILE, 'r', encoding='utf-8') as f:
+        conn.executescript(f.read())
+
+    # Kategorien, Fragen und Antworten (IDs fortlaufend ab 1)
+    conn.executemany(
+        "INSERT INTO Kategorie (Bezeichnung) VALUES (?)",
+        [(f"Kategorie {nr + 1}",) for nr in range(categories)]
+    )
+    levels = dict(conn.execute("SELECT SchwierigkeitID, LevelWert FROM Schwierigkeitsgrad"))
+    difficulty_ids = sorted(levels)
+
+    pools = {}
+    answer_ids = {}
+    difficulty = {}
+    question_rows = []
+    answer_rows = []
+    answer_id = 0
+    for question_id in range(1, questions + 1):
+        key = (rng.randint(1, categories), rng.choice(difficulty_ids))
+        pools.setdefault(key, []).append(question_id)
+        difficulty[question_id] = min(0.95, max(0.1, ACCURACY.get(levels[key[1]], 0.5) + rng.uniform(-0.15, 0.15)))
+        question_rows.append((question_id, f"Frage {question_id}: {words(rng, 6)}?", key[0], key[1]))
+        ids = []
+        for nr in range(answers):
+            answer_id += 1
+            ids.append(answer_id)
+            answer_rows.append((answer_id, words(rng, 2), int(nr == 0), question_id))
+        answer_ids[question_id] = ids
+    conn.executemany(
+        "INSERT INTO Frage (FrageID, FrageText, KategorieID, SchwierigkeitID) VALUES (?, ?, ?, ?)", question_rows
+    )
+    conn.executemany(
+        "INSERT INTO Antwort (AntwortID, AntwortText, IstRichtig, FrageID) VALUES (?, ?, ?, ?)", answer_rows
+    )
+
+    # Altes SHA-256-Format: scrypt für zehntausende Spieler dauerte Stunden,
+    # beim ersten Login wird der Hash ohnehin ersetzt
+    password_hash = hashlib.sha256(PASSWORD.encode()).hexdigest()
+    conn.executemany(
+        "INSERT INTO Spieler (SpielerID, Username, PasswortHash) VALUES (?, ?, ?)",
+        [(nr, f"spieler_{nr}", password_hash) for nr in range(1, players + 1)]
+    )
+
+    # Spiele mit ein oder zwei Teilnehmern, Antworten gleichmäßig auf die Spiele verteilt
+    now = datetime.now().replace(microsecond=0)
+    keys = list(pools)
+    per_game, extra = divmod(history, games) if games else (0, 0)
+    game_rows, seat_rows, history_rows = [], [], []
+
+    def flush():
+        conn.executemany(
+            "INSERT INTO Spiel (SpielID, StartZeit, EndZeit, KonfigID, GewaehlteSchwierigkeitID) VALUES (?, ?, ?, 1, ?)",
+            game_rows
+        )
+        conn.executemany("INSERT INTO Teilnahme (SpielID, SpielerID, EndScore) VALUES (?, ?, ?)", seat_rows)
+        conn.executemany("""
+            INSERT INTO SpielHistorie
+            (SpielID, SpielerID, FrageID, RundeNr, GegebeneAntwortID, WarKorrekt, Zeitstempel)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, history_rows)
+        game_rows.clear()
+        seat_rows.clear()
+        history_rows.clear()
+
+    for game_id in range(1, games + 1):
+        key = rng.choice(keys)
+        pool = pools[key]
+        seats = rng.sample(range(1, players + 1), 2 if players > 1 and rng.random() < DUEL_SHARE else 1)
+        start = now - timedelta(seconds=rng.randrange(days * 86400))
+        count = per_game + (1 if game_id <= extra else 0)
+        scores = dict.fromkeys(seats, 0)
+        # Im Duell beantworten beide dieselben Fragen (wie beim Spielplan)
+        plan = rng.sample(pool, min(len(pool), -(-count // len(seats))))
+        for position in range(count):
+            player_id = seats[position % len(seats)]
+            question_id = plan[(position // len(seats)) % len(plan)]
+            if rng.random() < TIMEOUT_SHARE:
+                given, correct = None, 0
+            elif rng.random() < difficulty[question_id]:
+                given, correct = answer_ids[question_id][0], 1
+            else:
+                given, correct = rng.choice(answer_ids[question_id][1:]), 0
+            scores[player_id] += 10 * correct
+            stamp = start + timedelta(seconds=20 * position)
+            history_rows.append((game_id, player_id, question_id, position // (5 * len(seats)) + 1,
+                                 given, correct, stamp.strftime('%Y-%m-%d %H:%M:%S')))
+        end = start + timedelta(seconds=20 * count)
+        game_rows.append((game_id, start.strftime('%Y-%m-%d %H:%M:%S'), end.strftime('%Y-%m-%d %H:%M:%S'), key[1]))
+        seat_rows.extend((game_id, player_id, score) for player_id, score in scores.items())
+        if len(history_rows) >= batch_size:
+            flush()
+    flush()
+    conn.commit()
+
+    # Abgeleitete Tabellen: Migrationen befüllen sie aus dem Bestand, die Bitmaps
+    # gesehener Fragen baut nur Python
+    apply_migrations(conn)
+    leaderboard.refresh(conn)
+    player_history.rebuild(conn)
+    conn.commit()
+
+    counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+              for table in ('Frage', 'Antwort', 'Spieler', 'Spiel', 'Teilnahme', 'SpielHistorie')}
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    conn.close()
+    return counts
+
+
+def main():
+    """Hauptfunktion"""
+    parser = argparse.ArgumentParser(description="Synthetische Quiz-Datenbank erzeugen")
+    parser.add_argument('path', help="Zieldatei (darf noch nicht existieren)")
+    parser.add_argument('--questions', type=int, default=2000, help="Anzahl Fragen")
+    parser.add_argument('--answers', type=int, default=4, help="Antworten je Frage (eine richtig)")
+    parser.add_argument('--categories', type=int, default=10, help="Anzahl Kategorien")
+    parser.add_argument('--players', type=int, default=1000, help="Anzahl Spieler")
+    parser.add_argument('--games', type=int, default=5000, help="Anzahl Spiele")
+    parser.add_argument('--history', type=int, default=100000, help="Antworten in SpielHistorie")
+    parser.add_argument('--days', type=int, default=30, help="Zeitraum der Spiele in Tagen")
+    parser.add_argument('--seed', type=int, default=1, help="Zufalls-Seed")
+    args = parser.parse_args()
+
+    if os.path.exists(args.path):
+        parser.error(f"{args.path} existiert bereits")
+    if args.answers < 4:
+        parser.error("Mindestens 4 Antworten je Frage (1 richtige, 3 falsche)")
+
+    start = time.perf_counter()
+    counts = generate(args.path, args.questions, args.answers, args.categories, args.players,
+                      args.games, args.history, args.days, args.seed)
+    print(f"✅ {args.path} in {time.perf_counter() - start:.1f}s erzeugt:")
+    for table, count in counts.items():
+        print(f"   {table:<14} {count:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Ranglisten nach Punkten, Trefferquote und gewonnenen Duellen
+Liest nur die vorberechneten Tabellen aus database/migrations/010_rangliste.sql.
+refresh() verdichtet neue Antworten bündelweise hinein (Stand in
+Verarbeitungsstand), beim Lesen wird SpielHistorie nie aggregiert.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from db_pool import fold_history
+
+
+ALL = 0  # KategorieID/SchwierigkeitID für "alle"
+MIN_ANSWERS = 20  # Mindestanzahl Antworten für die Rangliste nach Trefferquote
+
+# Sortierung je Rangliste: (Ausdruck, passend zum Index)
+ORDER_BY = {
+    'points': "r.Punkte",
+    'accuracy': "(r.AntwortenRichtig * 1.0 / r.AntwortenGesamt)",
+}
+
+
+def _ranked(rows, first_rank):
+    """Vergibt Ränge (gleicher Wert = gleicher Rang) ab first_rank
+
+    rows sind (Wert, SpielerID, ...) in absteigender Reihenfolge.
+    """
+    ranked = []
+    rank = first_rank
+    for position, row in enumerate(rows):
+        if position and row[0] != rows[position - 1][0]:
+            rank = first_rank + position
+        ranked.append((rank,) + tuple(row[1:]))
+    return ranked
+
+
+def top(conn, by='points', category_id=ALL, difficulty_id=ALL, limit=100, offset=0, min_answers=MIN_ANSWERS):
+    """Eine Seite der Rangliste
+
+    Liefert Tupel (Rang, SpielerID, Username, Punkte, Antworten, Richtige).
+    Bei by='accuracy' zählen nur Spieler mit mindestens min_answers Antworten.
+    """
+    order = ORDER_BY[by]
+    where = "r.KategorieID = ? AND r.SchwierigkeitID = ?"
+    params = [category_id, difficulty_id]
+    if by == 'accuracy':
+        where += " AND r.AntwortenGesamt >= ?"
+        params.append(min_answers)
+
+    rows = conn.execute(f"""
+        SELECT {order}, r.SpielerID, s.Username, r.Punkte, r.AntwortenGesamt, r.AntwortenRichtig
+        FROM Rangliste r
+        JOIN Spieler s ON s.SpielerID = r.SpielerID
+        WHERE {where}
+        ORDER BY {order} DESC, r.SpielerID
+        LIMIT ? OFFSET ?
+    """, params + [limit, offset]).fetchall()
+    if not rows:
+        return []
+
+    first_rank = 1
+    if offset:
+        first_rank += conn.execute(
+            f"SELECT COUNT(*) FROM Rangliste r WHERE {where} AND {order} > ?", params + [rows[0][0]]
+        ).fetchone()[0]
+    return _ranked(rows, first_rank)
+
+
+def player_rank(conn, player_id, by='points', category_id=ALL, difficulty_id=ALL, min_answers=MIN_ANSWERS):
+    """Rang eines Spielers als (Rang, SpielerID, Username, Punkte, Antworten, Richtige)
+
+    None, wenn der Spieler in dieser Rangliste (noch) nicht vorkommt.
+    """
+    order = ORDER_BY[by]
+    row = conn.execute(f"""
+        SELECT {order}, r.SpielerID, s.Username, r.Punkte, r.AntwortenGesamt, r.AntwortenRichtig
+        FROM Rangliste r
+        JOIN Spieler s ON s.SpielerID = r.SpielerID
+        WHERE r.KategorieID = ? AND r.SchwierigkeitID = ? AND r.SpielerID = ?
+    """, (category_id, difficulty_id, player_id)).fetchone()
+    if row is None or (by == 'accuracy' and row[4] < min_answers):
+        return None
+
+    where = "r.KategorieID = ? AND r.SchwierigkeitID = ?"
+    params = [category_id, difficulty_id]
+    if by == 'accuracy':
+        where += " AND r.AntwortenGesamt >= ?"
+        params.append(min_answers)
+    better = conn.execute(
+        f"SELECT COUNT(*) FROM Rangliste r WHERE {where} AND {order} > ?", params + [row[0]]
+    ).fetchone()[0]
+    return (better + 1,) + tuple(row[1:])
+
+
+def top_duels(conn, limit=100, offset=0):
+    """Rangliste nach gewonnenen Duellen: (Rang, SpielerID, Username, Duelle, Spiele)"""
+    rows = conn.execute("""
+        SELECT st.DuelleGewonnen, st.SpielerID, s.Username, st.DuelleGewonnen, st.SpieleGespielt
+        FROM SpielerStatistik st
+        JOIN Spieler s ON s.SpielerID = st.SpielerID
+        WHERE st.DuelleGewonnen > 0
+        ORDER BY st.DuelleGewonnen DESC
+        LIMIT ? OFFSET ?
+    """, (limit, offset)).fetchall()
+    if not rows:
+        return []
+    first_rank = 1
+    if offset:
+        first_rank += conn.execute(
+            "SELECT COUNT(*) FROM SpielerStatistik WHERE DuelleGewonnen > ?", (rows[0][0],)
+        ).fetchone()[0]
+    return _ranked(rows, first_rank)
+
+
+def top_window(conn, days=7, by='points', limit=100, offset=0, min_answers=MIN_ANSWERS, today=None):
+    """Rangliste über die letzten days Tage (aus den Tageswerten, alle Kategorien)
+
+    Summiert höchstens days Zeilen je aktivem Spieler statt der Historie.
+    Liefert dieselben Tupel wie top(). Die Seite ab offset wird aus den ersten
+    offset + limit Zeilen geschnitten, damit Ränge bei Gleichstand stimmen.
+    Tage zählen in UTC wie RanglisteTag (CURRENT_TIMESTAMP).
+    """
+    today = today or datetime.now(timezone.utc).date()
+    first_day = (today - timedelta(days=days - 1)).isoformat()
+    order = {'points': "Punkte", 'accuracy': "(Richtige * 1.0 / Antworten)"}[by]
+    having = " HAVING Antworten >= ?" if by == 'accuracy' else ""
+    params = [first_day] + ([min_answers] if by == 'accuracy' else []) + [offset + limit]
+
+    rows = conn.execute(f"""
+        SELECT {order}, w.SpielerID, s.Username, w.Punkte, w.Antworten, w.Richtige
+        FROM (
+            SELECT SpielerID, SUM(Punkte) AS Punkte, SUM(AntwortenGesamt) AS Antworten,
+                   SUM(AntwortenRichtig) AS Richtige
+            FROM RanglisteTag
+            WHERE Tag >= ?
+            GROUP BY +SpielerID{having}
+        ) w
+        JOIN Spieler s ON s.SpielerID = w.SpielerID
+        ORDER BY {order} DESC, w.SpielerID
+        LIMIT ?
+    """, params).fetchall()
+    return _ranked(rows, 1)[offset:]
+
+
+# Neue Antworten (HistorieID in (?, ?]) in die Ranglisten addieren
+FOLD_TOTALS = """
+    INSERT INTO Rangliste (KategorieID, SchwierigkeitID, SpielerID, Punkte, AntwortenGesamt, AntwortenRichtig)
+    SELECT
+        CASE WHEN k.Alle THEN 0 ELSE f.KategorieID END AS Kat,
+        CASE WHEN s.Alle THEN 0 ELSE f.SchwierigkeitID END AS Schw,
+        h.SpielerID, 10 * SUM(h.WarKorrekt = 1), COUNT(*), SUM(h.WarKorrekt = 1)
+    FROM SpielHistorie h
+    JOIN Frage f ON f.FrageID = h.FrageID
+    CROSS JOIN (SELECT 0 AS Alle UNION ALL SELECT 1) k
+    CROSS JOIN (SELECT 0 AS Alle UNION ALL SELECT 1) s
+    WHERE h.HistorieID > ? AND h.HistorieID <= ?
+    GROUP BY Kat, Schw, h.SpielerID
+    ON CONFLICT (KategorieID, SchwierigkeitID, SpielerID) DO UPDATE SET
+        Punkte = Punkte + excluded.Punkte,
+        AntwortenGesamt = AntwortenGesamt + excluded.AntwortenGesamt,
+        AntwortenRichtig = AntwortenRichtig + excluded.AntwortenRichtig
+"""
+
+FOLD_DAYS = """
+    INSERT INTO RanglisteTag (Tag, SpielerID, Punkte, AntwortenGesamt, AntwortenRichtig)
+    SELECT date(Zeitstempel) AS Tag, SpielerID, 10 * SUM(WarKorrekt = 1), COUNT(*), SUM(WarKorrekt = 1)
+    FROM SpielHistorie
+    WHERE HistorieID > ? AND HistorieID <= ?
+    GROUP BY Tag, SpielerID
+    ON CONFLICT (Tag, SpielerID) DO UPDATE SET
+        Punkte = Punkte + excluded.Punkte,
+        AntwortenGesamt = AntwortenGesamt + excluded.AntwortenGesamt,
+        AntwortenRichtig = AntwortenRichtig + excluded.AntwortenRichtig
+"""
+
+
+def refresh(conn):
+    """Verdichtet alle noch nicht gezählten Antworten (True, wenn es welche gab)
+
+    Läuft in der Transaktion des Aufrufers (das Antwort-Journal ruft es nach
+    dem Commit jedes Bündels auf).
+    """
+    return fold_history(conn, 'Rangliste', (FOLD_TOTALS, FOLD_DAYS))
+
+
+def rebuild(conn):
+    """Berechnet Rangliste und RanglisteTag komplett aus SpielHistorie neu (Wartung)"""
+    conn.execute("DELETE FROM Rangliste")
+    conn.execute("DELETE FROM RanglisteTag")
+    conn.execute("UPDATE Verarbeitungsstand SET HistorieID = 0 WHERE Bereich = 'Rangliste'")
+    refresh(conn)
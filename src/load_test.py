@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Lasttest für die Quiz-API
+Simuliert viele gleichzeitige Spieler, die komplette Spiele über die REST-Endpunkte spielen
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import uuid
+
+from password_hasher import PasswordHasher
+from quiz_client import QuizDatabase
+from quiz_server import QuizServer
+
+
+class HttpClient:
+    """Minimaler HTTP/1.1 Client mit Keep-Alive"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method, path, payload=None, session_key=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+        body = json.dumps(payload).encode('utf-8') if payload is not None else b''
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(body)}\r\n"
+        if session_key:
+            head += f"X-Session-Key: {session_key}\r\n"
+        self.writer.write(head.encode('latin-1') + b"\r\n" + body)
+        await self.writer.drain()
+
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        data = await self.reader.readexactly(length)
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+class LoadTest:
+    """Sammelt Latenzen je Endpunkt"""
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.latencies = {}
+        self.errors = {}
+
+    async def call(self, client, name, method, path, payload=None, session_key=None, expected=(200, 201)):
+        start = time.perf_counter()
+        status, data = await client.request(method, path, payload, session_key)
+        self.latencies.setdefault(name, []).append(time.perf_counter() - start)
+        if status not in expected:
+            self.errors[f"{name} {status}"] = self.errors.get(f"{name} {status}", 0) + 1
+        return status, data
+
+    async def sign_up(self, client, user_nr):
+        """Registrieren und Login, liefert (Spieler, Session Key)"""
+        username = f"last_{uuid.uuid4().hex[:10]}_{user_nr}"
+        credentials = {'username': username, 'password': 'geheim123'}
+        _, player = await self.call(client, 'POST /auth/register', 'POST', '/auth/register', credentials)
+        _, login = await self.call(client, 'POST /auth/login', 'POST', '/auth/login', credentials)
+        return player, login['sessionKey']
+
+    async def answer_all(self, client, key, game_id):
+        """Beantwortet Fragen bis zum Spielende, liefert die erwarteten Punkte"""
+        points = 0
+        while True:
+            status, question = await self.call(
+                client, 'GET /games/{id}/question', 'GET', f'/games/{game_id}/question',
+                session_key=key, expected=(200, 404, 409)
+            )
+            if status != 200:
+                return points
+            _, result = await self.call(client, 'POST /games/{id}/answer', 'POST', f'/games/{game_id}/answer', {
+                'questionId': question['id'],
+                'selectedAnswerId': random.choice(question['answers'])['id']
+            }, key)
+            if result and result.get('correct'):
+                points += 10
+
+    async def play(self, user_nr, games_per_user):
+        """Ein virtueller Spieler: Registrieren, Login, Spiele spielen, Statistik"""
+        client = HttpClient(self.host, self.port)
+        try:
+            player, key = await self.sign_up(client, user_nr)
+
+            _, categories = await self.call(client, 'GET /categories', 'GET', '/categories')
+            _, difficulties = await self.call(client, 'GET /difficulties', 'GET', '/difficulties')
+
+            for _ in range(games_per_user):
+                _, game = await self.call(client, 'POST /games', 'POST', '/games', {
+                    'mode': 'single',
+                    'playerIds': [player['id']],
+                    'categoryId': random.choice(categories)['id'],
+                    'difficultyId': random.choice(difficulties)['id']
+                }, key)
+                game_id = game['gameId']
+                await self.answer_all(client, key, game_id)
+                await self.call(client, 'GET /games/{id}/status', 'GET', f'/games/{game_id}/status', session_key=key)
+
+            await self.call(client, 'GET /statistics/user/{id}', 'GET', f"/statistics/user/{player['id']}", session_key=key)
+        except Exception as e:
+            self.errors[type(e).__name__] = self.errors.get(type(e).__name__, 0) + 1
+        finally:
+            await client.close()
+
+    async def play_duel(self, pair_nr, games_per_pair):
+        """Zwei Spieler mit eigenen Verbindungen spielen gleichzeitig Duelle
+
+        Prüft am Ende, dass jeder Punktestand genau den richtigen Antworten
+        entspricht (keine verlorenen Updates bei gleichzeitigen Abgaben).
+        """
+        clients = [HttpClient(self.host, self.port), HttpClient(self.host, self.port)]
+        try:
+            seats = [await self.sign_up(client, f"{pair_nr}_{nr}") for nr, client in enumerate(clients)]
+            (first, first_key), (second, second_key) = seats
+            _, categories = await self.call(clients[0], 'GET /categories', 'GET', '/categories')
+            _, difficulties = await self.call(clients[0], 'GET /difficulties', 'GET', '/difficulties')
+
+            for _ in range(games_per_pair):
+                _, game = await self.call(clients[0], 'POST /games', 'POST', '/games', {
+                    'mode': 'duel',
+                    'playerIds': [first['id'], second['id']],
+                    'categoryId': random.choice(categories)['id'],
+                    'difficultyId': random.choice(difficulties)['id']
+                }, first_key)
+                game_id = game['gameId']
+                # Der Gegner nimmt die Einladung mit seiner eigenen Session an
+                await self.call(clients[1], 'POST /games/{id}/join', 'POST', f'/games/{game_id}/join',
+                                session_key=second_key)
+                points = await asyncio.gather(*(
+                    self.answer_all(client, key, game_id) for client, (_, key) in zip(clients, seats)
+                ))
+
+                _, status = await self.call(
+                    clients[0], 'GET /games/{id}/status', 'GET', f'/games/{game_id}/status', session_key=first_key
+                )
+                scores = {entry['username']: entry['score'] for entry in status['scores']}
+                expected = {player['username']: p for (player, _), p in zip(seats, points)}
+                if scores != expected:
+                    self.errors['Punktestand falsch'] = self.errors.get('Punktestand falsch', 0) + 1
+        except Exception as e:
+            self.errors[type(e).__name__] = self.errors.get(type(e).__name__, 0) + 1
+        finally:
+            for client in clients:
+                await client.close()
+
+    async def run(self, users, concurrency, games_per_user, duels=False):
+        slots = asyncio.Semaphore(concurrency)
+
+        async def limited(nr):
+            async with slots:
+                if duels:
+                    await self.play_duel(nr, games_per_user)
+                else:
+                    await self.play(nr, games_per_user)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(limited(nr) for nr in range(users)))
+        return time.perf_counter() - start
+
+    def report(self, duration):
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n{total} Anfragen in {duration:.2f}s = {total / duration:.0f} Anfragen/s")
+        print(f"{'Endpunkt':32} {'Anzahl':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            pct = lambda p: values[min(len(values) - 1, int(len(values) * p))] * 1000
+            print(f"{name:32} {len(values):7} {pct(0.50):8.2f} {pct(0.95):8.2f} {pct(0.99):8.2f}")
+        if self.errors:
+            print("\nFehler:")
+            for name, count in sorted(self.errors.items()):
+                print(f"  {name}: {count}")
+
+
+async def main_async(args):
+    server = None
+    tcp_server = None
+    host, port = args.host, args.port
+
+    if port is None:
+        # Eigenen Server auf einer Kopie der Datenbank starten
+        tmp_dir = tempfile.mkdtemp(prefix="quiz_load_")
+        db_path = os.path.join(tmp_dir, "quiz_app.db")
+        shutil.copy(args.db, db_path)
+        server = QuizServer(QuizDatabase(db_path, PasswordHasher()), max_workers=args.workers)
+        tcp_server = await server.start('127.0.0.1', 0)
+        host, port = tcp_server.sockets[0].getsockname()[:2]
+        print(f"Testserver auf {host}:{port} (Datenbank-Kopie: {db_path})")
+
+    test = LoadTest(host, port)
+    duration = await test.run(args.users, args.concurrency, args.games, args.duels)
+    test.report(duration)
+
+    if tcp_server:
+        tcp_server.close()
+        await tcp_server.wait_closed()
+        server.close()
+        shutil.rmtree(os.path.dirname(server.db.db_path), ignore_errors=True)
+
+
+def main():
+    """Hauptfunktion"""
+    default_db = os.path.join(os.path.dirname(__file__), "../database/quiz_app.db")
+
+    parser = argparse.ArgumentParser(description="Lasttest für die Quiz-API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None,
+                        help="Laufenden Server testen (ohne: eigener Server auf DB-Kopie)")
+    parser.add_argument('--db', default=default_db, help="Vorlage für die DB-Kopie")
+    parser.add_argument('--users', type=int, default=200, help="Anzahl virtueller Spieler")
+    parser.add_argument('--concurrency', type=int, default=100, help="Gleichzeitig aktive Spieler")
+    parser.add_argument('--games', type=int, default=2, help="Spiele pro Spieler")
+    parser.add_argument('--workers', type=int, default=8, help="DB-Threads des Testservers")
+    parser.add_argument('--duels', action='store_true',
+                        help="Paare spielen Duelle gegeneinander (--users = Anzahl Paare)")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Metadaten-Cache für die Nachschlagetabellen
+Hält Kategorien, Schwierigkeitsgrade und Spielkonfigurationen im Speicher und
+lädt sie nur neu, wenn sich die Version 'Metadaten' in Aenderungszaehler ändert.
+"""
+
+import threading
+
+
+class MetadataCache:
+    """Gemeinsamer Cache für Kategorie, Schwierigkeitsgrad und Konfiguration
+
+    Schnellweg ohne Tabellenzugriff: PRAGMA data_version ändert sich nur, wenn eine
+    andere Verbindung committet hat. Solange der Wert je Thread gleich bleibt, gilt
+    der Cache. Sonst wird die Version aus Aenderungszaehler verglichen, die Trigger
+    bei jeder Änderung der drei Tabellen hochzählen. Schreibt ein Programm über
+    dieselbe Verbindung, muss es danach invalidate() aufrufen.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._generation = 0
+        self._version = None
+        self._data = None
+        self.hits = 0
+        self.reloads = 0
+
+    def _read_version(self, conn):
+        row = conn.execute(
+            "SELECT Version FROM Aenderungszaehler WHERE Bereich='Metadaten'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _load(self, conn):
+        categories = conn.execute("SELECT KategorieID, Bezeichnung FROM Kategorie").fetchall()
+        difficulties = conn.execute(
+            "SELECT SchwierigkeitID, Bezeichnung, LevelWert FROM Schwierigkeitsgrad ORDER BY LevelWert"
+        ).fetchall()
+        configs = {}
+        for config_id, rounds, per_round, max_answers, max_time in conn.execute("""
+            SELECT KonfigID, RundenAnzahl, FragenProRunde, MaxAntwortenAnzahl, MaxSpielzeitSec
+            FROM Konfiguration
+        """):
+            configs[config_id] = {
+                'rounds': rounds,
+                'questions_per_round': per_round,
+                'max_answers': max_answers,
+                'max_time_sec': max_time
+            }
+        return {'categories': categories, 'difficulties': difficulties, 'configs': configs}
+
+    def _current(self, conn):
+        """Aktuelle Metadaten (lädt bei Bedarf neu)"""
+        data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        local = self._local
+        with self._lock:
+            if (self._data is not None
+                    and getattr(local, 'conn', None) is conn
+                    and local.data_version == data_version
+                    and local.generation == self._generation):
+                self.hits += 1
+                return self._data
+
+            version = self._read_version(conn)
+            if self._data is None or version != self._version:
+                self._data = self._load(conn)
+                self._version = version
+                self.reloads += 1
+            else:
+                self.hits += 1
+            local.conn = conn
+            local.data_version = data_version
+            local.generation = self._generation
+            return self._data
+
+    def categories(self, conn):
+        """[(KategorieID, Bezeichnung), ...]"""
+        return list(self._current(conn)['categories'])
+
+    def difficulties(self, conn):
+        """[(SchwierigkeitID, Bezeichnung, LevelWert), ...] nach LevelWert sortiert"""
+        return list(self._current(conn)['difficulties'])
+
+    def game_config(self, conn, config_id=1):
+        """Spielkonfiguration als Dict (None wenn nicht vorhanden)"""
+        config = self._current(conn)['configs'].get(config_id)
+        return dict(config) if config else None
+
+    def invalidate(self):
+        """Lädt beim nächsten Zugriff neu (nach Schreibzugriffen über eine eigene Verbindung)"""
+        with self._lock:
+            self._generation += 1
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'reloads': self.reloads}
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Passwort-Hashes mit Salt und einstellbarem Aufwand (scrypt oder PBKDF2)
+Gespeichert wird "verfahren$parameter...$salt$hash" in Spieler.PasswortHash.
+Das Hashen läuft in einem Prozess-Pool, damit viele gleichzeitige Logins auf
+alle Kerne verteilt werden und den Aufrufer (z.B. den Server) nicht blockieren.
+Alte ungesalzene SHA-256-Hashes werden weiter erkannt und beim nächsten
+erfolgreichen Login ersetzt.
+"""
+
+import base64
+import hashlib
+import hmac
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+
+def _b64(data):
+    return base64.b64encode(data).decode('ascii').rstrip('=')
+
+
+def _unb64(text):
+    return base64.b64decode(text + '=' * (-len(text) % 4))
+
+
+class ScryptHasher:
+    """scrypt (speicherhart): n = CPU-/Speicheraufwand, r = Blockgröße, p = Parallelität
+
+    n=2**14, r=8 braucht 16 MiB und etwa 80 ms pro Hash auf einem Kern.
+    """
+
+    algorithm = 'scrypt'
+
+    def __init__(self, n=2 ** 14, r=8, p=1, salt_size=16, key_size=32):
+        self.n = n
+        self.r = r
+        self.p = p
+        self.salt_size = salt_size
+        self.key_size = key_size
+
+    @staticmethod
+    def _derive(password, salt, n, r, p, key_size):
+        # Speicherbedarf laut scrypt: 128 * r * (n + p + 2) Bytes, plus Reserve
+        return hashlib.scrypt(password.encode('utf-8'), salt=salt, n=n, r=r, p=p,
+                              maxmem=128 * r * (n + p + 2) + (1 << 20), dklen=key_size)
+
+    def hash(self, password):
+        salt = os.urandom(self.salt_size)
+        key = self._derive(password, salt, self.n, self.r, self.p, self.key_size)
+        return f"{self.algorithm}${self.n}${self.r}${self.p}${_b64(salt)}${_b64(key)}"
+
+    def verify(self, password, encoded):
+        _, n, r, p, salt, key = encoded.split('$')
+        key = _unb64(key)
+        return hmac.compare_digest(self._derive(password, _unb64(salt), int(n), int(r), int(p), len(key)), key)
+
+    def needs_rehash(self, encoded):
+        parts = encoded.split('$')
+        return parts[0] != self.algorithm or parts[1:4] != [str(self.n), str(self.r), str(self.p)]
+
+
+class Pbkdf2Hasher:
+    """PBKDF2-HMAC-SHA256: iterations = Aufwand (nicht speicherhart, dafür überall verfügbar)"""
+
+    algorithm = 'pbkdf2_sha256'
+
+    def __init__(self, iterations=600000, salt_size=16, key_size=32):
+        self.iterations = iterations
+        self.salt_size = salt_size
+        self.key_size = key_size
+
+    def hash(self, password):
+        salt = os.urandom(self.salt_size)
+        key = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, self.iterations, self.key_size)
+        return f"{self.algorithm}${self.iterations}${_b64(salt)}${_b64(key)}"
+
+    def verify(self, password, encoded):
+        _, iterations, salt, key = encoded.split('$')
+        key = _unb64(key)
+        derived = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), _unb64(salt), int(iterations), len(key))
+        return hmac.compare_digest(derived, key)
+
+    def needs_rehash(self, encoded):
+        parts = encoded.split('$')
+        return parts[0] != self.algorithm or parts[1] != str(self.iterations)
+
+
+HASHERS = {hasher.algorithm: hasher for hasher in (ScryptHasher, Pbkdf2Hasher)}
+
+# Bisheriges Format: SHA-256 ohne Salt als Hex-String
+LEGACY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+def verify_any(password, encoded):
+    """Prüft ein Passwort gegen einen gespeicherten Hash beliebigen Formats"""
+    if LEGACY_PATTERN.match(encoded):
+        return hmac.compare_digest(hashlib.sha256(password.encode()).hexdigest(), encoded)
+    hasher = HASHERS.get(encoded.split('$', 1)[0])
+    if hasher is None:
+        return False
+    try:
+        return hasher().verify(password, encoded)
+    except (ValueError, TypeError):
+        return False
+
+
+def hash_password(hasher, password):
+    """Neuer Hash (läuft im Pool-Prozess)"""
+    return hasher.hash(password)
+
+
+def check_password(hasher, password, encoded):
+    """(gültig, neuer Hash oder None) - läuft im Pool-Prozess
+
+    Ist der gespeicherte Hash veraltet (SHA-256 oder andere Parameter), wird
+    nach erfolgreicher Prüfung gleich der Ersatz berechnet. Ohne gespeicherten
+    Hash (unbekannter Benutzer) wird trotzdem einmal gehasht, damit die
+    Antwortzeit nicht verrät, ob es den Namen gibt.
+    """
+    if encoded is None:
+        hasher.hash(password)
+        return False, None
+    if not verify_any(password, encoded):
+        return False, None
+    if LEGACY_PATTERN.match(encoded) or hasher.needs_rehash(encoded):
+        return True, hasher.hash(password)
+    return True, None
+
+
+class PasswordHasher:
+    """Hashen und Prüfen im Prozess-Pool (workers=0: im aufrufenden Thread)
+
+    Der Pool wird beim ersten Hash gestartet (spawn, damit keine Threads der
+    Anwendung in die Kindprozesse kopiert werden). Mehr Prozesse als Kerne
+    bringen nichts, jeder Hash belegt einen Kern vollständig.
+    """
+
+    def __init__(self, hasher=None, workers=None):
+        self.hasher = hasher or ScryptHasher()
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _submit(self, func, *args):
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(func(self.hasher, *args))
+            except Exception as e:
+                future.set_exception(e)
+            return future
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor.submit(func, self.hasher, *args)
+
+    def hash_async(self, password):
+        """Future mit dem neuen Hash"""
+        return self._submit(hash_password, password)
+
+    def verify_async(self, password, encoded):
+        """Future mit (gültig, neuer Hash oder None), siehe check_password"""
+        return self._submit(check_password, password, encoded)
+
+    def hash(self, password):
+        return self.hash_async(password).result()
+
+    def verify(self, password, encoded):
+        return self.verify_async(password, encoded).result()
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gesehene Fragen je Spieler für die adaptive Fragenauswahl
+Pro Spieler zwei Bitmaps über die FrageID (gesehen, zuletzt falsch beantwortet),
+zlib-komprimiert in SpielerFragen. refresh() schreibt sie aus den neuen Zeilen
+von SpielHistorie fort, die Auswahl liest nur die Bitmaps der Spieler und
+nie deren ganze Historie.
+"""
+
+import zlib
+
+from db_pool import fold_history
+
+
+# Auswahlgewichte: noch nie gesehen > zuletzt falsch > schon richtig beantwortet
+WEIGHT_UNSEEN = 1.0
+WEIGHT_WRONG = 0.5
+WEIGHT_KNOWN = 0.1
+
+
+class SeenQuestions:
+    """Bitmaps gesehener und zuletzt falsch beantworteter Fragen (Bit = FrageID)"""
+
+    def __init__(self, seen=b'', wrong=b''):
+        self.seen = bytearray(seen)
+        self.wrong = bytearray(wrong)
+
+    @classmethod
+    def from_blobs(cls, seen, wrong):
+        return cls(zlib.decompress(seen), zlib.decompress(wrong))
+
+    def to_blobs(self):
+        return zlib.compress(bytes(self.seen)), zlib.compress(bytes(self.wrong))
+
+    @staticmethod
+    def _get(bits, question_id):
+        byte = question_id >> 3
+        return byte < len(bits) and bits[byte] >> (question_id & 7) & 1
+
+    @staticmethod
+    def _set(bits, question_id, value):
+        byte = question_id >> 3
+        if byte >= len(bits):
+            if not value:
+                return
+            bits.extend(bytes(byte + 1 - len(bits)))
+        if value:
+            bits[byte] |= 1 << (question_id & 7)
+        else:
+            bits[byte] &= ~(1 << (question_id & 7)) & 0xFF
+
+    def record(self, question_id, correct):
+        self._set(self.seen, question_id, True)
+        self._set(self.wrong, question_id, not correct)
+
+    def merge(self, other):
+        """Vereinigt die Bitmaps (z.B. beide Spieler eines Duells)"""
+        size = max(len(self.seen), len(other.seen), len(self.wrong), len(other.wrong))
+        # Bitweises Oder über die ganze Bitmap als große Zahl statt Byte für Byte
+        self.seen = bytearray((int.from_bytes(self.seen, 'little') | int.from_bytes(other.seen, 'little'))
+                              .to_bytes(size, 'little'))
+        self.wrong = bytearray((int.from_bytes(self.wrong, 'little') | int.from_bytes(other.wrong, 'little'))
+                               .to_bytes(size, 'little'))
+
+    def weight(self, question_id):
+        """Auswahlgewicht einer Frage für diesen Spieler (0 < Gewicht <= 1)"""
+        if not self._get(self.seen, question_id):
+            return WEIGHT_UNSEEN
+        if self._get(self.wrong, question_id):
+            return WEIGHT_WRONG
+        return WEIGHT_KNOWN
+
+
+def load(conn, player_ids):
+    """Gemeinsame Bitmaps der Spieler (eine Abfrage über den Primärschlüssel)"""
+    player_ids = list(player_ids)
+    placeholders = ','.join('?' * len(player_ids))
+    combined = SeenQuestions()
+    for seen, wrong in conn.execute(
+        f"SELECT Gesehen, Falsch FROM SpielerFragen WHERE SpielerID IN ({placeholders})", player_ids
+    ):
+        combined.merge(SeenQuestions.from_blobs(seen, wrong))
+    return combined
+
+
+def _fold(conn, low, high):
+    """Neue Antworten (HistorieID in (low, high]) in die Bitmaps der Spieler eintragen"""
+    answers = {}
+    for player_id, question_id, correct in conn.execute("""
+        SELECT SpielerID, FrageID, WarKorrekt FROM SpielHistorie
+        WHERE HistorieID > ? AND HistorieID <= ?
+        ORDER BY HistorieID
+    """, (low, high)):
+        answers.setdefault(player_id, []).append((question_id, correct == 1))
+
+    player_ids = list(answers)
+    # In Portionen, damit die Parameterzahl auch bei großen Nachträgen reicht
+    for start in range(0, len(player_ids), 500):
+        chunk = player_ids[start:start + 500]
+        placeholders = ','.join('?' * len(chunk))
+        stored = {
+            player_id: SeenQuestions.from_blobs(seen, wrong)
+            for player_id, seen, wrong in conn.execute(
+                f"SELECT SpielerID, Gesehen, Falsch FROM SpielerFragen WHERE SpielerID IN ({placeholders})", chunk
+            )
+        }
+        rows = []
+        for player_id in chunk:
+            seen = stored.get(player_id) or SeenQuestions()
+            for question_id, correct in answers[player_id]:
+                seen.record(question_id, correct)
+            rows.append((player_id,) + seen.to_blobs())
+        conn.executemany("""
+            INSERT INTO SpielerFragen (SpielerID, Gesehen, Falsch) VALUES (?, ?, ?)
+            ON CONFLICT (SpielerID) DO UPDATE SET Gesehen = excluded.Gesehen, Falsch = excluded.Falsch
+        """, rows)
+
+
+def refresh(conn):
+    """Trägt alle noch nicht erfassten Antworten ein (True, wenn es welche gab)
+
+    Läuft in der Transaktion des Aufrufers (das Antwort-Journal ruft es nach
+    dem Commit jedes Bündels auf). Alle Antworten eines Spielers seit dem
+    letzten Aufruf kosten nur ein Schreiben seiner Zeile.
+    """
+    return fold_history(conn, 'Gesehen', (_fold,))
+
+
+def seed(conn):
+    """Baut die Bitmaps einmal aus der ganzen Historie auf, solange SpielerFragen leer ist
+
+    Liefert True, wenn aufgebaut wurde. Sonst ist nichts zu tun (refresh holt nach).
+    """
+    if conn.execute("SELECT 1 FROM SpielerFragen LIMIT 1").fetchone():
+        return False
+    rebuild(conn)
+    return True
+
+
+def rebuild(conn):
+    """Baut alle Bitmaps komplett aus SpielHistorie neu auf (Wartung)"""
+    conn.execute("DELETE FROM SpielerFragen")
+    conn.execute("UPDATE Verarbeitungsstand SET HistorieID = 0 WHERE Bereich = 'Gesehen'")
+    refresh(conn)
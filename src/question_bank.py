@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Kompakter Snapshot des Fragenbestands im Speicher (optional)
+Fragetexte und Antworten liegen in wenigen zusammenhängenden Puffern statt in
+Millionen Python-Objekten: Texte als ein UTF-8-Block mit Offsets, IDs und
+Bereiche in array-Feldern. Die Antworten einer Frage stehen hintereinander,
+richtige zuerst; 1 richtige + 3 falsche auszuwählen ist reine Indexrechnung.
+Ändert sich der Bestand (siehe bank_key), wird ein neuer Snapshot gebaut und
+als Ganzes ausgetauscht. Mit Dateipfad wird er als Bank-Datei (bank_file.py)
+gespeichert und per mmap geöffnet, weitere Prozesse starten dann ohne Scan.
+"""
+
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+import bank_file
+
+
+logger = logging.getLogger(__name__)
+
+
+def bank_key(conn):
+    """Stand des Fragenbestands: (Version Fragenbank, Version Metadaten, max. FrageID, max. AntwortID)
+
+    Die IDs unterscheiden zusätzlich verschiedene Datenbanken mit zufällig
+    gleichen Zählerständen. Eine Abfrage, jeder Teil ist ein Indexzugriff.
+    """
+    return tuple(conn.execute("""
+        SELECT COALESCE((SELECT Version FROM Aenderungszaehler WHERE Bereich='Fragenbank'), 0),
+               COALESCE((SELECT Version FROM Aenderungszaehler WHERE Bereich='Metadaten'), 0),
+               COALESCE((SELECT MAX(FrageID) FROM Frage), 0),
+               COALESCE((SELECT MAX(AntwortID) FROM Antwort), 0)
+    """).fetchone())
+
+
+class BankSnapshot:
+    """Unveränderlicher Stand aller Fragen mit ihren Antworten
+
+    Frage i (sortiert nach FrageID) hat die Antworten answer_start[i] bis
+    answer_start[i + 1] - 1, davon die ersten correct_count[i] richtig.
+    Offsets und Bereiche sind 32 Bit ('I'), das reicht für 4 GiB Text.
+    Die Felder können auch memoryviews auf eine Bank-Datei sein (path und
+    file_size gesetzt, siehe from_file).
+    """
+
+    __slots__ = (
+        'version', 'question_ids', 'question_category', 'question_difficulty', 'text_offsets', 'texts',
+        'answer_start', 'correct_count', 'answer_ids', 'answer_offsets', 'answer_texts',
+        'categories', 'difficulties', 'path', 'file_size',
+    )
+
+    # Diese Felder stehen in der Bank-Datei als eigene Abschnitte
+    ARRAYS = tuple(name for name, _ in bank_file.SECTIONS if name != 'metadata')
+
+    def __init__(self, version):
+        self.version = version
+        self.question_ids = array('q')
+        self.question_category = array('q')
+        self.question_difficulty = array('q')
+        self.text_offsets = array('I', [0])
+        self.texts = b''
+        self.answer_start = array('I', [0])
+        self.correct_count = array('H')
+        self.answer_ids = array('q')
+        self.answer_offsets = array('I', [0])
+        self.answer_texts = b''
+        # (KategorieID, Bezeichnung) bzw. (SchwierigkeitID, Bezeichnung, LevelWert)
+        self.categories = []
+        self.difficulties = []
+        self.path = None
+        self.file_size = 0
+
+    @classmethod
+    def load(cls, conn, version):
+        """Liest alle Fragen und Antworten (je Frage richtige zuerst, dann nach AntwortID)
+
+        Zwei Scans in Tabellenreihenfolge und ein Sortieren in Python sind
+        deutlich schneller als ein JOIN mit ORDER BY über einen temporären B-Baum.
+        """
+        questions = conn.execute(
+            "SELECT FrageID, FrageText, KategorieID, SchwierigkeitID FROM Frage ORDER BY FrageID"
+        ).fetchall()
+        # 1 - IstRichtig: richtige Antworten sortieren vor die falschen
+        answers = conn.execute(
+            "SELECT FrageID, 1 - IstRichtig, AntwortID, AntwortText FROM Antwort"
+        ).fetchall()
+        answers.sort()
+
+        question_ids = []
+        texts = []
+        answer_start = [0]
+        correct_count = []
+        position = 0
+        for question_id, question_text, _, _ in questions:
+            # Antworten gelöschter Fragen kann es wegen ON DELETE CASCADE nicht geben
+            correct = 0
+            while position < len(answers) and answers[position][0] == question_id:
+                if answers[position][1] == 0:
+                    correct += 1
+                position += 1
+            question_ids.append(question_id)
+            texts.append(question_text.encode('utf-8'))
+            answer_start.append(position)
+            correct_count.append(correct)
+
+        answer_texts = [row[3].encode('utf-8') for row in answers]
+        snapshot = cls(version)
+        snapshot.question_ids = array('q', question_ids)
+        snapshot.question_category = array('q', [row[2] for row in questions])
+        snapshot.question_difficulty = array('q', [row[3] for row in questions])
+        snapshot.text_offsets = array('I', accumulate(map(len, texts), initial=0))
+        snapshot.texts = b''.join(texts)
+        snapshot.answer_start = array('I', answer_start)
+        snapshot.correct_count = array('H', correct_count)
+        snapshot.answer_ids = array('q', [row[2] for row in answers])
+        snapshot.answer_offsets = array('I', accumulate(map(len, answer_texts), initial=0))
+        snapshot.answer_texts = b''.join(answer_texts)
+        snapshot.categories = conn.execute(
+            "SELECT KategorieID, Bezeichnung FROM Kategorie ORDER BY KategorieID"
+        ).fetchall()
+        snapshot.difficulties = conn.execute(
+            "SELECT SchwierigkeitID, Bezeichnung, LevelWert FROM Schwierigkeitsgrad ORDER BY SchwierigkeitID"
+        ).fetchall()
+        return snapshot
+
+    @classmethod
+    def from_file(cls, path, verify=True):
+        """Snapshot direkt auf einer Bank-Datei (mmap, nur die kleinen Metadaten werden gelesen)"""
+        version, sections, size = bank_file.read(path, verify)
+        snapshot = cls(version)
+        for name in cls.ARRAYS:
+            setattr(snapshot, name, sections[name])
+        metadata = json.loads(str(sections['metadata'], 'utf-8'))
+        snapshot.categories = [tuple(row) for row in metadata['categories']]
+        snapshot.difficulties = [tuple(row) for row in metadata['difficulties']]
+        snapshot.path = path
+        snapshot.file_size = size
+        return snapshot
+
+    def save(self, path):
+        """Schreibt den Snapshot als Bank-Datei (liefert die Dateigröße)"""
+        sections = {name: getattr(self, name) for name in self.ARRAYS}
+        sections['metadata'] = json.dumps(
+            {'categories': self.categories, 'difficulties': self.difficulties}, ensure_ascii=False
+        ).encode('utf-8')
+        return bank_file.write(path, self.version, sections)
+
+    def __len__(self):
+        return len(self.question_ids)
+
+    def _index(self, question_id):
+        index = bisect_left(self.question_ids, question_id)
+        if index < len(self.question_ids) and self.question_ids[index] == question_id:
+            return index
+        return -1
+
+    def _answer(self, position):
+        text = self.answer_texts[self.answer_offsets[position]:self.answer_offsets[position + 1]]
+        return self.answer_ids[position], str(text, 'utf-8')
+
+    def question(self, question_id, max_answers=4):
+        """Frage mit 1 richtigen und max_answers-1 falschen Antworten, gemischt
+
+        Gleiches Format wie QuizDatabase.build_question, None ohne genug Antworten.
+        """
+        index = self._index(question_id)
+        if index < 0:
+            return None
+        start = self.answer_start[index]
+        first_wrong = start + self.correct_count[index]
+        end = self.answer_start[index + 1]
+        if first_wrong == start or end - first_wrong < max_answers - 1:
+            return None
+
+        correct = random.randrange(start, first_wrong)
+        positions = [correct] + random.sample(range(first_wrong, end), max_answers - 1)
+        random.shuffle(positions)
+        text = self.texts[self.text_offsets[index]:self.text_offsets[index + 1]]
+        return {
+            'id': question_id,
+            'text': str(text, 'utf-8'),
+            'answers': [self._answer(position) for position in positions],
+            'correct_id': self.answer_ids[correct]
+        }
+
+    def memory_bytes(self):
+        """Speicherbedarf aller Puffer in Bytes (bei einer Bank-Datei deren Größe, geteilt im Page-Cache)"""
+        if self.path is not None:
+            return self.file_size
+        return sum(sys.getsizeof(getattr(self, name)) for name in self.ARRAYS)
+
+
+def export_bank(conn, path):
+    """Schreibt den aktuellen Fragenbestand als Bank-Datei, liefert (Snapshot, Dateigröße)"""
+    # Stand vor den Daten gelesen, siehe QuestionBank.snapshot
+    snapshot = BankSnapshot.load(conn, bank_key(conn))
+    return snapshot, snapshot.save(path)
+
+
+class QuestionBank:
+    """Hält den aktuellen Snapshot und tauscht ihn bei Änderungen aus
+
+    Der Neuaufbau läuft ohne Lock für die Leser: wer gerade baut, hält nur
+    den Bau-Lock, alle anderen Threads arbeiten so lange mit dem bisherigen
+    Snapshot weiter. Nur beim allerersten Aufruf wird gewartet.
+
+    Mit path wird zuerst die Bank-Datei geöffnet, wenn ihr Stand passt;
+    sonst wird gebaut, die Datei neu geschrieben und wieder per mmap geöffnet.
+    Lässt sie sich nicht schreiben, bleibt der Snapshot im Speicher.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._snapshot = None
+        self._build_lock = threading.Lock()
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.opens = 0
+        self.open_seconds = 0.0
+
+    def _open_file(self, version):
+        """Snapshot aus der Bank-Datei, None wenn sie fehlt, veraltet oder beschädigt ist"""
+        if bank_file.read_key(self.path) != version:
+            return None
+        start = time.perf_counter()
+        try:
+            snapshot = BankSnapshot.from_file(self.path)
+        except (OSError, ValueError) as e:
+            logger.warning("Bank-Datei %s wird neu erstellt: %s", self.path, e)
+            return None
+        self.opens += 1
+        self.open_seconds += time.perf_counter() - start
+        return snapshot
+
+    def _build(self, conn, version):
+        start = time.perf_counter()
+        # Version vor den Daten gelesen: ändert sich der Bestand währenddessen,
+        # ist der Snapshot beim nächsten Aufruf veraltet und wird erneut gebaut
+        snapshot = BankSnapshot.load(conn, version)
+        if self.path is not None:
+            try:
+                snapshot.save(self.path)
+                snapshot = BankSnapshot.from_file(self.path, verify=False)
+            except (OSError, ValueError) as e:
+                logger.warning("Bank-Datei %s nicht geschrieben: %s", self.path, e)
+        self.builds += 1
+        self.build_seconds += time.perf_counter() - start
+        return snapshot
+
+    def snapshot(self, conn):
+        """Aktueller Snapshot (baut ihn bei geändertem Stand neu)"""
+        current = self._snapshot
+        version = bank_key(conn)
+        if current is not None and current.version == version:
+            return current
+        # Baut schon ein anderer Thread, mit dem bisherigen Stand weiterarbeiten
+        if not self._build_lock.acquire(blocking=current is None):
+            return current
+        try:
+            current = self._snapshot
+            if current is None or current.version != version:
+                current = self._open_file(version) if self.path is not None else None
+                if current is None:
+                    current = self._build(conn, version)
+                self._snapshot = current
+            return current
+        finally:
+            self._build_lock.release()
+
+    def questions(self, conn, question_ids, max_answers=4):
+        """Fragen in der Reihenfolge von question_ids (ohne solche mit zu wenig Antworten)"""
+        snapshot = self.snapshot(conn)
+        questions = []
+        for question_id in question_ids:
+            question = snapshot.question(question_id, max_answers)
+            if question:
+                questions.append(question)
+        return questions
+
+    def stats(self, conn):
+        """Größe des aktuellen Snapshots, auch hochgerechnet auf 100.000 Fragen (path: Bank-Datei oder None)"""
+        snapshot = self.snapshot(conn)
+        size = snapshot.memory_bytes()
+        return {
+            'version': snapshot.version,
+            'questions': len(snapshot),
+            'answers': len(snapshot.answer_ids),
+            'bytes': size,
+            'bytes_per_100k': size * 100000 // len(snapshot) if len(snapshot) else 0,
+            'path': snapshot.path,
+            'builds': self.builds,
+            'build_seconds': self.build_seconds,
+            'opens': self.opens,
+            'open_seconds': self.open_seconds,
+        }
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fragen-Pool für die zufällige Fragenauswahl
+Hält die Fragen-IDs je (Kategorie, Schwierigkeit) im Speicher und
+zieht pro Spiel aus einem gemischten Stapel ohne Wiederholungen. Im Pool
+stehen nur spielbare Fragen (genug richtige und falsche Antworten, siehe
+Tabelle FrageSpielbarkeit).
+"""
+
+import random
+import threading
+from collections import OrderedDict
+
+
+class QuestionDeck:
+    """Gemischter Fragenstapel eines Spiels
+
+    Teilt sich das ID-Tupel mit dem Pool und mischt "lazy" (Fisher-Yates mit
+    Tausch-Tabelle): Anlegen und Ziehen kosten O(1), es wird nichts kopiert.
+    """
+
+    def __init__(self, key, question_ids, drawn=(), version=None):
+        self.key = key
+        self.ids = question_ids
+        self.remaining = len(question_ids)
+        self.swaps = {}
+        self.drawn = set(drawn)
+        self.version = version
+
+    def draw(self, exclude_ids=()):
+        """Nimmt die nächste zufällige Karte vom Stapel"""
+        while self.remaining:
+            pick = random.randrange(self.remaining)
+            last = self.remaining - 1
+            index = self.swaps.get(pick, pick)
+            self.swaps[pick] = self.swaps.pop(last, last)
+            self.remaining = last
+
+            question_id = self.ids[index]
+            if question_id in self.drawn or question_id in exclude_ids:
+                continue
+            self.drawn.add(question_id)
+            return question_id
+        return None
+
+
+# Standard: 4 Antwortmöglichkeiten, also 1 richtige und 3 falsche
+MIN_WRONG = 3
+
+
+class QuestionPool:
+    """Vorberechnete Fragen-IDs je (KategorieID, SchwierigkeitID)
+
+    Der Pool wird über die Version in Aenderungszaehler ('Fragen') aktuell
+    gehalten, die Trigger bei jedem INSERT/DELETE auf Frage und bei jeder
+    Änderung der Spielbarkeit hochzählen. min_wrong ist die Zahl benötigter
+    falscher Antworten (Antwortmöglichkeiten - 1), je Wert wird einmal geladen.
+    """
+
+    def __init__(self, max_decks=10000):
+        self.max_decks = max_decks
+        self._lock = threading.Lock()
+        self._version = None
+        self._ids = {}
+        self._decks = OrderedDict()
+
+    def _read_version(self, conn):
+        row = conn.execute(
+            "SELECT Version FROM Aenderungszaehler WHERE Bereich='Fragen'"
+        ).fetchone()
+        return row[0] if row else 0
+
+    def _load(self, conn, min_wrong):
+        """Lädt alle spielbaren Fragen-IDs (eine Abfrage über idx_fragespielbarkeit_falsche)"""
+        ids = {}
+        for category_id, difficulty_id, question_id in conn.execute(
+            "SELECT KategorieID, SchwierigkeitID, FrageID FROM FrageSpielbarkeit "
+            "WHERE (Richtige > 0) * Falsche >= ?", (min_wrong,)
+        ):
+            ids.setdefault((category_id, difficulty_id), []).append(question_id)
+        # FrageID sortiert, damit die Stapel nicht von der Indexreihenfolge abhängen
+        return {key: tuple(sorted(values)) for key, values in ids.items()}
+
+    def refresh(self, conn):
+        """Prüft die Version und verwirft den Pool bei Bedarf (Lock muss gehalten werden)"""
+        version = self._read_version(conn)
+        if version != self._version:
+            self._ids = {}
+            self._version = version
+        return version
+
+    def _get_ids(self, conn, category_id, difficulty_id, min_wrong):
+        """IDs einer Kategorie/Schwierigkeit (Lock muss gehalten werden, nach refresh)"""
+        ids = self._ids.get(min_wrong)
+        if ids is None:
+            ids = self._ids[min_wrong] = self._load(conn, min_wrong)
+        return ids.get((category_id, difficulty_id), ())
+
+    def question_ids(self, conn, category_id, difficulty_id, min_wrong=MIN_WRONG):
+        """Alle spielbaren Fragen-IDs einer Kategorie/Schwierigkeit"""
+        with self._lock:
+            self.refresh(conn)
+            return self._get_ids(conn, category_id, difficulty_id, min_wrong)
+
+    def draw(self, conn, category_id, difficulty_id, game_id=None, exclude_ids=(), min_wrong=MIN_WRONG):
+        """Zieht eine zufällige Fragen-ID (None wenn keine mehr übrig ist)
+
+        Mit game_id wird aus dem Stapel des Spiels gezogen, sonst einmalig
+        zufällig unter Beachtung von exclude_ids.
+        """
+        drawn = self.draw_many(conn, category_id, difficulty_id, 1, game_id, exclude_ids, min_wrong)
+        return drawn[0] if drawn else None
+
+    def draw_many(self, conn, category_id, difficulty_id, count, game_id=None, exclude_ids=(), min_wrong=MIN_WRONG):
+        """Zieht bis zu count verschiedene Fragen-IDs (z.B. für eine ganze Runde)"""
+        exclude = set(exclude_ids)
+        key = (category_id, difficulty_id, min_wrong)
+        drawn = []
+
+        with self._lock:
+            version = self.refresh(conn)
+            ids = self._get_ids(conn, category_id, difficulty_id, min_wrong)
+
+            if game_id is None:
+                while len(drawn) < count:
+                    question_id = self._draw_once(ids, exclude)
+                    if question_id is None:
+                        break
+                    drawn.append(question_id)
+                    exclude.add(question_id)
+                return drawn
+
+            deck = self._decks.get(game_id)
+            if deck is None or deck.key != key:
+                deck = QuestionDeck(key, ids, version=version)
+                self._decks[game_id] = deck
+                while len(self._decks) > self.max_decks:
+                    self._decks.popitem(last=False)
+            elif deck.version != version:
+                # Fragenbestand geändert: Stapel aus aktuellem Pool neu mischen
+                deck = QuestionDeck(key, ids, deck.drawn, version)
+                self._decks[game_id] = deck
+            self._decks.move_to_end(game_id)
+
+            while len(drawn) < count:
+                question_id = deck.draw(exclude)
+                if question_id is None:
+                    break
+                drawn.append(question_id)
+            return drawn
+
+    def draw_weighted(self, conn, category_id, difficulty_id, count, weight, exclude_ids=(), min_wrong=MIN_WRONG):
+        """Zieht bis zu count verschiedene Fragen-IDs, bevorzugt nach weight(FrageID)
+
+        Verwerfungsverfahren über einen frisch gemischten Stapel: eine gezogene
+        Frage wird mit Wahrscheinlichkeit weight(id) (0 < weight <= 1) genommen.
+        Die Kosten hängen von count und den Gewichten ab, nicht von der Größe
+        der Kategorie. Ist der Stapel leer, wird unter den verworfenen weitergelost.
+        """
+        key = (category_id, difficulty_id, min_wrong)
+        with self._lock:
+            self.refresh(conn)
+            ids = self._get_ids(conn, category_id, difficulty_id, min_wrong)
+
+        deck = QuestionDeck(key, ids)
+        exclude = set(exclude_ids)
+        drawn = []
+        rejected = []
+        while len(drawn) < count:
+            question_id = deck.draw(exclude)
+            if question_id is None:
+                break
+            if random.random() < weight(question_id):
+                drawn.append(question_id)
+            else:
+                rejected.append(question_id)
+
+        while rejected and len(drawn) < count:
+            remaining = []
+            for question_id in rejected:
+                if len(drawn) < count and random.random() < weight(question_id):
+                    drawn.append(question_id)
+                else:
+                    remaining.append(question_id)
+            rejected = remaining
+        return drawn
+
+    def _draw_once(self, ids, exclude):
+        if not ids:
+            return None
+        # Bei wenigen Ausschlüssen reichen ein paar Zufallsgriffe
+        for _ in range(8):
+            question_id = ids[random.randrange(len(ids))]
+            if question_id not in exclude:
+                return question_id
+        remaining = [q_id for q_id in ids if q_id not in exclude]
+        return random.choice(remaining) if remaining else None
+
+    def release(self, game_id):
+        """Gibt den Stapel eines beendeten Spiels frei"""
+        with self._lock:
+            self._decks.pop(game_id, None)
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Volltextsuche über Fragen und Antworten
+Nutzt die FTS5-Tabelle FrageSuche (database/migrations/006_volltextsuche.sql),
+die per Trigger mit Frage und Antwort synchron gehalten wird.
+"""
+
+import re
+
+
+def search_tokens(text):
+    """Zerlegt eine Eingabe in Suchwörter (Satzzeichen und FTS-Syntax fallen weg)"""
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def match_expression(text, prefix=True):
+    """FTS5-MATCH-Ausdruck: alle Wörter müssen vorkommen
+
+    Mit prefix=True passt jedes Wort auch als Wortanfang ("haupt" findet "Hauptstadt"),
+    praktisch für ein Suchfeld während der Eingabe. Gibt None zurück, wenn kein Wort übrig bleibt.
+    """
+    tokens = search_tokens(text)
+    if not tokens:
+        return None
+    suffix = '*' if prefix else ''
+    return ' '.join(f'"{token}"{suffix}' for token in tokens)
+
+
+def text_matches(search, text):
+    """Entspricht match_expression(search) für einen einzelnen Text (ohne Datenbank)"""
+    words = search_tokens(text)
+    return all(any(word.startswith(token) for word in words) for token in search_tokens(search))
+
+
+def search_questions(conn, text, limit=20, category_id=None):
+    """Beste Treffer nach Relevanz (bm25, Fragetext stärker gewichtet als Antworten)
+
+    Liefert Tupel (FrageID, Kategorie, FrageText, Antworten).
+    """
+    expression = match_expression(text)
+    if expression is None:
+        return []
+    query = """
+        SELECT f.FrageID, k.Bezeichnung, f.FrageText, fs.Antworten
+        FROM FrageSuche fs
+        JOIN Frage f ON f.FrageID = fs.rowid
+        JOIN Kategorie k ON f.KategorieID = k.KategorieID
+        WHERE FrageSuche MATCH ?
+    """
+    params = [expression]
+    if category_id is not None:
+        query += " AND f.KategorieID = ?"
+        params.append(category_id)
+    query += " ORDER BY bm25(FrageSuche, 4.0, 1.0) LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def find_similar(conn, question_text, limit=5):
+    """Vorhandene Fragen, deren Fragetext alle Wörter von question_text enthält
+
+    Findet Dubletten, die sich nur in Groß-/Kleinschreibung, Satzzeichen oder
+    Umlauten/Akzenten unterscheiden. Liefert Tupel (FrageID, FrageText).
+    """
+    expression = match_expression(question_text, prefix=False)
+    if expression is None:
+        return []
+    return conn.execute("""
+        SELECT rowid, FrageText
+        FROM FrageSuche
+        WHERE FrageSuche MATCH ?
+        ORDER BY rank
+        LIMIT ?
+    """, (f"FrageText : ({expression})", limit)).fetchall()
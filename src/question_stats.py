@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Auswertung je Frage: Trefferquote, Antwortrate und Ablenker-Häufigkeit
+refresh() verdichtet nur die neuen Zeilen aus SpielHistorie in FrageStatistik
+und AntwortStatistik (database/migrations/011_fragenstatistik.sql). Die
+Berichte lesen nur diese Tabellen. unplayable_report() listet Fragen, denen
+Antworten fehlen (FrageSpielbarkeit, per Trigger aktuell gehalten).
+"""
+
+from db_pool import fold_history
+from question_pool import MIN_WRONG
+
+
+MIN_ANSWERS = 30  # Erst ab so vielen Antworten gilt eine Quote als aussagekräftig
+
+# Neue Antworten (HistorieID in (?, ?]) je Frage und je gewählter Antwort addieren
+FOLD_QUESTIONS = """
+    INSERT INTO FrageStatistik (FrageID, AntwortenGesamt, AntwortenRichtig, OhneAntwort)
+    SELECT FrageID, COUNT(*), SUM(WarKorrekt = 1), SUM(GegebeneAntwortID IS NULL)
+    FROM SpielHistorie
+    WHERE HistorieID > ? AND HistorieID <= ?
+    GROUP BY FrageID
+    ON CONFLICT (FrageID) DO UPDATE SET
+        AntwortenGesamt = AntwortenGesamt + excluded.AntwortenGesamt,
+        AntwortenRichtig = AntwortenRichtig + excluded.AntwortenRichtig,
+        OhneAntwort = OhneAntwort + excluded.OhneAntwort
+"""
+
+FOLD_ANSWERS = """
+    INSERT INTO AntwortStatistik (AntwortID, FrageID, Gewaehlt)
+    SELECT GegebeneAntwortID, MIN(FrageID), COUNT(*)
+    FROM SpielHistorie
+    WHERE HistorieID > ? AND HistorieID <= ? AND GegebeneAntwortID IS NOT NULL
+    GROUP BY GegebeneAntwortID
+    ON CONFLICT (AntwortID) DO UPDATE SET Gewaehlt = Gewaehlt + excluded.Gewaehlt
+"""
+
+
+def refresh(conn):
+    """Verdichtet alle noch nicht ausgewerteten Antworten (True, wenn es welche gab)"""
+    return fold_history(conn, 'FrageStatistik', (FOLD_QUESTIONS, FOLD_ANSWERS))
+
+
+def rebuild(conn):
+    """Berechnet FrageStatistik und AntwortStatistik komplett neu (Wartung)"""
+    conn.execute("DELETE FROM FrageStatistik")
+    conn.execute("DELETE FROM AntwortStatistik")
+    conn.execute("UPDATE Verarbeitungsstand SET HistorieID = 0 WHERE Bereich = 'FrageStatistik'")
+    refresh(conn)
+
+
+def question_report(conn, min_answers=MIN_ANSWERS, only_flagged=False, category_id=None):
+    """Kennzahlen aller gespielten Fragen, auffällige zuerst
+
+    Die empirische Schwierigkeit ist das Level, dessen mittlere Trefferquote
+    der Quote der Frage am nächsten liegt (nur Fragen ab min_answers Antworten).
+    Weicht sie vom eingestellten Level ab, ist die Frage auffällig.
+    Liefert Dicts mit id, category, level, text, asked, correct, accuracy,
+    answer_rate, empirical_level, flagged.
+    """
+    sql = """
+        SELECT f.FrageID, k.Bezeichnung, f.SchwierigkeitID, s.Bezeichnung, s.LevelWert, f.FrageText,
+               st.AntwortenGesamt, st.AntwortenRichtig, st.OhneAntwort
+        FROM FrageStatistik st
+        JOIN Frage f ON f.FrageID = st.FrageID
+        JOIN Kategorie k ON k.KategorieID = f.KategorieID
+        JOIN Schwierigkeitsgrad s ON s.SchwierigkeitID = f.SchwierigkeitID
+        WHERE st.AntwortenGesamt > 0
+    """
+    params = ()
+    if category_id is not None:
+        sql += " AND f.KategorieID = ?"
+        params = (category_id,)
+
+    report = []
+    sums = {}
+    for (question_id, category, difficulty_id, level, level_value, text,
+         asked, correct, unanswered) in conn.execute(sql, params):
+        entry = {
+            'id': question_id,
+            'category': category,
+            'difficulty_id': difficulty_id,
+            'level': level,
+            'level_value': level_value,
+            'text': text,
+            'asked': asked,
+            'correct': correct,
+            'accuracy': correct / asked,
+            'answer_rate': (asked - unanswered) / asked,
+            'empirical_level': None,
+            'flagged': False,
+        }
+        report.append(entry)
+        if asked >= min_answers:
+            total, count = sums.get(level, (0.0, 0))
+            sums[level] = (total + entry['accuracy'], count + 1)
+
+    # Mittlere Quote je Level als Maßstab; mit nur einem Level gibt es nichts zu vergleichen
+    level_accuracy = {level: total / count for level, (total, count) in sums.items()}
+    if len(level_accuracy) > 1:
+        for entry in report:
+            if entry['asked'] < min_answers:
+                continue
+            entry['empirical_level'] = min(
+                level_accuracy, key=lambda level: abs(level_accuracy[level] - entry['accuracy'])
+            )
+            entry['flagged'] = entry['empirical_level'] != entry['level']
+
+    if only_flagged:
+        report = [entry for entry in report if entry['flagged']]
+    # Auffällige zuerst, darin die größte Abweichung vom eigenen Level
+    report.sort(key=lambda entry: (
+        not entry['flagged'],
+        -abs(entry['accuracy'] - level_accuracy.get(entry['level'], entry['accuracy'])),
+        entry['id']
+    ))
+    return report
+
+
+def answer_distribution(conn, question_id):
+    """Antwortmöglichkeiten einer Frage: (AntwortID, Text, IstRichtig, Gewählt, Anteil)
+
+    Anteil bezieht sich auf alle Male, die die Frage gestellt wurde.
+    """
+    row = conn.execute(
+        "SELECT AntwortenGesamt FROM FrageStatistik WHERE FrageID = ?", (question_id,)
+    ).fetchone()
+    asked = row[0] if row else 0
+    rows = conn.execute("""
+        SELECT a.AntwortID, a.AntwortText, a.IstRichtig, COALESCE(st.Gewaehlt, 0)
+        FROM Antwort a
+        LEFT JOIN AntwortStatistik st ON st.AntwortID = a.AntwortID
+        WHERE a.FrageID = ?
+        ORDER BY a.AntwortID
+    """, (question_id,)).fetchall()
+    return [row + (row[3] / asked if asked else 0.0,) for row in rows]
+
+
+def unplayable_report(conn, min_wrong=MIN_WRONG, category_id=None):
+    """Fragen, die mit min_wrong + 1 Antwortmöglichkeiten nicht gespielt werden können
+
+    Liest nur die betroffenen Einträge aus FrageSpielbarkeit (Bereich im Index).
+    Liefert Dicts mit id, category, level, text, correct_answers, wrong_answers.
+    """
+    sql = """
+        SELECT f.FrageID, k.Bezeichnung, s.Bezeichnung, f.FrageText, sp.Richtige, sp.Falsche
+        FROM FrageSpielbarkeit sp
+        JOIN Frage f ON f.FrageID = sp.FrageID
+        JOIN Kategorie k ON k.KategorieID = f.KategorieID
+        JOIN Schwierigkeitsgrad s ON s.SchwierigkeitID = f.SchwierigkeitID
+        WHERE (sp.Richtige > 0) * sp.Falsche < ?
+    """
+    params = [min_wrong]
+    if category_id is not None:
+        sql += " AND sp.KategorieID = ?"
+        params.append(category_id)
+    # Sortiert wird hier: ORDER BY FrageID ließe SQLite die ganze Tabelle statt den Index lesen
+    report = [
+        {
+            'id': question_id,
+            'category': category,
+            'level': level,
+            'text': text,
+            'correct_answers': correct,
+            'wrong_answers': wrong,
+        }
+        for question_id, category, level, text, correct, wrong in conn.execute(sql, params)
+    ]
+    report.sort(key=lambda entry: entry['id'])
+    return report
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quiz App Wartung - Kommandozeilenwerkzeug für Administrationsaufgaben
+
+Aufruf: python quiz_admin.py <befehl> [--db PFAD]
+"""
+
+import argparse
+import os
+import time
+
+from quiz_client import QuizDatabase
+
+
+def cmd_rebuild_stats(db, args):
+    """SpielerStatistik neu berechnen und Abweichungen melden"""
+    differences = db.rebuild_user_statistics()
+    if not differences:
+        print("✅ SpielerStatistik war konsistent.")
+        return
+    print(f"⚠️  {len(differences)} Spieler korrigiert (Spiele, Duelle, Antworten, Richtige):")
+    for player_id, (old, new) in sorted(differences.items()):
+        print(f"  Spieler {player_id}: {old} -> {new}")
+
+
+def cmd_rebuild_leaderboard(db, args):
+    """Ranglisten aus der Historie neu berechnen"""
+    db.rebuild_leaderboard()
+    print("✅ Ranglisten neu berechnet.")
+
+
+def cmd_rebuild_seen(db, args):
+    """Gesehene Fragen je Spieler neu aufbauen"""
+    db.rebuild_seen_questions()
+    print("✅ Gesehene Fragen neu aufgebaut.")
+
+
+def cmd_top(db, args):
+    """Rangliste ausgeben"""
+    rows = db.get_leaderboard(args.by, limit=args.limit, days=args.days)
+    if not rows:
+        print("Rangliste ist leer.")
+        return
+    for rank, _, username, *values in rows:
+        if args.by == 'duels':
+            print(f"  {rank:>4}. {username:<24} {values[0]} Duelle gewonnen")
+        else:
+            points, answers, correct = values
+            print(f"  {rank:>4}. {username:<24} {points:>6} Punkte  {correct}/{answers} richtig")
+
+
+def print_question_report(db, args):
+    report = db.get_question_report(only_flagged=not args.all)
+    flagged = sum(1 for entry in report if entry['flagged'])
+    print(f"{len(report)} Fragen, {flagged} auffällig:")
+    for entry in report[:args.limit]:
+        marker = "⚠️ " if entry['flagged'] else "   "
+        print(f"  {marker}[{entry['id']}] {entry['level']:<8} -> {entry['empirical_level'] or '-':<8} "
+              f"{entry['accuracy'] * 100:5.1f}% richtig, {entry['answer_rate'] * 100:5.1f}% beantwortet "
+              f"({entry['asked']}x) {entry['text'][:50]}")
+
+
+def cmd_analyze(db, args):
+    """Auswertung je Frage fortschreiben und auffällige Fragen ausgeben"""
+    if args.rebuild:
+        db.rebuild_question_stats()
+    print_question_report(db, args)
+    # Als Dauerlauf: alle N Sekunden nur die neuen Antworten verdichten
+    while args.follow:
+        time.sleep(args.follow)
+        print()
+        print_question_report(db, args)
+
+
+def cmd_search(db, args):
+    """Fragen per Volltextsuche finden (Frage- und Antworttexte)"""
+    results = db.search_questions(' '.join(args.text), args.limit)
+    if not results:
+        print("Keine Treffer.")
+        return
+    for frage_id, kategorie, frage_text, antworten in results:
+        print(f"  [{frage_id}] ({kategorie}) {frage_text}")
+        print(f"        Antworten: {antworten}")
+
+
+def cmd_bank_stats(db, args):
+    """Speicherbedarf des Fragen-Snapshots ausgeben"""
+    stats = db.get_question_bank_stats()
+    print(f"Fragen-Snapshot (Version {stats['version']}), aufgebaut in {stats['build_seconds']:.2f}s:")
+    print(f"  {stats['questions']:,} Fragen, {stats['answers']:,} Antworten")
+    print(f"  {stats['bytes'] / 2 ** 20:.1f} MiB gesamt, {stats['bytes_per_100k'] / 2 ** 20:.1f} MiB je 100.000 Fragen")
+    if stats['path']:
+        print(f"  per mmap aus {stats['path']}")
+
+
+def cmd_export_bank(db, args):
+    """Fragenbestand als Bank-Datei für mmap exportieren"""
+    start = time.perf_counter()
+    path, questions, size = db.export_question_bank(args.path)
+    print(f"{questions:,} Fragen nach {path} exportiert ({size / 2 ** 20:.1f} MiB, "
+          f"{time.perf_counter() - start:.2f}s)")
+
+
+def main():
+    """Hauptfunktion"""
+    default_db = os.path.join(os.path.dirname(__file__), "../database/quiz_app.db")
+
+    parser = argparse.ArgumentParser(description="Wartungsbefehle für die Quiz-Datenbank")
+    parser.add_argument('--db', default=default_db, help="Pfad zur SQLite-Datenbank")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('rebuild-stats', help="Spielerstatistik aus der Historie neu berechnen")
+    commands.add_parser('rebuild-leaderboard', help="Ranglisten aus der Historie neu berechnen")
+    commands.add_parser('rebuild-seen', help="Gesehene Fragen je Spieler (adaptive Auswahl) neu aufbauen")
+    top = commands.add_parser('top', help="Rangliste anzeigen")
+    top.add_argument('--by', choices=['points', 'accuracy', 'duels'], default='points')
+    top.add_argument('--days', type=int, default=None, help="Nur die letzten N Tage")
+    top.add_argument('--limit', type=int, default=20, help="Anzahl Plätze")
+    analyze = commands.add_parser('analyze', help="Auswertung je Frage (Schwierigkeit prüfen)")
+    analyze.add_argument('--all', action='store_true', help="Alle gespielten Fragen statt nur auffällige")
+    analyze.add_argument('--limit', type=int, default=20, help="Anzahl ausgegebener Fragen")
+    analyze.add_argument('--rebuild', action='store_true', help="Vorher komplett aus der Historie neu berechnen")
+    analyze.add_argument('--follow', type=int, default=0, metavar='SEK', help="Alle SEK Sekunden wiederholen")
+    search = commands.add_parser('search', help="Fragen und Antworten durchsuchen")
+    search.add_argument('text', nargs='+', help="Suchwörter (Wortanfänge genügen)")
+    search.add_argument('--limit', type=int, default=20, help="Maximale Anzahl Treffer")
+    commands.add_parser('bank-stats', help="Speicherbedarf des Fragen-Snapshots anzeigen")
+    export = commands.add_parser('export-bank', help="Fragenbestand als Bank-Datei (mmap) exportieren")
+    export.add_argument('path', nargs='?', help="Zieldatei (Standard: neben der Datenbank, .bank)")
+
+    args = parser.parse_args()
+    if args.command == 'top' and args.days and args.by == 'duels':
+        parser.error("--days gilt nicht für --by duels")
+    handlers = {
+        'rebuild-stats': cmd_rebuild_stats,
+        'rebuild-leaderboard': cmd_rebuild_leaderboard,
+        'rebuild-seen': cmd_rebuild_seen,
+        'top': cmd_top,
+        'analyze': cmd_analyze,
+        'search': cmd_search,
+        'bank-stats': cmd_bank_stats,
+        'export-bank': cmd_export_bank,
+    }
+
+    db = QuizDatabase(args.db)
+    try:
+        handlers[args.command](db, args)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,51 +8,93 @@ Unterstützt Duell-Modus und Statistiken
 import tkinter as tk
 from tkinter import ttk, messagebox
 import sqlite3
-import hashlib
+import math
 import random
+import time
 from datetime import datetime
 import os
+import queue
+import threading
 
-
-class DatabaseConnection:
-    """Datenbank-Verbindungsklasse mit Context Manager Support"""
-    
-    def __init__(self, db_path):
-        self.db_path = db_path
-        self.conn = None
-        self.cursor = None
-    
-    def __enter__(self):
-        self.conn = sqlite3.connect(self.db_path)
-        self.cursor = self.conn.cursor()
-        return self
-    
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        if self.conn:
-            self.conn.commit()
-            self.conn.close()
+from answer_journal import AnswerJournal
+from db_pool import ConnectionPool
+from db_worker import DbWorker
+from duel_engine import DuelEngine, DuelError
+from metadata_cache import MetadataCache
+from password_hasher import PasswordHasher
+from question_bank import QuestionBank, export_bank
+from question_pool import QuestionPool
+from session_store import SessionStore
+import bank_file
+import leaderboard
+import player_history
+import question_search
+import question_stats
 
 
 class QuizDatabase:
     """Datenbank-Handler für Quiz-Operationen"""
+
+    WINDOW_CACHE_SEC = 60  # Gültigkeit der Ranglisten über N Tage
     
-    def __init__(self, db_path="../database/quiz_app.db"):
+    def __init__(self, db_path="../database/quiz_app.db", password_hasher=None, snapshot=False):
         self.db_path = db_path
+        # Langlebige Verbindungen (eine pro Thread) statt connect/close pro Aufruf
+        self.pool = ConnectionPool(db_path)
+        # Fragen-IDs je Kategorie/Schwierigkeit, Stapel pro Spiel
+        self.question_pool = QuestionPool()
+        # Optional: alle Fragetexte und Antworten kompakt im Speicher statt einer Abfrage je Runde,
+        # als Bank-Datei neben der Datenbank gemeinsam für alle Prozesse
+        self.question_bank = QuestionBank(bank_file.default_path(db_path)) if snapshot else None
+        # Kategorien, Schwierigkeitsgrade und Konfigurationen (ändern sich selten)
+        self.metadata = MetadataCache()
+        # Ranglisten über N Tage summieren Tageswerte aller Spieler, kurz zwischengespeichert
+        self._window_cache = {}
+        self._window_lock = threading.Lock()
+        # Antworten, die nicht über das Journal kamen (Wartung, Testdaten), einmal beim Start
+        # verdichten; danach führt nur das Journal die Ranglisten nach, Lesen bleibt lesend
+        with self.pool.connection() as db:
+            leaderboard.refresh(db.conn)
+            # Erster Start mit adaptiver Auswahl: gesehene Fragen aus der vorhandenen Historie
+            if not player_history.seed(db.conn):
+                player_history.refresh(db.conn)
+        # Antworten werden gebündelt geschrieben (Group Commit), Ranglisten und gesehene
+        # Fragen nach jedem Commit nachgeführt
+        self.journal = AnswerJournal(self.pool, after_batch=[leaderboard.refresh, player_history.refresh])
+        # Aktive Sessions im Speicher, SessionTime wird gebündelt zurückgeschrieben
+        self.sessions = SessionStore(self.pool)
+        # Passwort-Hashes (scrypt) außerhalb jeder Transaktion; standardmäßig im aufrufenden
+        # Thread (Tk-Client: DbWorker), nur der Server übergibt einen Prozess-Pool
+        self.passwords = password_hasher or PasswordHasher(workers=0)
+    
+    def connection_stats(self):
+        """Zähler für geöffnete/wiederverwendete Verbindungen"""
+        return self.pool.stats()
+    
+    def close(self):
+        """Schreibt ausstehende Antworten und Sessions und schließt alle Datenbankverbindungen"""
+        self.journal.close()
+        self.sessions.close()
+        self.passwords.close()
+        self.pool.close_all()
         
     def hash_password(self, password):
-        """Erstellt SHA256 Hash für Passwort"""
-        return hashlib.sha256(password.encode()).hexdigest()
+        """Erstellt gesalzenen Hash für Passwort (blockiert; im aufrufenden Thread oder, beim Server, im Prozess-Pool)"""
+        return self.passwords.hash(password)
     
-    def register_user(self, username, password):
-        """Registriert neuen Benutzer"""
+    def register_user(self, username, password, password_hash=None):
+        """Registriert neuen Benutzer
+        
+        password_hash: bereits berechneter Hash (z.B. vom Server asynchron erzeugt)
+        """
         try:
-            with DatabaseConnection(self.db_path) as db:
+            if password_hash is None:
                 password_hash = self.hash_password(password)
+            with self.pool.connection() as db:
                 db.cursor.execute(
                     "INSERT INTO Spieler (Username, PasswortHash) VALUES (?, ?)",
                     (username, password_hash)
                 )
-                db.conn.commit()
                 return True, "Registrierung erfolgreich!"
         except sqlite3.IntegrityError:
             return False, "Username bereits vergeben!"
@@ -62,106 +104,186 @@ class QuizDatabase:
     def login_user(self, username, password):
         """Authentifiziert Benutzer"""
         try:
-            with DatabaseConnection(self.db_path) as db:
-                password_hash = self.hash_password(password)
-                db.cursor.execute(
-                    "SELECT SpielerID, Username FROM Spieler WHERE Username=? AND PasswortHash=?",
-                    (username, password_hash)
-                )
-                result = db.cursor.fetchone()
-                
-                if result:
-                    # Session Key generieren
-                    session_key = hashlib.sha256(f"{username}{datetime.now()}".encode()).hexdigest()
-                    db.cursor.execute(
-                        "UPDATE Spieler SET SessionKey=?, SessionTime=? WHERE SpielerID=?",
-                        (session_key, datetime.now(), result[0])
-                    )
-                    db.conn.commit()
-                    return True, result[0], result[1]
-                else:
-                    return False, None, "Falsche Anmeldedaten!"
+            session = self.create_session(username, password)
+            if session:
+                return True, session['player_id'], session['username']
+            else:
+                return False, None, "Falsche Anmeldedaten!"
         except Exception as e:
             return False, None, f"Fehler: {str(e)}"
     
-    def get_categories(self):
-        """Lädt alle Kategorien"""
-        with DatabaseConnection(self.db_path) as db:
-            db.cursor.execute("SELECT KategorieID, Bezeichnung FROM Kategorie")
-            return db.cursor.fetchall()
+    def create_session(self, username, password):
+        """Prüft Anmeldedaten und vergibt neuen Session Key (None bei Fehlschlag)
+        
+        Ein veralteter Hash (SHA-256 ohne Salt) wird dabei durch einen neuen ersetzt.
+        """
+        login = self.get_login(username)
+        valid, new_hash = self.passwords.verify(password, login[2] if login else None)
+        if not valid:
+            return None
+        if new_hash:
+            self.update_password_hash(login[0], login[2], new_hash)
+        return self.open_session(login[0], login[1])
     
-    def get_difficulties(self):
-        """Lädt alle Schwierigkeitsgrade"""
-        with DatabaseConnection(self.db_path) as db:
+    def get_login(self, username):
+        """Holt (SpielerID, Username, PasswortHash) zu einem Benutzernamen"""
+        with self.pool.connection() as db:
             db.cursor.execute(
-                "SELECT SchwierigkeitID, Bezeichnung, LevelWert FROM Schwierigkeitsgrad ORDER BY LevelWert"
+                "SELECT SpielerID, Username, PasswortHash FROM Spieler WHERE Username=?",
+                (username,)
             )
-            return db.cursor.fetchall()
+            return db.cursor.fetchone()
     
-    def get_random_question(self, category_id, difficulty_id, exclude_ids=[]):
-        """Holt zufällige Frage mit genau 4 Antworten"""
-        with DatabaseConnection(self.db_path) as db:
-            # Frage laden
-            exclude_clause = ""
-            params = [category_id, difficulty_id]
-            
-            if exclude_ids:
-                placeholders = ','.join('?' * len(exclude_ids))
-                exclude_clause = f"AND FrageID NOT IN ({placeholders})"
-                params.extend(exclude_ids)
-            
-            db.cursor.execute(f"""
-                SELECT FrageID, FrageText 
-                FROM Frage 
-                WHERE KategorieID=? AND SchwierigkeitID=? {exclude_clause}
-                ORDER BY RANDOM() 
-                LIMIT 1
-            """, params)
-            
-            question = db.cursor.fetchone()
-            if not question:
-                return None
-            
-            question_id, question_text = question
-            
-            # Antworten laden
-            db.cursor.execute("""
-                SELECT AntwortID, AntwortText, IstRichtig 
-                FROM Antwort 
-                WHERE FrageID=?
-            """, (question_id,))
-            
-            all_answers = db.cursor.fetchall()
-            
-            # Genau 1 richtige und 3 falsche auswählen
-            correct = [a for a in all_answers if a[2] == 1]
-            incorrect = [a for a in all_answers if a[2] == 0]
-            
-            if not correct or len(incorrect) < 3:
-                return None  # Nicht genug Antworten
-            
-            selected_correct = random.choice(correct)
-            selected_incorrect = random.sample(incorrect, min(3, len(incorrect)))
-            
-            # Kombinieren und mischen
-            final_answers = [selected_correct] + selected_incorrect
-            random.shuffle(final_answers)
-            
-            return {
-                'id': question_id,
-                'text': question_text,
-                'answers': [(a[0], a[1]) for a in final_answers],  # Ohne IstRichtig Flag!
-                'correct_id': selected_correct[0]
-            }
+    def update_password_hash(self, player_id, old_hash, new_hash):
+        """Ersetzt den Passwort-Hash, sofern er sich seit dem Lesen nicht geändert hat"""
+        with self.pool.connection() as db:
+            db.cursor.execute(
+                "UPDATE Spieler SET PasswortHash=? WHERE SpielerID=? AND PasswortHash=?",
+                (new_hash, player_id, old_hash)
+            )
+    
+    def open_session(self, player_id, username):
+        """Vergibt einen neuen Session Key für einen geprüften Spieler"""
+        session_key, session_time = self.sessions.create(player_id, username)
+        return {
+            'player_id': player_id,
+            'username': username,
+            'session_key': session_key,
+            'session_time': session_time
+        }
+    
+    def get_session_player(self, session_key):
+        """Holt (SpielerID, Username) zu einem gültigen Session Key (None wenn abgelaufen)
+        
+        Aktive Sessions kommen aus dem Speicher, nur unbekannte Keys aus Spieler.
+        """
+        return self.sessions.validate(session_key)
+    
+    def get_player(self, username):
+        """Holt (SpielerID, Username, SessionTime) zu einem Benutzernamen"""
+        with self.pool.connection() as db:
+            db.cursor.execute(
+                "SELECT SpielerID, Username, SessionTime FROM Spieler WHERE Username=?",
+                (username,)
+            )
+            return db.cursor.fetchone()
     
-    def create_game(self, player_ids, difficulty_id):
-        """Erstellt neues Spiel"""
-        with DatabaseConnection(self.db_path) as db:
+    def get_categories(self):
+        """Lädt alle Kategorien (aus dem Metadaten-Cache)"""
+        with self.pool.connection() as db:
+            return self.metadata.categories(db.conn)
+    
+    def get_difficulties(self):
+        """Lädt alle Schwierigkeitsgrade (aus dem Metadaten-Cache)"""
+        with self.pool.connection() as db:
+            return self.metadata.difficulties(db.conn)
+    
+    def get_random_question(self, category_id, difficulty_id, exclude_ids=[], game_id=None, max_answers=4):
+        """Holt zufällige Frage mit genau max_answers Antworten (1 richtige)
+
+        Mit game_id wird aus dem Fragenstapel des Spiels gezogen (keine Wiederholungen).
+        """
+        questions = self.get_round_questions(
+            category_id, difficulty_id, 1, exclude_ids, game_id, max_answers
+        )
+        return questions[0] if questions else None
+    
+    def get_round_questions(self, category_id, difficulty_id, count, exclude_ids=[], game_id=None, max_answers=4, player_ids=None):
+        """Holt bis zu count Fragen auf einmal (z.B. eine ganze Runde)
+        
+        Fragen und Antworten kommen aus einer gemeinsamen Abfrage (oder aus dem
+        Snapshot, falls aktiviert). Gezogen wird nur aus spielbaren Fragen
+        (FrageSpielbarkeit); wurde eine Frage zwischendurch unvollständig, wird
+        sie übersprungen und durch eine neu gezogene ersetzt.
+        Liefert weniger als count Fragen, wenn der Stapel leer ist.
+        Mit player_ids wird adaptiv gezogen: Fragen, die keiner der Spieler
+        kennt oder zuletzt falsch beantwortet hat, kommen bevorzugt.
+        """
+        questions = []
+        exclude = set(exclude_ids)
+        with self.pool.connection() as db:
+            seen = None
+            if player_ids:
+                # Bitmaps führt das Journal nach jedem Bündel nach, hier wird nur gelesen
+                seen = player_history.load(db.conn, player_ids)
+            while len(questions) < count:
+                # Fragen aus dem Pool ziehen
+                if seen is not None:
+                    question_ids = self.question_pool.draw_weighted(
+                        db.conn, category_id, difficulty_id, count - len(questions), seen.weight, exclude,
+                        max_answers - 1
+                    )
+                else:
+                    question_ids = self.question_pool.draw_many(
+                        db.conn, category_id, difficulty_id, count - len(questions), game_id, exclude,
+                        max_answers - 1
+                    )
+                if not question_ids:
+                    break
+                exclude.update(question_ids)
+                
+                if self.question_bank is not None:
+                    questions.extend(self.question_bank.questions(db.conn, question_ids, max_answers))
+                    continue
+                
+                placeholders = ','.join('?' * len(question_ids))
+                db.cursor.execute(f"""
+                    SELECT f.FrageID, f.FrageText, a.AntwortID, a.AntwortText, a.IstRichtig
+                    FROM Frage f
+                    JOIN Antwort a ON a.FrageID = f.FrageID
+                    WHERE f.FrageID IN ({placeholders})
+                """, question_ids)
+                
+                rows = {}
+                texts = {}
+                for question_id, question_text, answer_id, answer_text, is_correct in db.cursor.fetchall():
+                    texts[question_id] = question_text
+                    rows.setdefault(question_id, []).append((answer_id, answer_text, is_correct))
+                
+                # Reihenfolge der Ziehung beibehalten
+                for question_id in question_ids:
+                    question = self.build_question(
+                        question_id, texts.get(question_id), rows.get(question_id, []), max_answers
+                    )
+                    if question:
+                        questions.append(question)
+        return questions
+    
+    def build_question(self, question_id, question_text, all_answers, max_answers=4):
+        """Wählt 1 richtige und max_answers-1 falsche Antworten und mischt sie"""
+        correct = [a for a in all_answers if a[2] == 1]
+        incorrect = [a for a in all_answers if a[2] == 0]
+        
+        if question_text is None or not correct or len(incorrect) < max_answers - 1:
+            return None  # Nicht genug Antworten
+        
+        selected_correct = random.choice(correct)
+        selected_incorrect = random.sample(incorrect, max_answers - 1)
+        
+        # Kombinieren und mischen
+        final_answers = [selected_correct] + selected_incorrect
+        random.shuffle(final_answers)
+        
+        return {
+            'id': question_id,
+            'text': question_text,
+            'answers': [(a[0], a[1]) for a in final_answers],  # Ohne IstRichtig Flag!
+            'correct_id': selected_correct[0]
+        }
+    
+    def create_game(self, player_ids, difficulty_id, config_id=1, category_id=None, adaptive=False):
+        """Erstellt neues Spiel mit der angegebenen Konfiguration
+        
+        Mit category_id werden alle Fragen des Spiels gleich mit festgelegt
+        (SpielPlan), danach ist jede Frage nur noch ein Nachschlagen.
+        Mit adaptive werden Fragen bevorzugt, die die Spieler noch nicht kennen.
+        """
+        with self.pool.connection() as db:
             # Spiel erstellen
             db.cursor.execute("""
                 INSERT INTO Spiel (KonfigID, GewaehlteSchwierigkeitID) 
-                VALUES (1, ?)
-            """, (difficulty_id,))
+                VALUES (?, ?)
+            """, (config_id, difficulty_id))
             
             game_id = db.cursor.lastrowid
             
@@ -172,31 +294,90 @@ class QuizDatabase:
                     VALUES (?, ?, 0)
                 """, (game_id, player_id))
             
-            db.conn.commit()
+            if category_id is not None:
+                self.plan_game(game_id, category_id, difficulty_id, config_id, player_ids if adaptive else None)
             return game_id
     
+    def plan_game(self, game_id, category_id, difficulty_id, config_id=1, player_ids=None):
+        """Legt Fragen und Antwortauswahl für das ganze Spiel fest
+        
+        Alle Fragen kommen aus einer gemeinsamen Abfrage (get_round_questions).
+        Reicht der Fragenbestand nicht, wird ein kürzerer Plan gespeichert.
+        Mit player_ids adaptiv (siehe get_round_questions).
+        Liefert die Anzahl geplanter Fragen.
+        """
+        config = self.get_game_config(config_id)
+        count = config['rounds'] * config['questions_per_round']
+        questions = self.get_round_questions(
+            category_id, difficulty_id, count, max_answers=config['max_answers'], player_ids=player_ids
+        )
+        with self.pool.connection() as db:
+            db.cursor.executemany("""
+                INSERT INTO SpielPlan (SpielID, Position, Reihenfolge, FrageID, AntwortID)
+                VALUES (?, ?, ?, ?, ?)
+            """, [
+                (game_id, position, order, question['id'], answer_id)
+                for position, question in enumerate(questions)
+                for order, (answer_id, _) in enumerate(question['answers'])
+            ])
+        return len(questions)
+    
+    def get_game_plan(self, game_id, position=None):
+        """Geplante Fragen eines Spiels in Spielreihenfolge (eine Abfrage)
+        
+        Mit position nur die Frage an dieser Stelle (0-basiert). Die Fragen
+        haben dasselbe Format wie bei get_random_question.
+        """
+        query = """
+            SELECT p.Position, p.FrageID, f.FrageText, p.AntwortID, a.AntwortText, a.IstRichtig
+            FROM SpielPlan p
+            JOIN Frage f ON f.FrageID = p.FrageID
+            JOIN Antwort a ON a.AntwortID = p.AntwortID
+            WHERE p.SpielID = ?
+        """
+        params = [game_id]
+        if position is not None:
+            query += " AND p.Position = ?"
+            params.append(position)
+        query += " ORDER BY p.Position, p.Reihenfolge"
+        
+        questions = []
+        with self.pool.connection() as db:
+            db.cursor.execute(query, params)
+            for pos, question_id, question_text, answer_id, answer_text, is_correct in db.cursor.fetchall():
+                if not questions or questions[-1]['position'] != pos:
+                    questions.append({
+                        'id': question_id,
+                        'text': question_text,
+                        'answers': [],
+                        'correct_id': None,
+                        'position': pos
+                    })
+                questions[-1]['answers'].append((answer_id, answer_text))
+                if is_correct:
+                    questions[-1]['correct_id'] = answer_id
+        return questions
+    
+    def get_planned_question(self, game_id, position):
+        """Frage an Stelle position (0-basiert) aus dem Spielplan, None nach der letzten"""
+        questions = self.get_game_plan(game_id, position)
+        return questions[0] if questions else None
+    
     def save_answer(self, game_id, player_id, question_id, answer_id, is_correct, round_nr):
-        """Speichert Antwort in Historie"""
-        with DatabaseConnection(self.db_path) as db:
-            db.cursor.execute("""
-                INSERT INTO SpielHistorie 
-                (SpielID, SpielerID, FrageID, RundeNr, GegebeneAntwortID, WarKorrekt)
-                VALUES (?, ?, ?, ?, ?, ?)
-            """, (game_id, player_id, question_id, round_nr, answer_id, is_correct))
-            
-            # Score aktualisieren
-            if is_correct:
-                db.cursor.execute("""
-                    UPDATE Teilnahme 
-                    SET EndScore = EndScore + 10 
-                    WHERE SpielID=? AND SpielerID=?
-                """, (game_id, player_id))
-            
-            db.conn.commit()
+        """Speichert Antwort in Historie (+10 Punkte wenn richtig)
+        
+        Kehrt erst zurück, wenn die Antwort dauerhaft gespeichert ist, und
+        liefert den neuen Punktestand des Spielers.
+        """
+        return self.save_answer_async(game_id, player_id, question_id, answer_id, is_correct, round_nr).result()
+    
+    def save_answer_async(self, game_id, player_id, question_id, answer_id, is_correct, round_nr):
+        """Reiht eine Antwort ins Journal ein und liefert ein Future (neuer Punktestand nach dem Commit)"""
+        return self.journal.submit(game_id, player_id, question_id, answer_id, is_correct, round_nr)
     
     def get_game_scores(self, game_id):
         """Holt aktuelle Spielstände"""
-        with DatabaseConnection(self.db_path) as db:
+        with self.pool.connection() as db:
             db.cursor.execute("""
                 SELECT s.Username, t.EndScore 
                 FROM Teilnahme t
@@ -206,52 +387,71 @@ class QuizDatabase:
             """, (game_id,))
             return db.cursor.fetchall()
     
+    def get_game_players(self, game_id):
+        """Teilnehmer eines Spiels als [(SpielerID, Username), ...]"""
+        with self.pool.connection() as db:
+            db.cursor.execute("""
+                SELECT t.SpielerID, s.Username
+                FROM Teilnahme t
+                JOIN Spieler s ON t.SpielerID = s.SpielerID
+                WHERE t.SpielID=?
+            """, (game_id,))
+            return db.cursor.fetchall()
+    
+    def join_game(self, game_id, player_id):
+        """Nimmt einen Spieler in ein laufendes Spiel auf, liefert seinen Username"""
+        with self.pool.connection() as db:
+            db.cursor.execute("""
+                INSERT INTO Teilnahme (SpielID, SpielerID, EndScore)
+                VALUES (?, ?, 0)
+            """, (game_id, player_id))
+            db.cursor.execute("SELECT Username FROM Spieler WHERE SpielerID=?", (player_id,))
+            return db.cursor.fetchone()[0]
+    
+    def get_game_config(self, config_id=1):
+        """Lädt eine Spielkonfiguration (aus dem Metadaten-Cache)"""
+        with self.pool.connection() as db:
+            return self.metadata.game_config(db.conn, config_id)
+    
+    def get_player_score(self, game_id, player_id):
+        """Holt aktuellen Punktestand eines Spielers"""
+        with self.pool.connection() as db:
+            db.cursor.execute(
+                "SELECT EndScore FROM Teilnahme WHERE SpielID=? AND SpielerID=?",
+                (game_id, player_id)
+            )
+            row = db.cursor.fetchone()
+            return row[0] if row else 0
+    
+    def is_game_finished(self, game_id):
+        """Prüft ob ein Spiel beendet wurde (None wenn es nicht existiert)"""
+        with self.pool.connection() as db:
+            db.cursor.execute("SELECT EndZeit FROM Spiel WHERE SpielID=?", (game_id,))
+            row = db.cursor.fetchone()
+            if not row:
+                return None
+            return row[0] is not None
+    
     def finish_game(self, game_id):
         """Beendet Spiel"""
-        with DatabaseConnection(self.db_path) as db:
+        self.question_pool.release(game_id)
+        # Noch eingereihte Antworten vor dem Spielende schreiben
+        self.journal.flush()
+        with self.pool.connection() as db:
             db.cursor.execute("""
                 UPDATE Spiel SET EndZeit=? WHERE SpielID=?
             """, (datetime.now(), game_id))
-            db.conn.commit()
     
     def get_user_statistics(self, player_id):
-        """Holt Benutzerstatistiken"""
-        with DatabaseConnection(self.db_path) as db:
-            # Gespielte Spiele
+        """Holt Benutzerstatistiken (vorberechnet in SpielerStatistik)"""
+        with self.pool.connection() as db:
             db.cursor.execute("""
-                SELECT COUNT(DISTINCT SpielID) FROM Teilnahme WHERE SpielerID=?
+                SELECT SpieleGespielt, DuelleGewonnen, AntwortenGesamt, AntwortenRichtig
+                FROM SpielerStatistik WHERE SpielerID=?
             """, (player_id,))
-            games_played = db.cursor.fetchone()[0]
-            
-            # Gewonnene Duelle
-            db.cursor.execute("""
-                SELECT COUNT(*) FROM (
-                    SELECT t1.SpielID
-                    FROM Teilnahme t1
-                    WHERE t1.SpielerID=? 
-                    AND t1.EndScore = (
-                        SELECT MAX(t2.EndScore) 
-                        FROM Teilnahme t2 
-                        WHERE t2.SpielID = t1.SpielID
-                    )
-                    AND (SELECT COUNT(*) FROM Teilnahme t3 WHERE t3.SpielID = t1.SpielID) > 1
-                )
-            """, (player_id,))
-            duels_won = db.cursor.fetchone()[0]
-            
-            # Richtige Antworten
-            db.cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    SUM(CASE WHEN WarKorrekt=1 THEN 1 ELSE 0 END) as correct
-                FROM SpielHistorie 
-                WHERE SpielerID=?
-            """, (player_id,))
-            
-            result = db.cursor.fetchone()
-            total_answers = result[0] if result[0] else 0
-            correct_answers = result[1] if result[1] else 0
+            result = db.cursor.fetchone() or (0, 0, 0, 0)
             
+            games_played, duels_won, total_answers, correct_answers = result
             percentage = (correct_answers / total_answers * 100) if total_answers > 0 else 0
             
             return {
@@ -262,26 +462,173 @@ class QuizDatabase:
                 'percentage': percentage
             }
     
-    def get_all_users(self, exclude_id=None):
-        """Holt alle Benutzer (für Duell-Auswahl)"""
-        with DatabaseConnection(self.db_path) as db:
-            if exclude_id:
-                db.cursor.execute(
-                    "SELECT SpielerID, Username FROM Spieler WHERE SpielerID != ?",
-                    (exclude_id,)
-                )
-            else:
-                db.cursor.execute("SELECT SpielerID, Username FROM Spieler")
+    def rebuild_user_statistics(self):
+        """Berechnet SpielerStatistik komplett aus Teilnahme/SpielHistorie neu
+        
+        Gibt die Abweichungen zum bisherigen Stand zurück:
+        {SpielerID: (alt, neu)} mit Tupeln (Spiele, Duelle, Antworten, Richtige).
+        """
+        with self.pool.connection() as db:
+            db.cursor.execute("""
+                SELECT SpielerID, SpieleGespielt, DuelleGewonnen, AntwortenGesamt, AntwortenRichtig
+                FROM SpielerStatistik
+            """)
+            before = {row[0]: tuple(row[1:]) for row in db.cursor.fetchall()}
+            
+            # Gewonnene Duelle zählen nur für beendete Spiele (wie der Trigger beim Spielende)
+            db.cursor.execute("""
+                SELECT
+                    s.SpielerID,
+                    (SELECT COUNT(DISTINCT t.SpielID) FROM Teilnahme t WHERE t.SpielerID = s.SpielerID),
+                    (SELECT COUNT(*) FROM Teilnahme t1 JOIN Spiel sp ON sp.SpielID = t1.SpielID
+                     WHERE t1.SpielerID = s.SpielerID AND sp.EndZeit IS NOT NULL
+                     AND t1.EndScore = (SELECT MAX(t2.EndScore) FROM Teilnahme t2 WHERE t2.SpielID = t1.SpielID)
+                     AND (SELECT COUNT(*) FROM Teilnahme t3 WHERE t3.SpielID = t1.SpielID) > 1),
+                    (SELECT COUNT(*) FROM SpielHistorie h WHERE h.SpielerID = s.SpielerID),
+                    (SELECT COUNT(*) FROM SpielHistorie h WHERE h.SpielerID = s.SpielerID AND h.WarKorrekt = 1)
+                FROM Spieler s
+            """)
+            after = {row[0]: tuple(row[1:]) for row in db.cursor.fetchall()}
+            
+            db.cursor.execute("DELETE FROM SpielerStatistik")
+            db.cursor.executemany("""
+                INSERT INTO SpielerStatistik
+                (SpielerID, SpieleGespielt, DuelleGewonnen, AntwortenGesamt, AntwortenRichtig)
+                VALUES (?, ?, ?, ?, ?)
+            """, [(player_id,) + values for player_id, values in after.items()])
+            
+            return {
+                player_id: (before.get(player_id), values)
+                for player_id, values in after.items()
+                if before.get(player_id) != values
+            }
+    
+    def search_users(self, prefix="", exclude_id=None, after=None, limit=20):
+        """Sucht Benutzer nach Namensanfang (für Duell-Auswahl), seitenweise
+        
+        Sortiert nach Username (ohne Groß-/Kleinschreibung). after ist die letzte
+        Zeile (SpielerID, Username) der vorherigen Seite; dann wird dahinter weitergelesen.
+        """
+        conditions = ["Username COLLATE NOCASE >= ?"]
+        params = [after[1] if after else prefix]
+        if prefix:
+            # Obergrenze: alles, was mit prefix beginnt
+            conditions.append("Username COLLATE NOCASE < ?")
+            params.append(prefix + '\U0010ffff')
+        if after:
+            conditions.append("NOT (Username COLLATE NOCASE = ? AND SpielerID <= ?)")
+            params.extend([after[1], after[0]])
+        if exclude_id:
+            conditions.append("SpielerID != ?")
+            params.append(exclude_id)
+        params.append(limit)
+        
+        with self.pool.connection() as db:
+            db.cursor.execute(f"""
+                SELECT SpielerID, Username FROM Spieler
+                WHERE {' AND '.join(conditions)}
+                ORDER BY Username COLLATE NOCASE, SpielerID
+                LIMIT ?
+            """, params)
             return db.cursor.fetchall()
 
+    def search_questions(self, text, limit=20, category_id=None):
+        """Volltextsuche über Frage- und Antworttexte (beste Treffer zuerst)"""
+        with self.pool.connection() as db:
+            return question_search.search_questions(db.conn, text, limit, category_id)
+
+    def find_similar_questions(self, question_text, limit=5):
+        """Mögliche Dubletten einer Frage (gleiche Wörter im Fragetext)"""
+        with self.pool.connection() as db:
+            return question_search.find_similar(db.conn, question_text, limit)
+
+    def get_leaderboard(self, by='points', category_id=0, difficulty_id=0, limit=100, offset=0, days=None):
+        """Seite einer Rangliste (vorberechnet, siehe leaderboard.py)
+        
+        by: 'points', 'accuracy' oder 'duels'; 0 bei Kategorie/Schwierigkeit = alle.
+        Mit days nur die letzten days Tage (nicht für 'duels', Tageswerte gibt es
+        nur über alle Kategorien und Schwierigkeitsgrade).
+        """
+        if days and (by == 'duels' or category_id or difficulty_id):
+            raise ValueError("Rangliste über Tage nur nach Punkten/Trefferquote über alle Kategorien")
+        with self.pool.connection() as db:
+            if by == 'duels':
+                return leaderboard.top_duels(db.conn, limit, offset)
+            if days:
+                return self._top_window(db.conn, days, by, limit, offset)
+            return leaderboard.top(db.conn, by, category_id, difficulty_id, limit, offset)
+
+    def _top_window(self, conn, days, by, limit, offset=0):
+        """top_window mit kurzem Cache (Tageswerte ändern sich nur langsam)"""
+        key = (days, by, limit, offset)
+        now = time.monotonic()
+        with self._window_lock:
+            cached = self._window_cache.get(key)
+        if cached and now - cached[0] < self.WINDOW_CACHE_SEC:
+            return cached[1]
+        rows = leaderboard.top_window(conn, days, by, limit, offset)
+        with self._window_lock:
+            self._window_cache[key] = (now, rows)
+        return rows
+
+    def rebuild_leaderboard(self):
+        """Berechnet die Ranglisten-Tabellen komplett aus SpielHistorie neu"""
+        with self.pool.connection() as db:
+            leaderboard.rebuild(db.conn)
+        with self._window_lock:
+            self._window_cache.clear()
+
+    def get_player_rank(self, player_id, by='points', category_id=0, difficulty_id=0):
+        """Rang eines Spielers in einer Rangliste (None wenn nicht vorhanden)"""
+        with self.pool.connection() as db:
+            return leaderboard.player_rank(db.conn, player_id, by, category_id, difficulty_id)
+
+    def rebuild_seen_questions(self):
+        """Baut die Bitmaps gesehener Fragen aller Spieler neu auf (adaptive Auswahl)"""
+        with self.pool.connection() as db:
+            player_history.rebuild(db.conn)
+
+    def get_question_report(self, only_flagged=False, category_id=None):
+        """Auswertung je Frage (verdichtet vorher neue Antworten, siehe question_stats.py)"""
+        with self.pool.connection() as db:
+            question_stats.refresh(db.conn)
+            return question_stats.question_report(db.conn, only_flagged=only_flagged, category_id=category_id)
+
+    def get_unplayable_questions(self, min_wrong=None, category_id=None):
+        """Fragen mit zu wenig richtigen/falschen Antworten (Standard: laut Standard-Konfiguration)"""
+        if min_wrong is None:
+            min_wrong = self.get_game_config()['max_answers'] - 1
+        with self.pool.connection() as db:
+            return question_stats.unplayable_report(db.conn, min_wrong, category_id)
+
+    def rebuild_question_stats(self):
+        """Berechnet die Auswertung je Frage komplett aus SpielHistorie neu"""
+        with self.pool.connection() as db:
+            question_stats.rebuild(db.conn)
+    
+    def get_question_bank_stats(self):
+        """Größe des Fragen-Snapshots (baut ihn einmalig, falls er nicht aktiviert ist)"""
+        bank = self.question_bank or QuestionBank()
+        with self.pool.connection() as db:
+            return bank.stats(db.conn)
+
+    def export_question_bank(self, path=None):
+        """Schreibt die Bank-Datei neu (Standard: neben der Datenbank), liefert (Pfad, Fragen, Bytes)"""
+        path = path or bank_file.default_path(self.db_path)
+        with self.pool.connection() as db:
+            snapshot, size = export_bank(db.conn, path)
+        return path, len(snapshot), size
+
 
 class LoginWindow:
     """Login/Registrierungs-Fenster"""
     
-    def __init__(self, parent, db, on_success):
+    def __init__(self, parent, db, on_success, worker=None):
         self.parent = parent
         self.db = db
         self.on_success = on_success
+        self.worker = worker or DbWorker(parent)
+        self.busy = False
         
         self.window = tk.Toplevel(parent)
         self.window.title("Quiz App - Login")
@@ -323,37 +670,56 @@ class LoginWindow:
         btn_frame = ttk.Frame(login_frame)
         btn_frame.grid(row=2, column=0, columnspan=2, pady=20)
         
-        ttk.Button(
+        self.login_button = ttk.Button(
             btn_frame, 
             text="Anmelden", 
             command=self.login,
             width=12
-        ).pack(side='left', padx=5)
+        )
+        self.login_button.pack(side='left', padx=5)
         
-        ttk.Button(
+        self.register_button = ttk.Button(
             btn_frame, 
             text="Registrieren", 
             command=self.register,
             width=12
-        ).pack(side='left', padx=5)
+        )
+        self.register_button.pack(side='left', padx=5)
         
         # Enter-Taste für Login
         self.password_entry.bind('<Return>', lambda e: self.login())
         
+    def set_busy(self, busy):
+        """Sperrt die Buttons, solange eine Anfrage läuft"""
+        self.busy = busy
+        state = 'disabled' if busy else 'normal'
+        self.login_button.config(state=state)
+        self.register_button.config(state=state)
+    
     def login(self):
         username = self.username_entry.get().strip()
         password = self.password_entry.get()
         
+        if self.busy:
+            return
         if not username or not password:
             messagebox.showwarning("Eingabe fehlt", "Bitte alle Felder ausfüllen!")
             return
         
-        success, player_id, message = self.db.login_user(username, password)
+        self.set_busy(True)
+        self.worker.submit(
+            self.db.login_user, username, password,
+            callback=lambda result: self.on_login_result(username, result)
+        )
+    
+    def on_login_result(self, username, result):
+        success, player_id, message = result
         
         if success:
             self.window.destroy()
             self.on_success(player_id, username)
         else:
+            self.set_busy(False)
             messagebox.showerror("Login fehlgeschlagen", message)
     
     def register(self):
@@ -367,8 +733,15 @@ class LoginWindow:
         if len(password) < 4:
             messagebox.showwarning("Passwort zu kurz", "Passwort muss mindestens 4 Zeichen haben!")
             return
+        if self.busy:
+            return
         
-        success, message = self.db.register_user(username, password)
+        self.set_busy(True)
+        self.worker.submit(self.db.register_user, username, password, callback=self.on_register_result)
+    
+    def on_register_result(self, result):
+        success, message = result
+        self.set_busy(False)
         
         if success:
             messagebox.showinfo("Erfolg", "Registrierung erfolgreich! Bitte jetzt anmelden.")
@@ -378,12 +751,264 @@ class LoginWindow:
             messagebox.showerror("Registrierung fehlgeschlagen", message)
 
 
+class OpponentPicker:
+    """Gegnerauswahl mit Suche nach Namensanfang
+    
+    Lädt nur eine Seite Spieler und beim Scrollen ans Listenende die nächste.
+    """
+    
+    PAGE_SIZE = 20
+    SEARCH_DELAY_MS = 150
+    
+    def __init__(self, parent, db, player_id, on_select, worker=None):
+        self.parent = parent
+        self.db = db
+        self.player_id = player_id
+        self.on_select = on_select
+        self.worker = worker or DbWorker(parent)
+        
+        self.users = []
+        self.prefix = ""
+        self.has_more = False
+        self.loading = False
+        self.generation = 0
+        self.search_id = None
+        self.first_load = True
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Gegner auswählen")
+        self.window.geometry("300x400")
+        
+        self.setup_ui()
+        self.reload()
+    
+    def setup_ui(self):
+        ttk.Label(self.window, text="Wähle deinen Gegner:", font=('Arial', 12)).pack(pady=10)
+        
+        self.search_entry = ttk.Entry(self.window)
+        self.search_entry.pack(padx=20, fill='x')
+        self.search_entry.bind('<KeyRelease>', self.on_search_changed)
+        self.search_entry.focus()
+        
+        list_frame = ttk.Frame(self.window)
+        list_frame.pack(padx=20, pady=10, fill='both', expand=True)
+        self.scrollbar = ttk.Scrollbar(list_frame, orient='vertical')
+        self.listbox = tk.Listbox(list_frame, height=10, yscrollcommand=self.on_scroll)
+        self.scrollbar.config(command=self.listbox.yview)
+        self.scrollbar.pack(side='right', fill='y')
+        self.listbox.pack(side='left', fill='both', expand=True)
+        self.listbox.bind('<Double-Button-1>', lambda e: self.select())
+        
+        self.status_label = ttk.Label(self.window, text="Lade Spieler...")
+        self.status_label.pack()
+        
+        ttk.Button(self.window, text="Auswählen", command=self.select).pack(pady=10)
+    
+    def on_search_changed(self, event=None):
+        """Sucht erst nach einer kurzen Tipp-Pause"""
+        if self.search_id:
+            self.window.after_cancel(self.search_id)
+        self.search_id = self.window.after(self.SEARCH_DELAY_MS, self.reload)
+    
+    def reload(self):
+        """Beginnt die Liste zum aktuellen Suchtext neu"""
+        self.search_id = None
+        self.prefix = self.search_entry.get().strip()
+        self.generation += 1
+        self.users = []
+        self.has_more = True
+        self.loading = False
+        self.listbox.delete(0, 'end')
+        self.load_page()
+    
+    def load_page(self):
+        """Lädt die nächste Seite hinter dem letzten angezeigten Spieler"""
+        if self.loading or not self.has_more:
+            return
+        self.loading = True
+        generation = self.generation
+        after = self.users[-1] if self.users else None
+        self.worker.submit(
+            self.db.search_users, self.prefix, self.player_id, after, self.PAGE_SIZE,
+            callback=lambda users: self.on_page_loaded(generation, users)
+        )
+    
+    def on_page_loaded(self, generation, users):
+        # Ergebnisse zu einem veralteten Suchtext verwerfen
+        if generation != self.generation or not self.window.winfo_exists():
+            return
+        self.loading = False
+        if self.first_load:
+            self.first_load = False
+            if not users:
+                self.window.destroy()
+                messagebox.showinfo("Keine Gegner", "Es sind keine anderen Spieler registriert!")
+                return
+        
+        self.users.extend(users)
+        for user_id, user_name in users:
+            self.listbox.insert('end', user_name)
+        self.has_more = len(users) == self.PAGE_SIZE
+        if not self.users:
+            self.status_label.config(text="Keine Spieler gefunden")
+        else:
+            more = "+" if self.has_more else ""
+            self.status_label.config(text=f"{len(self.users)}{more} Spieler")
+    
+    def on_scroll(self, first, last):
+        """Scrollbar aktualisieren und kurz vor dem Listenende nachladen"""
+        self.scrollbar.set(first, last)
+        if float(last) >= 0.9:
+            self.load_page()
+    
+    def select(self):
+        selection = self.listbox.curselection()
+        if selection:
+            opponent_id, opponent_name = self.users[selection[0]]
+            self.window.destroy()
+            self.on_select(opponent_id, opponent_name)
+
+
+class LeaderboardWindow:
+    """Ranglisten (Top 100) mit Filter und eigenem Rang
+    
+    Liest nur die vorberechneten Ranglisten-Tabellen, daher bleibt das
+    Umschalten auch bei sehr vielen gespielten Antworten schnell.
+    """
+    
+    LIMIT = 100
+    ALL_LABEL = "Alle"
+    MODES = [
+        ("Punkte", 'points', None),
+        ("Trefferquote", 'accuracy', None),
+        ("Duelle gewonnen", 'duels', None),
+        ("Punkte (7 Tage)", 'points', 7),
+        ("Punkte (30 Tage)", 'points', 30),
+    ]
+    
+    def __init__(self, parent, db, player_id, worker=None):
+        self.parent = parent
+        self.db = db
+        self.player_id = player_id
+        self.worker = worker or DbWorker(parent)
+        self.generation = 0
+        self.categories = {self.ALL_LABEL: 0}
+        self.difficulties = {self.ALL_LABEL: 0}
+        
+        self.window = tk.Toplevel(parent)
+        self.window.title("Rangliste")
+        self.window.geometry("600x500")
+        
+        self.setup_ui()
+        self.worker.submit(self.db.get_categories, callback=self.fill_categories)
+        self.worker.submit(self.db.get_difficulties, callback=self.fill_difficulties)
+        self.refresh()
+    
+    def setup_ui(self):
+        filter_frame = ttk.Frame(self.window)
+        filter_frame.pack(fill='x', padx=10, pady=10)
+        
+        self.mode_combo = ttk.Combobox(
+            filter_frame, values=[label for label, _, _ in self.MODES], state='readonly', width=18
+        )
+        self.mode_combo.set(self.MODES[0][0])
+        self.mode_combo.pack(side='left', padx=5)
+        
+        self.cat_combo = ttk.Combobox(filter_frame, values=[self.ALL_LABEL], state='readonly', width=15)
+        self.cat_combo.set(self.ALL_LABEL)
+        self.cat_combo.pack(side='left', padx=5)
+        
+        self.diff_combo = ttk.Combobox(filter_frame, values=[self.ALL_LABEL], state='readonly', width=12)
+        self.diff_combo.set(self.ALL_LABEL)
+        self.diff_combo.pack(side='left', padx=5)
+        
+        for combo in (self.mode_combo, self.cat_combo, self.diff_combo):
+            combo.bind('<<ComboboxSelected>>', lambda e: self.refresh())
+        
+        columns = ('Rang', 'Spieler', 'Wert', 'Antworten')
+        self.tree = ttk.Treeview(self.window, columns=columns, show='headings', height=15)
+        for column, width in zip(columns, (60, 220, 120, 100)):
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=width)
+        self.tree.pack(fill='both', expand=True, padx=10)
+        
+        self.own_rank_label = ttk.Label(self.window, text="", font=('Arial', 11, 'bold'))
+        self.own_rank_label.pack(pady=10)
+    
+    def fill_categories(self, categories):
+        if self.window.winfo_exists():
+            self.categories.update({name: cat_id for cat_id, name in categories})
+            self.cat_combo['values'] = list(self.categories)
+    
+    def fill_difficulties(self, difficulties):
+        if self.window.winfo_exists():
+            self.difficulties.update({name: diff_id for diff_id, name, _ in difficulties})
+            self.diff_combo['values'] = list(self.difficulties)
+    
+    def refresh(self):
+        """Lädt Top-Liste und eigenen Rang zur aktuellen Auswahl"""
+        _, by, days = next(mode for mode in self.MODES if mode[0] == self.mode_combo.get())
+        # Duelle und Zeitfenster gibt es nur über alle Kategorien
+        filtered = by != 'duels' and not days
+        category_id = self.categories.get(self.cat_combo.get(), 0) if filtered else 0
+        difficulty_id = self.difficulties.get(self.diff_combo.get(), 0) if filtered else 0
+        
+        self.generation += 1
+        generation = self.generation
+        self.worker.submit(
+            self.load, by, category_id, difficulty_id, days,
+            callback=lambda result: self.show(generation, by, result)
+        )
+    
+    def load(self, by, category_id, difficulty_id, days):
+        """Top-Liste und eigener Rang (läuft im Worker-Thread)"""
+        rows = self.db.get_leaderboard(by, category_id, difficulty_id, self.LIMIT, days=days)
+        own = None
+        if by != 'duels' and not days:
+            own = self.db.get_player_rank(self.player_id, by, category_id, difficulty_id)
+        return rows, own
+    
+    def format_value(self, by, row):
+        if by == 'duels':
+            return f"{row[3]} Siege", f"{row[4]} Spiele"
+        if by == 'accuracy':
+            return f"{row[5] / row[4] * 100:.1f}%", row[4]
+        return f"{row[3]} Punkte", row[4]
+    
+    def show(self, generation, by, result):
+        if generation != self.generation or not self.window.winfo_exists():
+            return
+        rows, own = result
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            value, answers = self.format_value(by, row)
+            tags = ('own',) if row[1] == self.player_id else ()
+            self.tree.insert('', 'end', values=(row[0], row[2], value, answers), tags=tags)
+        
+        if own is None:
+            # Duelle und Zeitfenster: eigener Rang nur, wenn man in der Top-Liste steht
+            own = next((row for row in rows if row[1] == self.player_id), None)
+        if own:
+            value, _ = self.format_value(by, own)
+            self.own_rank_label.config(text=f"Dein Rang: {own[0]} ({value})")
+        else:
+            self.own_rank_label.config(text="" if not rows else "Du bist in dieser Rangliste noch nicht vertreten")
+
+
 class GameWindow:
-    """Hauptfenster für Quiz-Spiel"""
+    """Hauptfenster für Quiz-Spiel
     
-    def __init__(self, parent, db, player_id, username, is_duel=False, opponent_id=None, opponent_name=None, category_id=None, difficulty_id=None):
+    Im Duell öffnet das Fenster des Herausforderers ein zweites Fenster für den
+    Gegner (gleicher Rechner). Beide spielen über die DuelEngine denselben
+    Spielplan, Punktestände kommen als Ereignisse über den EventBus.
+    """
+    
+    def __init__(self, parent, db, player_id, username, is_duel=False, opponent_id=None, opponent_name=None, category_id=None, difficulty_id=None, worker=None, config_id=1, engine=None, session=None, adaptive=False):
         self.parent = parent
         self.db = db
+        self.worker = worker or DbWorker(parent)
+        self.engine = engine or DuelEngine(db)
+        self.session = session
         self.player_id = player_id
         self.username = username
         self.is_duel = is_duel
@@ -391,20 +1016,40 @@ class GameWindow:
         self.opponent_name = opponent_name
         self.category_id = category_id
         self.difficulty_id = difficulty_id
+        self.config_id = config_id
+        # Fragen bevorzugen, die die Spieler noch nicht kennen oder zuletzt falsch hatten
+        self.adaptive = adaptive
         
+        # Spiellänge, Zeit und Antwortanzahl kommen aus der Konfiguration (start_game)
+        self.config = None
         self.game_id = None
         self.current_question = None
         self.current_round = 1
-        self.max_rounds = 5
+        self.max_rounds = 1
+        self.questions_per_round = 1
+        self.question_in_round = 0
         self.asked_questions = []
-        self.timer_seconds = 30
+        self.time_limit = None  # Sekunden pro Frage, None = ohne Zeitlimit
+        self.timer_seconds = 0
+        self.timer_deadline = None
         self.timer_id = None
         
+        # Alle Fragen des Spiels stehen nach create_game im Spielplan und werden
+        # zusammen mit dem Spiel geladen; ein Fragewechsel braucht keine DB mehr
+        self.switch_started = None
+        self.switch_latencies = []  # ms vom Fragewechsel bis zur Anzeige
+        
         self.window = tk.Toplevel(parent)
         self.window.title(f"Quiz Spiel - {username}")
         self.window.geometry("700x600")
         
+        # Ereignisse des Spiels (kommen aus dem Journal-Thread, werden im Tk-Thread abgeholt)
+        self.events = queue.Queue()
+        self.unsubscribe = None
+        self.result_shown = False
+        
         self.setup_ui()
+        self.window.protocol("WM_DELETE_WINDOW", self.on_close)
         self.start_game()
         
     def setup_ui(self):
@@ -414,14 +1059,14 @@ class GameWindow:
         
         self.round_label = ttk.Label(
             self.header_frame, 
-            text=f"Runde 1/{self.max_rounds}",
+            text="Runde 1",
             font=('Arial', 12, 'bold')
         )
         self.round_label.pack(side='left')
         
         self.timer_label = ttk.Label(
             self.header_frame,
-            text="⏱️ 30s",
+            text="",
             font=('Arial', 12),
             foreground='green'
         )
@@ -459,17 +1104,10 @@ class GameWindow:
         )
         self.question_label.pack(pady=20)
         
-        # Antwort Buttons
+        # Antwort Buttons (Anzahl steht erst mit der Konfiguration fest)
+        self.answer_frame = ttk.Frame(self.question_frame)
+        self.answer_frame.pack(fill='x')
         self.answer_buttons = []
-        for i in range(4):
-            btn = ttk.Button(
-                self.question_frame,
-                text=f"Antwort {i+1}",
-                command=lambda idx=i: self.check_answer(idx),
-                width=60
-            )
-            btn.pack(pady=8, padx=20)
-            self.answer_buttons.append(btn)
         
         # Feedback Label
         self.feedback_label = ttk.Label(
@@ -478,30 +1116,107 @@ class GameWindow:
             font=('Arial', 11, 'bold')
         )
         self.feedback_label.pack(pady=5)
+    
+    def create_answer_buttons(self, count):
+        """Legt count Antwort-Buttons an"""
+        for btn in self.answer_buttons:
+            btn.destroy()
+        self.answer_buttons = []
+        for i in range(count):
+            btn = ttk.Button(
+                self.answer_frame,
+                text=f"Antwort {i+1}",
+                command=lambda idx=i: self.check_answer(idx),
+                width=60
+            )
+            btn.pack(pady=8, padx=20)
+            self.answer_buttons.append(btn)
         
     def start_game(self):
-        """Startet neues Spiel"""
+        """Startet neues Spiel (oder tritt dem übergebenen Duell bei)"""
+        if self.session is not None:
+            self.on_game_created(self.session)
+            return
+        
         player_ids = [self.player_id]
         if self.is_duel and self.opponent_id:
             player_ids.append(self.opponent_id)
         
-        self.game_id = self.db.create_game(player_ids, self.difficulty_id)
+        # Konfiguration, Spiel und Spielplan in einem Worker-Auftrag
+        self.worker.submit(
+            self.engine.create, player_ids, self.category_id, self.difficulty_id, self.config_id,
+            (), self.adaptive,
+            callback=self.on_game_created,
+            errback=self.on_game_error
+        )
+    
+    def on_game_created(self, session):
+        host = self.session is None
+        self.session = session
+        self.game_id = session.game_id
+        self.config = session.config
+        if not self.window.winfo_exists():
+            return
+        self.unsubscribe = self.engine.subscribe(self.game_id, self.events.put)
+        self.poll_events()
+        
+        self.max_rounds = self.config['rounds']
+        self.questions_per_round = self.config['questions_per_round']
+        self.create_answer_buttons(self.config['max_answers'])
+        
+        # MaxSpielzeitSec gilt für das ganze Spiel und wird auf die Fragen verteilt
+        max_time = self.config['max_time_sec']
+        if max_time:
+            self.time_limit = max(5, max_time // (self.max_rounds * self.questions_per_round))
         self.load_next_question()
         
+        if host and self.is_duel and self.opponent_id:
+            GameWindow(
+                self.parent, self.db, self.opponent_id, self.opponent_name,
+                is_duel=True, opponent_id=self.player_id, opponent_name=self.username,
+                worker=self.worker, engine=self.engine, session=session
+            )
+    
+    def on_close(self):
+        """Fenster geschlossen: Spiel beenden oder abbrechen, damit die Engine es freigibt"""
+        self.stop_timer()
+        session = self.session
+        if session is not None and not session.finished:
+            if session.all_done():
+                self.worker.submit(self.engine.finish, session)
+            elif not session.player_done(self.player_id):
+                # Wer mittendrin geht, bricht das Spiel ab (auch für den Gegner);
+                # wer fertig ist, überlässt das Beenden dem Gegner
+                self.engine.cancel(session, f"{self.username} hat das Spiel verlassen")
+        self.window.destroy()
+    
+    def on_game_error(self, error):
+        if self.window.winfo_exists():
+            messagebox.showerror("Fehler", f"Spiel konnte nicht gestartet werden: {error}")
+            self.window.destroy()
+        
     def start_timer(self):
         """Startet Countdown-Timer"""
-        self.timer_seconds = 30
+        if self.time_limit is None:
+            self.timer_label.config(text="")
+            return
+        # Feste Deadline statt after(1000) je Sekunde: verspätete Ticks summieren sich nicht auf
+        self.timer_deadline = time.perf_counter() + self.time_limit
         self.update_timer()
         
     def update_timer(self):
         """Aktualisiert Timer"""
+        remaining = self.timer_deadline - time.perf_counter()
+        self.timer_seconds = max(0, math.ceil(remaining))
         if self.timer_seconds > 0:
             color = 'green' if self.timer_seconds > 10 else 'orange' if self.timer_seconds > 5 else 'red'
             self.timer_label.config(text=f"⏱️ {self.timer_seconds}s", foreground=color)
-            self.timer_seconds -= 1
-            self.timer_id = self.window.after(1000, self.update_timer)
+            # Nächster Tick genau auf der nächsten vollen Sekunde
+            next_tick = remaining - (self.timer_seconds - 1)
+            self.timer_id = self.window.after(max(1, int(next_tick * 1000)), self.update_timer)
         else:
             # Zeit abgelaufen
+            self.timer_id = None
             self.timeout()
     
     def stop_timer(self):
@@ -515,29 +1230,26 @@ class GameWindow:
         self.stop_timer()
         self.disable_answers()
         
-        # Speichere als falsch
-        self.db.save_answer(
-            self.game_id, 
-            self.player_id, 
-            self.current_question['id'],
-            None,  # Keine Antwort
-            False,
-            self.current_round
-        )
+        # Speichere als falsch (keine Antwort)
+        if not self.submit_answer(None):
+            return
         
         self.feedback_label.config(text="⏰ Zeit abgelaufen!", foreground='red')
         self.window.after(2000, self.next_question_or_finish)
     
     def load_next_question(self):
-        """Lädt nächste Frage"""
+        """Zeigt die nächste Frage aus dem Spielplan"""
         self.feedback_label.config(text="")
-        
-        question = self.db.get_random_question(
-            self.category_id,
-            self.difficulty_id,
-            self.asked_questions
-        )
-        
+        if self.switch_started is None:
+            self.switch_started = time.perf_counter()
+        try:
+            question = self.engine.next_question(self.session, self.player_id)
+        except DuelError:
+            question = None
+        self.show_question(question)
+    
+    def show_question(self, question):
+        """Zeigt eine geladene Frage an"""
         if not question:
             messagebox.showerror("Fehler", "Keine weiteren Fragen verfügbar!")
             self.finish_game()
@@ -545,9 +1257,13 @@ class GameWindow:
         
         self.current_question = question
         self.asked_questions.append(question['id'])
+        self.question_in_round += 1
         
         # UI aktualisieren
-        self.round_label.config(text=f"Runde {self.current_round}/{self.max_rounds}")
+        self.round_label.config(
+            text=f"Runde {self.current_round}/{self.max_rounds} · "
+                 f"Frage {self.question_in_round}/{self.questions_per_round}"
+        )
         self.question_label.config(text=question['text'])
         
         # Antwort-Buttons aktualisieren
@@ -558,8 +1274,14 @@ class GameWindow:
                 style='TButton'
             )
         
+        self.switch_latencies.append((time.perf_counter() - self.switch_started) * 1000)
+        self.switch_started = None
         self.start_timer()
     
+    def last_switch_latency(self):
+        """Dauer des letzten Fragewechsels in ms (None vor der ersten Frage)"""
+        return self.switch_latencies[-1] if self.switch_latencies else None
+    
     def disable_answers(self):
         """Deaktiviert Antwort-Buttons"""
         for btn in self.answer_buttons:
@@ -574,15 +1296,9 @@ class GameWindow:
         correct_answer_id = self.current_question['correct_id']
         is_correct = (selected_answer_id == correct_answer_id)
         
-        # Speichere Antwort
-        self.db.save_answer(
-            self.game_id,
-            self.player_id,
-            self.current_question['id'],
-            selected_answer_id,
-            is_correct,
-            self.current_round
-        )
+        # Speichere Antwort (Punktestand kommt als Ereignis zurück)
+        if not self.submit_answer(selected_answer_id):
+            return
         
         # Feedback anzeigen
         if is_correct:
@@ -597,34 +1313,82 @@ class GameWindow:
                 if ans_id == correct_answer_id:
                     self.answer_buttons[i].config(style='Success.TButton')
         
-        # Scores aktualisieren
-        self.update_scores()
-        
-        # Weiter zur nächsten Frage
+        # Weiter zur nächsten Frage (steht bereits im Spielplan)
         self.window.after(3000, self.next_question_or_finish)
     
-    def update_scores(self):
-        """Aktualisiert Punkteanzeige"""
-        scores = self.db.get_game_scores(self.game_id)
+    def submit_answer(self, answer_id):
+        """Gibt die Antwort über die Engine ab (answer_id None = Zeit abgelaufen)
         
-        for username, score in scores:
-            if username == self.username:
-                self.score_label.config(text=f"{username}: {score}")
-            elif self.is_duel and username == self.opponent_name:
-                self.opponent_score_label.config(text=f"{username}: {score}")
+        Liefert False, wenn die Frage nicht mehr offen ist (z.B. Doppelklick oder
+        Timer nach der Abgabe); dann gilt die erste Abgabe.
+        """
+        try:
+            future = self.engine.submit_answer(
+                self.session, self.player_id, self.current_question['id'], answer_id
+            )
+        except DuelError:
+            return False
+        def on_saved(future):
+            # Fehler ebenfalls über die Ereignis-Queue in den Tk-Thread bringen
+            if future.exception() is not None:
+                self.events.put({'type': 'error', 'error': future.exception()})
+        future.add_done_callback(on_saved)
+        return True
+    
+    def poll_events(self):
+        """Holt Spielereignisse ab, solange das Fenster offen ist"""
+        if not self.window.winfo_exists():
+            self.unsubscribe()
+            return
+        while True:
+            try:
+                event = self.events.get_nowait()
+            except queue.Empty:
+                break
+            self.handle_event(event)
+        self.window.after(50, self.poll_events)
+    
+    def handle_event(self, event):
+        if event['type'] == 'score':
+            if event['player_id'] == self.player_id:
+                self.score_label.config(text=f"{self.username}: {event['score']}")
+            elif self.is_duel and event['player_id'] == self.opponent_id:
+                self.opponent_score_label.config(text=f"{self.opponent_name}: {event['score']}")
+        elif event['type'] == 'finished':
+            self.show_result(event['scores'])
+        elif event['type'] == 'error':
+            messagebox.showerror("Fehler", f"Antwort konnte nicht gespeichert werden: {event['error']}")
+        elif event['type'] == 'cancelled':
+            self.stop_timer()
+            messagebox.showinfo("Spiel abgebrochen", event['message'])
+            self.window.destroy()
     
     def next_question_or_finish(self):
-        """Entscheidet ob nächste Frage oder Spielende"""
-        if self.current_round < self.max_rounds:
+        """Entscheidet ob nächste Frage, nächste Runde oder Spielende"""
+        if not self.window.winfo_exists():
+            return
+        if self.question_in_round < self.questions_per_round:
+            self.switch_started = time.perf_counter()
+            self.load_next_question()
+        elif self.current_round < self.max_rounds:
+            self.switch_started = time.perf_counter()
             self.current_round += 1
+            self.question_in_round = 0
             self.load_next_question()
         else:
             self.finish_game()
     
     def finish_game(self):
-        """Beendet Spiel und zeigt Ergebnis"""
-        self.db.finish_game(self.game_id)
-        scores = self.db.get_game_scores(self.game_id)
+        """Beendet Spiel, sobald alle Spieler fertig sind (Ergebnis kommt als Ereignis)"""
+        if self.session.all_done():
+            self.worker.submit(self.engine.finish, self.session)
+        else:
+            self.feedback_label.config(text=f"⏳ Warte auf {self.opponent_name}...", foreground='blue')
+    
+    def show_result(self, scores):
+        if not self.window.winfo_exists() or self.result_shown:
+            return
+        self.result_shown = True
         
         # Erstelle Ergebnis-Fenster
         result_window = tk.Toplevel(self.window)
@@ -667,6 +1431,10 @@ class QuizMainApp:
         # Datenbank initialisieren
         db_path = os.path.join(os.path.dirname(__file__), "../database/quiz_app.db")
         self.db = QuizDatabase(db_path)
+        # Alle Datenbankzugriffe der Fenster laufen über diesen Worker
+        self.worker = DbWorker(root, monitor_ms=100)
+        # Laufende Spiele und Duelle (Punktestände per EventBus)
+        self.engine = DuelEngine(self.db)
         
         self.player_id = None
         self.username = None
@@ -686,7 +1454,7 @@ class QuizMainApp:
         
     def show_login(self):
         """Zeigt Login-Fenster"""
-        LoginWindow(self.root, self.db, self.on_login_success)
+        LoginWindow(self.root, self.db, self.on_login_success, worker=self.worker)
         
     def on_login_success(self, player_id, username):
         """Callback nach erfolgreichem Login"""
@@ -736,6 +1504,14 @@ class QuizMainApp:
             width=35
         ).pack(pady=10)
         
+        ttk.Button(
+            menu_frame,
+            text="🏆 Rangliste",
+            command=self.show_leaderboard,
+            style='Big.TButton',
+            width=35
+        ).pack(pady=10)
+        
         ttk.Button(
             menu_frame,
             text="❌ Beenden",
@@ -749,40 +1525,20 @@ class QuizMainApp:
     
     def start_duel(self):
         """Startet Duell-Modus"""
-        # Gegner auswählen
-        users = self.db.get_all_users(exclude_id=self.player_id)
-        
-        if not users:
-            messagebox.showinfo("Keine Gegner", "Es sind keine anderen Spieler registriert!")
-            return
-        
-        # Auswahl-Dialog
-        dialog = tk.Toplevel(self.root)
-        dialog.title("Gegner auswählen")
-        dialog.geometry("300x400")
-        
-        ttk.Label(dialog, text="Wähle deinen Gegner:", font=('Arial', 12)).pack(pady=10)
-        
-        listbox = tk.Listbox(dialog, height=10)
-        listbox.pack(padx=20, pady=10, fill='both', expand=True)
-        
-        for user_id, user_name in users:
-            listbox.insert('end', user_name)
-        
-        def on_select():
-            selection = listbox.curselection()
-            if selection:
-                opponent_id, opponent_name = users[selection[0]]
-                dialog.destroy()
-                self.select_game_options(is_duel=True, opponent_id=opponent_id, opponent_name=opponent_name)
-        
-        ttk.Button(dialog, text="Auswählen", command=on_select).pack(pady=10)
+        # Gegner auswählen (Spieler werden seitenweise gesucht)
+        OpponentPicker(
+            self.root, self.db, self.player_id,
+            on_select=lambda opponent_id, opponent_name: self.select_game_options(
+                is_duel=True, opponent_id=opponent_id, opponent_name=opponent_name
+            ),
+            worker=self.worker
+        )
     
     def select_game_options(self, is_duel=False, opponent_id=None, opponent_name=None):
         """Kategorie und Schwierigkeit auswählen"""
         dialog = tk.Toplevel(self.root)
         dialog.title("Spiel konfigurieren")
-        dialog.geometry("400x300")
+        dialog.geometry("400x340")
         
         ttk.Label(
             dialog, 
@@ -794,23 +1550,38 @@ class QuizMainApp:
         ttk.Label(dialog, text="Kategorie:").pack(anchor='w', padx=40)
         cat_combo = ttk.Combobox(dialog, state='readonly', width=30)
         cat_combo.pack(padx=40, pady=5)
-        
-        categories = self.db.get_categories()
-        cat_map = {name: cat_id for cat_id, name in categories}
-        cat_combo['values'] = list(cat_map.keys())
-        if cat_combo['values']:
-            cat_combo.current(0)
+        cat_map = {}
         
         # Schwierigkeit
         ttk.Label(dialog, text="Schwierigkeit:").pack(anchor='w', padx=40, pady=(15, 0))
         diff_combo = ttk.Combobox(dialog, state='readonly', width=30)
         diff_combo.pack(padx=40, pady=5)
+        diff_map = {}
         
-        difficulties = self.db.get_difficulties()
-        diff_map = {name: diff_id for diff_id, name, level in difficulties}
-        diff_combo['values'] = list(diff_map.keys())
-        if diff_combo['values']:
-            diff_combo.current(0)
+        # Adaptive Auswahl anhand der SpielHistorie (siehe QuizDatabase.create_game)
+        adaptive_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            dialog, text="Neue und zuletzt falsch beantwortete Fragen bevorzugen", variable=adaptive_var
+        ).pack(anchor='w', padx=40, pady=(15, 0))
+        
+        def fill_categories(categories):
+            if not dialog.winfo_exists():
+                return
+            cat_map.update({name: cat_id for cat_id, name in categories})
+            cat_combo['values'] = list(cat_map.keys())
+            if cat_combo['values']:
+                cat_combo.current(0)
+        
+        def fill_difficulties(difficulties):
+            if not dialog.winfo_exists():
+                return
+            diff_map.update({name: diff_id for diff_id, name, level in difficulties})
+            diff_combo['values'] = list(diff_map.keys())
+            if diff_combo['values']:
+                diff_combo.current(0)
+        
+        self.worker.submit(self.db.get_categories, callback=fill_categories)
+        self.worker.submit(self.db.get_difficulties, callback=fill_difficulties)
         
         def start_game():
             if not cat_combo.get() or not diff_combo.get():
@@ -831,7 +1602,10 @@ class QuizMainApp:
                 opponent_id=opponent_id,
                 opponent_name=opponent_name,
                 category_id=category_id,
-                difficulty_id=difficulty_id
+                difficulty_id=difficulty_id,
+                worker=self.worker,
+                engine=self.engine,
+                adaptive=adaptive_var.get()
             )
         
         ttk.Button(
@@ -841,10 +1615,15 @@ class QuizMainApp:
             style='Big.TButton'
         ).pack(pady=30)
     
+    def show_leaderboard(self):
+        """Zeigt die Ranglisten"""
+        LeaderboardWindow(self.root, self.db, self.player_id, worker=self.worker)
+    
     def show_statistics(self):
         """Zeigt Benutzerstatistiken"""
-        stats = self.db.get_user_statistics(self.player_id)
-        
+        self.worker.submit(self.db.get_user_statistics, self.player_id, callback=self.show_statistics_dialog)
+    
+    def show_statistics_dialog(self, stats):
         dialog = tk.Toplevel(self.root)
         dialog.title("Meine Statistiken")
         dialog.geometry("450x400")
@@ -892,6 +1671,8 @@ def main():
     root = tk.Tk()
     app = QuizMainApp(root)
     root.mainloop()
+    app.worker.shutdown()
+    app.db.close()
 
 
 if __name__ == "__main__":
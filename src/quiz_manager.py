@@ -1,13 +1,141 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+import logging
 import sqlite3
 import os
+import threading
+import time
+
+from db_pool import apply_migrations
+from db_worker import DbWorker
+from metadata_cache import MetadataCache
+from question_bank import bank_key, export_bank
+from question_search import match_expression, text_matches
+import bank_file
+import question_stats
+
+# Zeilen pro nachgeladener Seite der Fragenliste
+PAGE_SIZE = 200
+# Bank-Datei erst neu schreiben, wenn so lange nichts mehr geändert wurde (mehrere Änderungen zusammen)
+BANK_IDLE_SEC = 2.0
+ALL_ENTRIES = "Alle"
+
+logger = logging.getLogger(__name__)
+
+
+def question_page_query(after_id=0, category_id=None, difficulty_id=None, text=None, limit=PAGE_SIZE):
+    """SQL + Parameter für eine Seite der Fragenliste (Keyset über FrageID)
+
+    Statt OFFSET wird ab der letzten geladenen FrageID weitergelesen, damit auch
+    späte Seiten nur über den Index springen. Der Suchtext wird über den
+    Volltextindex (Frage- und Antworttexte) ausgewertet.
+    """
+    expression = match_expression(text)
+    source = "Frage f"
+    order = "f.FrageID"
+    conditions = ["f.FrageID > ?"]
+    params = [after_id]
+    if expression:
+        # CROSS JOIN: Volltextindex zuerst, sonst würde MATCH je Frage einer Kategorie neu ausgewertet
+        source = "FrageSuche fs CROSS JOIN Frage f ON f.FrageID = fs.rowid"
+        conditions = ["FrageSuche MATCH ?", "fs.rowid > ?"]
+        params = [expression, after_id]
+        order = "fs.rowid"
+    if category_id is not None:
+        conditions.append("f.KategorieID = ?")
+        params.append(category_id)
+    if difficulty_id is not None:
+        conditions.append("f.SchwierigkeitID = ?")
+        params.append(difficulty_id)
+    params.append(limit)
+
+    query = f"""
+            SELECT f.FrageID, k.Bezeichnung, s.Bezeichnung, f.FrageText
+            FROM {source}
+            JOIN Kategorie k ON f.KategorieID = k.KategorieID
+            JOIN Schwierigkeitsgrad s ON f.SchwierigkeitID = s.SchwierigkeitID
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {order}
+            LIMIT ?
+        """
+    return query, tuple(params)
+
+
+# --- Bank-Datei ---
+class BankSync:
+    """Schreibt die Bank-Datei in einem eigenen Thread mit eigener Verbindung neu
+
+    changed() startet die Wartezeit neu: exportiert wird erst, wenn seit der
+    letzten Änderung idle_sec vergangen sind, spätestens bei close(). So
+    blockiert der Export weder den DbWorker noch die Oberfläche.
+    """
+
+    def __init__(self, db_path, bank_path, idle_sec=BANK_IDLE_SEC):
+        self.db_path = db_path
+        self.bank_path = bank_path
+        self.idle_sec = idle_sec
+        self._lock = threading.Lock()
+        self._pending = False
+        self._last_change = 0.0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bank-sync", daemon=True)
+        self._thread.start()
+
+    def changed(self):
+        with self._lock:
+            self._pending = True
+            self._last_change = time.monotonic()
+        self._wake.set()
+
+    def close(self):
+        """Schreibt ausstehende Änderungen und beendet den Thread"""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _run(self):
+        # Lesende Verbindung (WAL): Schreiben im Manager läuft währenddessen weiter
+        conn = sqlite3.connect(self.db_path)
+        try:
+            while True:
+                self._wake.wait()
+                with self._lock:
+                    pending = self._pending
+                    remaining = self._last_change + self.idle_sec - time.monotonic()
+                if not self._stop.is_set():
+                    if not pending:
+                        self._wake.clear()
+                        continue
+                    if remaining > 0:
+                        # Weitere Änderungen verschieben den Export nur, bis Ruhe ist
+                        self._stop.wait(remaining)
+                        continue
+                with self._lock:
+                    self._pending = False
+                    self._wake.clear()
+                if pending:
+                    self._sync(conn)
+                if self._stop.is_set():
+                    break
+        finally:
+            conn.close()
+
+    def _sync(self, conn):
+        # Ob sich der Fragenbestand wirklich geändert hat, entscheidet der Stand in der Datei
+        try:
+            if bank_file.read_key(self.bank_path) != bank_key(conn):
+                export_bank(conn, self.bank_path)
+        except Exception:
+            logger.exception("Bank-Datei %s nicht geschrieben", self.bank_path)
+
 
 # --- Datenbank-Manager ---
 class DatabaseManager:
     def __init__(self, db_name="quiz_app.db", schema_file="schema.sql"):
         self.db_name = db_name
-        self.conn = sqlite3.connect(self.db_name)
+        # Nach dem Start greift nur noch der DbWorker-Thread auf die Verbindung zu
+        self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
         self.cursor = self.conn.cursor()
         
         # Prüfen, ob die Tabellen existieren, sonst schema.sql ausführen
@@ -15,6 +143,13 @@ class DatabaseManager:
             self.cursor.execute("SELECT * FROM Konfiguration")
         except sqlite3.OperationalError:
             self.initialize_db(schema_file)
+        
+        # Zusätzliche Tabellen/Trigger (z.B. Änderungszähler für den Fragen-Pool)
+        apply_migrations(self.conn)
+        # Kategorien/Schwierigkeitsgrade für Listen und Auswahlfelder
+        self.metadata = MetadataCache()
+        # Bank-Datei für Server mit --snapshot, nach Änderungen neu schreiben
+        self.bank_sync = BankSync(self.db_name, bank_file.default_path(self.db_name))
 
     def initialize_db(self, schema_file):
         if os.path.exists(schema_file):
@@ -27,23 +162,49 @@ class DatabaseManager:
             messagebox.showerror("Fehler", f"Datei '{schema_file}' nicht gefunden! Bitte erstellen Sie diese Datei mit dem SQL-Code.")
 
     def execute(self, query, params=()):
+        # Läuft im Worker-Thread: Fehler werden an den errback im Tk-Thread weitergereicht
         try:
             self.cursor.execute(query, params)
             self.conn.commit()
-            return self.cursor
-        except sqlite3.IntegrityError as e:
-            raise e
-        except sqlite3.Error as e:
-            messagebox.showerror("Datenbankfehler", str(e))
+            self.bank_sync.changed()
+            return self.cursor.lastrowid
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
 
     def fetch_all(self, query, params=()):
         self.cursor.execute(query, params)
         return self.cursor.fetchall()
 
+    def categories(self):
+        return self.metadata.categories(self.conn)
+
+    def difficulties(self):
+        return self.metadata.difficulties(self.conn)
+
+    def question_report(self, only_flagged=False):
+        # Erst die neuen Antworten aus SpielHistorie verdichten, dann auswerten
+        try:
+            question_stats.refresh(self.conn)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+        return question_stats.question_report(self.conn, only_flagged=only_flagged)
+
+    def answer_distribution(self, question_id):
+        return question_stats.answer_distribution(self.conn, question_id)
+
+    def unplayable_report(self):
+        # Grenze wie im Spiel: Antwortmöglichkeiten laut Standard-Konfiguration
+        min_wrong = self.metadata.game_config(self.conn, 1)['max_answers'] - 1
+        return min_wrong, question_stats.unplayable_report(self.conn, min_wrong)
+
 # --- GUI Anwendung ---
 class QuizApp:
     def __init__(self, root):
         self.db = DatabaseManager()
+        self.worker = DbWorker(root)
         self.root = root
         self.root.title("Quiz App Manager (Teil 1 - Angepasst)")
         self.root.geometry("900x600")
@@ -53,6 +214,8 @@ class QuizApp:
 
         self.setup_category_tab()
         self.setup_question_tab()
+        self.setup_stats_tab()
+        self.setup_unplayable_tab()
 
     # --- Tab: Kategorien verwalten ---
     def setup_category_tab(self):
@@ -78,17 +241,33 @@ class QuizApp:
 
         self.refresh_categories()
 
+    def show_db_error(self, error):
+        messagebox.showerror("Datenbankfehler", str(error))
+
+    def on_categories_changed(self, _=None):
+        # Eigene Schreibzugriffe ändern PRAGMA data_version dieser Verbindung nicht
+        self.db.metadata.invalidate()
+        self.refresh_categories()
+        self.refresh_dropdowns()
+
     def add_category(self):
         name = self.cat_entry.get()
         if name:
-            try:
-                # Angepasst an neue Tabelle: Kategorie (Bezeichnung)
-                self.db.execute("INSERT INTO Kategorie (Bezeichnung) VALUES (?)", (name,))
+            def on_added(_):
                 self.cat_entry.delete(0, 'end')
-                self.refresh_categories()
-                self.refresh_dropdowns()
-            except sqlite3.IntegrityError:
-                messagebox.showerror("Fehler", "Kategorie existiert bereits!")
+                self.on_categories_changed()
+
+            def on_error(error):
+                if isinstance(error, sqlite3.IntegrityError):
+                    messagebox.showerror("Fehler", "Kategorie existiert bereits!")
+                else:
+                    self.show_db_error(error)
+
+            # Angepasst an neue Tabelle: Kategorie (Bezeichnung)
+            self.worker.submit(
+                self.db.execute, "INSERT INTO Kategorie (Bezeichnung) VALUES (?)", (name,),
+                callback=on_added, errback=on_error
+            )
 
     def delete_category(self):
         selection = self.cat_list.curselection()
@@ -96,18 +275,20 @@ class QuizApp:
             cat_text = self.cat_list.get(selection[0])
             cat_id = cat_text.split(":")[0]
             # Angepasst: Tabelle Kategorie
-            try:
-                self.db.execute("DELETE FROM Kategorie WHERE KategorieID=?", (cat_id,))
-                self.refresh_categories()
-                self.refresh_dropdowns()
-            except sqlite3.Error:
-                messagebox.showerror("Fehler", "Kategorie kann nicht gelöscht werden (wird evtl. noch verwendet).")
+            self.worker.submit(
+                self.db.execute, "DELETE FROM Kategorie WHERE KategorieID=?", (cat_id,),
+                callback=self.on_categories_changed,
+                errback=lambda error: messagebox.showerror(
+                    "Fehler", "Kategorie kann nicht gelöscht werden (wird evtl. noch verwendet).")
+            )
 
     def refresh_categories(self):
-        self.cat_list.delete(0, 'end')
-        cats = self.db.fetch_all("SELECT KategorieID, Bezeichnung FROM Kategorie")
-        for cat in cats:
-            self.cat_list.insert('end', f"{cat[0]}: {cat[1]}")
+        def fill(cats):
+            self.cat_list.delete(0, 'end')
+            for cat in cats:
+                self.cat_list.insert('end', f"{cat[0]}: {cat[1]}")
+
+        self.worker.submit(self.db.categories, callback=fill, errback=self.show_db_error)
 
     # --- Tab: Fragen verwalten ---
     def setup_question_tab(self):
@@ -135,9 +316,30 @@ class QuizApp:
 
         ttk.Button(form_frame, text="Frage speichern", command=self.save_question).grid(row=2, column=1, sticky='w')
 
-        # Fragen Liste
+        # Filter (werden in der Datenbank ausgewertet)
+        filter_frame = ttk.Frame(self.q_frame, padding=(10, 0))
+        filter_frame.pack(fill='x')
+        ttk.Label(filter_frame, text="Filter Kategorie:").pack(side='left')
+        self.filter_cat_combo = ttk.Combobox(filter_frame, state="readonly", width=15)
+        self.filter_cat_combo.pack(side='left', padx=5)
+        ttk.Label(filter_frame, text="Level:").pack(side='left')
+        self.filter_diff_combo = ttk.Combobox(filter_frame, state="readonly", width=10)
+        self.filter_diff_combo.pack(side='left', padx=5)
+        ttk.Label(filter_frame, text="Suche:").pack(side='left')
+        self.filter_text = ttk.Entry(filter_frame)
+        self.filter_text.pack(side='left', expand=True, fill='x', padx=5)
+        self.filter_text.bind('<Return>', lambda e: self.refresh_questions())
+        ttk.Button(filter_frame, text="Filtern", command=self.refresh_questions).pack(side='left')
+        for combo in (self.filter_cat_combo, self.filter_diff_combo):
+            combo['values'] = [ALL_ENTRIES]
+            combo.current(0)
+            combo.bind('<<ComboboxSelected>>', lambda e: self.refresh_questions())
+
+        # Fragen Liste (seitenweise nachgeladen)
+        list_frame = ttk.Frame(self.q_frame)
+        list_frame.pack(expand=True, fill='both', padx=10, pady=5)
         columns = ("ID", "Kategorie", "Level", "Text")
-        self.q_tree = ttk.Treeview(self.q_frame, columns=columns, show='headings')
+        self.q_tree = ttk.Treeview(list_frame, columns=columns, show='headings')
         self.q_tree.heading("ID", text="ID")
         self.q_tree.heading("Kategorie", text="Kategorie")
         self.q_tree.heading("Level", text="Level")
@@ -146,27 +348,46 @@ class QuizApp:
         self.q_tree.column("ID", width=30)
         self.q_tree.column("Kategorie", width=120)
         self.q_tree.column("Level", width=80)
-        self.q_tree.pack(expand=True, fill='both', padx=10, pady=5)
+        self.q_scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=self.q_tree.yview)
+        self.q_tree.configure(yscrollcommand=self.on_question_scroll)
+        self.q_scrollbar.pack(side='right', fill='y')
+        self.q_tree.pack(side='left', expand=True, fill='both')
+
+        # Zustand der Seitenabfrage
+        self.cat_map = {}
+        self.diff_map = {}
+        self.q_filter = (None, None, None)
+        self.q_last_id = 0
+        self.q_has_more = False
+        self.q_loading = False
+        self.q_generation = 0
 
         # Aktionen
         action_frame = ttk.Frame(self.q_frame, padding=10)
         action_frame.pack(fill='x')
         ttk.Button(action_frame, text="Antworten verwalten (Auswahl)", command=self.manage_answers).pack(side='left')
         ttk.Button(action_frame, text="Frage löschen", command=self.delete_question).pack(side='right')
+        self.q_status = ttk.Label(action_frame, text="")
+        self.q_status.pack(side='right', padx=10)
 
         self.refresh_dropdowns()
         self.refresh_questions()
 
     def refresh_dropdowns(self):
-        # Kategorien laden
-        cats = self.db.fetch_all("SELECT KategorieID, Bezeichnung FROM Kategorie")
-        self.cat_map = {name: id for id, name in cats}
-        self.q_cat_combo['values'] = list(self.cat_map.keys())
+        def load():
+            # Kategorien und Schwierigkeitsgrade (aus dem Metadaten-Cache)
+            return self.db.categories(), self.db.difficulties()
 
-        # Schwierigkeitsgrade laden
-        diffs = self.db.fetch_all("SELECT SchwierigkeitID, Bezeichnung FROM Schwierigkeitsgrad")
-        self.diff_map = {name: id for id, name in diffs}
-        self.q_diff_combo['values'] = list(self.diff_map.keys())
+        def fill(result):
+            cats, diffs = result
+            self.cat_map = {name: id for id, name in cats}
+            self.q_cat_combo['values'] = list(self.cat_map.keys())
+            self.diff_map = {name: id for id, name, _ in diffs}
+            self.q_diff_combo['values'] = list(self.diff_map.keys())
+            self.filter_cat_combo['values'] = [ALL_ENTRIES] + list(self.cat_map.keys())
+            self.filter_diff_combo['values'] = [ALL_ENTRIES] + list(self.diff_map.keys())
+
+        self.worker.submit(load, callback=fill, errback=self.show_db_error)
 
     def save_question(self):
         cat_name = self.q_cat_combo.get()
@@ -180,36 +401,106 @@ class QuizApp:
         cat_id = self.cat_map[cat_name]
         diff_id = self.diff_map[diff_name]
 
+        def on_saved(q_id):
+            self.q_text.delete("1.0", 'end')
+            # Neue Frage hat die höchste ID: nur anhängen, wenn die Liste schon bis
+            # zum Ende geladen ist (sonst kommt sie mit der letzten Seite)
+            if not self.q_has_more and not self.q_loading and self.matches_filter(cat_id, diff_id, text):
+                self.insert_question_row((q_id, cat_name, diff_name, text))
+                self.update_question_status()
+
         # Insert in neue Tabellenstruktur
-        self.db.execute(
+        self.worker.submit(
+            self.db.execute,
             "INSERT INTO Frage (FrageText, KategorieID, SchwierigkeitID) VALUES (?, ?, ?)", 
-            (text, cat_id, diff_id)
+            (text, cat_id, diff_id),
+            callback=on_saved, errback=self.show_db_error
+        )
+
+    def current_filter(self):
+        """(KategorieID, SchwierigkeitID, Text) aus der Filterleiste, None = alle"""
+        cat_name = self.filter_cat_combo.get()
+        diff_name = self.filter_diff_combo.get()
+        text = self.filter_text.get().strip()
+        return (
+            self.cat_map.get(cat_name) if cat_name != ALL_ENTRIES else None,
+            self.diff_map.get(diff_name) if diff_name != ALL_ENTRIES else None,
+            text or None,
         )
-        self.q_text.delete("1.0", 'end')
-        self.refresh_questions()
+
+    def matches_filter(self, cat_id, diff_id, text):
+        category_id, difficulty_id, search = self.q_filter
+        return ((category_id is None or category_id == cat_id)
+                and (difficulty_id is None or difficulty_id == diff_id)
+                and (not search or text_matches(search, text)))
 
     def refresh_questions(self):
-        for row in self.q_tree.get_children():
-            self.q_tree.delete(row)
-        
-        # Join über die 3 Tabellen für die Anzeige
-        query = """
-            SELECT f.FrageID, k.Bezeichnung, s.Bezeichnung, f.FrageText 
-            FROM Frage f
-            JOIN Kategorie k ON f.KategorieID = k.KategorieID
-            JOIN Schwierigkeitsgrad s ON f.SchwierigkeitID = s.SchwierigkeitID
-        """
-        questions = self.db.fetch_all(query)
-        for q in questions:
-            self.q_tree.insert("", "end", values=q)
+        """Leert die Liste und lädt die erste Seite zum aktuellen Filter"""
+        self.q_filter = self.current_filter()
+        self.q_generation += 1
+        self.q_last_id = 0
+        self.q_has_more = True
+        self.q_loading = False
+        self.q_tree.delete(*self.q_tree.get_children())
+        self.load_question_page()
+
+    def load_question_page(self):
+        """Lädt die nächste Seite ab der zuletzt angezeigten FrageID"""
+        if self.q_loading or not self.q_has_more:
+            return
+        self.q_loading = True
+        generation = self.q_generation
+
+        def fill(questions):
+            # Antwort auf einen inzwischen geänderten Filter verwerfen
+            if generation != self.q_generation:
+                return
+            self.q_loading = False
+            for q in questions:
+                self.insert_question_row(q)
+            if questions:
+                self.q_last_id = questions[-1][0]
+            self.q_has_more = len(questions) == PAGE_SIZE
+            self.update_question_status()
+
+        def on_error(error):
+            if generation == self.q_generation:
+                self.q_loading = False
+            self.show_db_error(error)
+
+        query, params = question_page_query(self.q_last_id, *self.q_filter)
+        self.worker.submit(self.db.fetch_all, query, params, callback=fill, errback=on_error)
+
+    def insert_question_row(self, row):
+        self.q_tree.insert("", "end", iid=str(row[0]), values=row)
+
+    def on_question_scroll(self, first, last):
+        """Scrollbar aktualisieren und kurz vor dem Listenende nachladen"""
+        self.q_scrollbar.set(first, last)
+        if float(last) >= 0.9:
+            self.load_question_page()
+
+    def update_question_status(self):
+        count = len(self.q_tree.get_children())
+        more = " (weitere beim Scrollen)" if self.q_has_more else ""
+        self.q_status.config(text=f"{count} Fragen geladen{more}")
 
     def delete_question(self):
         selected = self.q_tree.selection()
         if selected:
-            q_id = self.q_tree.item(selected[0])['values'][0]
+            row_id = selected[0]
+            q_id = self.q_tree.item(row_id)['values'][0]
+
+            def on_deleted(_):
+                if self.q_tree.exists(row_id):
+                    self.q_tree.delete(row_id)
+                    self.update_question_status()
+
             # Dank ON DELETE CASCADE im SQL Skript werden Antworten automatisch gelöscht
-            self.db.execute("DELETE FROM Frage WHERE FrageID=?", (q_id,))
-            self.refresh_questions()
+            self.worker.submit(
+                self.db.execute, "DELETE FROM Frage WHERE FrageID=?", (q_id,),
+                callback=on_deleted, errback=self.show_db_error
+            )
 
     # --- Antworten verwalten ---
     def manage_answers(self):
@@ -220,7 +511,9 @@ class QuizApp:
         
         q_id = self.q_tree.item(selected[0])['values'][0]
         q_text = self.q_tree.item(selected[0])['values'][3]
+        self.open_answers(q_id, str(q_text))
 
+    def open_answers(self, q_id, q_text):
         win = tk.Toplevel(self.root)
         win.title(f"Antworten für: {q_text[:30]}...")
         win.geometry("600x400")
@@ -237,14 +530,19 @@ class QuizApp:
 
         def add_ans():
             if ans_entry.get():
+                def on_added(_):
+                    if win.winfo_exists():
+                        ans_entry.delete(0, 'end')
+                        is_correct_var.set(False)
+                        refresh_ans()
+
                 # Angepasst: Tabelle Antwort (AntwortText, IstRichtig, FrageID)
-                self.db.execute(
+                self.worker.submit(
+                    self.db.execute,
                     "INSERT INTO Antwort (AntwortText, IstRichtig, FrageID) VALUES (?, ?, ?)",
-                    (ans_entry.get(), is_correct_var.get(), q_id)
+                    (ans_entry.get(), is_correct_var.get(), q_id),
+                    callback=on_added, errback=self.show_db_error
                 )
-                ans_entry.delete(0, 'end')
-                is_correct_var.set(False)
-                refresh_ans()
 
         ttk.Button(input_frame, text="Antwort hinzufügen", command=add_ans).pack(anchor='w', pady=5)
 
@@ -252,15 +550,143 @@ class QuizApp:
         ans_list = tk.Listbox(win)
         ans_list.pack(expand=True, fill='both', padx=10, pady=5)
 
-        def refresh_ans():
+        def fill_ans(answers):
+            if not win.winfo_exists():
+                return
             ans_list.delete(0, 'end')
-            answers = self.db.fetch_all("SELECT AntwortText, IstRichtig FROM Antwort WHERE FrageID=?", (q_id,))
             for ans in answers:
                 status = "[RICHTIG]" if ans[1] else "[FALSCH]"
                 ans_list.insert('end', f"{status} {ans[0]}")
 
+        def refresh_ans():
+            self.worker.submit(
+                self.db.fetch_all, "SELECT AntwortText, IstRichtig FROM Antwort WHERE FrageID=?", (q_id,),
+                callback=fill_ans, errback=self.show_db_error
+            )
+
         refresh_ans()
 
+    # --- Tab: Fragen-Statistik ---
+    def setup_stats_tab(self):
+        self.stats_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.stats_frame, text="Fragen-Statistik")
+
+        top_frame = ttk.Frame(self.stats_frame, padding=10)
+        top_frame.pack(fill='x')
+        ttk.Button(top_frame, text="Aktualisieren", command=self.refresh_stats).pack(side='left')
+        self.stats_flagged_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(
+            top_frame, text="Nur auffällige (Level passt nicht zur Trefferquote)",
+            variable=self.stats_flagged_var, command=self.refresh_stats
+        ).pack(side='left', padx=10)
+        self.stats_status = ttk.Label(top_frame, text="")
+        self.stats_status.pack(side='right')
+
+        columns = ("ID", "Kategorie", "Level", "Empirisch", "Gestellt", "Quote", "Beantwortet", "Text")
+        self.stats_tree = ttk.Treeview(self.stats_frame, columns=columns, show='headings', height=14)
+        for column, width in zip(columns, (40, 110, 70, 70, 60, 60, 80, 300)):
+            self.stats_tree.heading(column, text=column)
+            self.stats_tree.column(column, width=width)
+        self.stats_tree.pack(expand=True, fill='both', padx=10)
+        self.stats_tree.bind('<<TreeviewSelect>>', lambda e: self.show_answer_distribution())
+
+        # Verteilung der gewählten Antworten zur markierten Frage
+        ttk.Label(self.stats_frame, text="Gewählte Antworten:").pack(anchor='w', padx=10)
+        self.stats_answers = tk.Listbox(self.stats_frame, height=6)
+        self.stats_answers.pack(fill='x', padx=10, pady=5)
+
+        self.stats_generation = 0
+        self.refresh_stats()
+
+    def refresh_stats(self):
+        self.stats_generation += 1
+        generation = self.stats_generation
+        self.stats_status.config(text="Wird ausgewertet ...")
+
+        def fill(report):
+            if generation != self.stats_generation:
+                return
+            self.stats_tree.delete(*self.stats_tree.get_children())
+            self.stats_answers.delete(0, 'end')
+            for entry in report:
+                self.stats_tree.insert("", "end", iid=str(entry['id']), values=(
+                    entry['id'], entry['category'], entry['level'], entry['empirical_level'] or "-",
+                    entry['asked'], f"{entry['accuracy'] * 100:.0f}%", f"{entry['answer_rate'] * 100:.0f}%",
+                    entry['text']
+                ))
+            flagged = sum(1 for entry in report if entry['flagged'])
+            self.stats_status.config(text=f"{len(report)} Fragen, {flagged} auffällig")
+
+        self.worker.submit(
+            self.db.question_report, self.stats_flagged_var.get(),
+            callback=fill, errback=self.show_db_error
+        )
+
+    def show_answer_distribution(self):
+        selected = self.stats_tree.selection()
+        if not selected:
+            return
+        q_id = int(selected[0])
+
+        def fill(answers):
+            if self.stats_tree.selection()[:1] != (selected[0],):
+                return
+            self.stats_answers.delete(0, 'end')
+            for _, text, is_correct, chosen, share in answers:
+                status = "[RICHTIG]" if is_correct else "[FALSCH]"
+                self.stats_answers.insert('end', f"{share * 100:5.1f}%  ({chosen}x)  {status} {text}")
+
+        self.worker.submit(self.db.answer_distribution, q_id, callback=fill, errback=self.show_db_error)
+
+    # --- Tab: Nicht spielbare Fragen ---
+    def setup_unplayable_tab(self):
+        self.unplayable_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.unplayable_frame, text="Nicht spielbar")
+
+        top_frame = ttk.Frame(self.unplayable_frame, padding=10)
+        top_frame.pack(fill='x')
+        ttk.Button(top_frame, text="Aktualisieren", command=self.refresh_unplayable).pack(side='left')
+        ttk.Button(
+            top_frame, text="Antworten verwalten (Auswahl)", command=self.manage_unplayable_answers
+        ).pack(side='left', padx=10)
+        self.unplayable_status = ttk.Label(top_frame, text="")
+        self.unplayable_status.pack(side='right')
+
+        columns = ("ID", "Kategorie", "Level", "Richtig", "Falsch", "Text")
+        self.unplayable_tree = ttk.Treeview(self.unplayable_frame, columns=columns, show='headings')
+        for column, width in zip(columns, (40, 110, 70, 60, 60, 400)):
+            self.unplayable_tree.heading(column, text=column)
+            self.unplayable_tree.column(column, width=width)
+        self.unplayable_tree.pack(expand=True, fill='both', padx=10, pady=(0, 10))
+        self.unplayable_tree.bind('<Double-1>', lambda e: self.manage_unplayable_answers())
+
+        self.refresh_unplayable()
+
+    def refresh_unplayable(self):
+        self.unplayable_status.config(text="Wird geladen ...")
+
+        def fill(result):
+            min_wrong, report = result
+            self.unplayable_tree.delete(*self.unplayable_tree.get_children())
+            for entry in report:
+                self.unplayable_tree.insert("", "end", iid=str(entry['id']), values=(
+                    entry['id'], entry['category'], entry['level'],
+                    entry['correct_answers'], entry['wrong_answers'], entry['text']
+                ))
+            self.unplayable_status.config(
+                text=f"{len(report)} Fragen ohne 1 richtige und {min_wrong} falsche Antworten"
+            )
+
+        self.worker.submit(self.db.unplayable_report, callback=fill, errback=self.show_db_error)
+
+    def manage_unplayable_answers(self):
+        selected = self.unplayable_tree.selection()
+        if not selected:
+            messagebox.showinfo("Info", "Bitte erst eine Frage aus der Liste auswählen.")
+            return
+        values = self.unplayable_tree.item(selected[0])['values']
+        self.open_answers(values[0], str(values[5]))
+
 if __name__ == "__main__":
     # Stellt sicher, dass wir im richtigen Verzeichnis arbeiten
     if not os.path.exists("schema.sql"):
@@ -269,4 +695,6 @@ if __name__ == "__main__":
     
     root = tk.Tk()
     app = QuizApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    app.worker.shutdown()
+    app.db.bank_sync.close()
\ No newline at end of file
@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quiz App Server - REST-Schnittstelle nach docs/quiz_api.yaml
+Asynchroner HTTP-Server, SQLite-Zugriffe laufen in einem begrenzten Thread-Pool
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from duel_engine import DuelEngine, DuelError
+from password_hasher import PasswordHasher
+from quiz_client import QuizDatabase
+
+
+MAX_BODY_SIZE = 64 * 1024
+IDLE_TIMEOUT_SEC = 30
+
+STATUS_TEXT = {
+    200: "OK",
+    201: "Created",
+    400: "Bad Request",
+    401: "Unauthorized",
+    403: "Forbidden",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    409: "Conflict",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+# HTTP-Status für ungültige Spielzüge der Engine
+DUEL_ERROR_STATUS = {
+    DuelError.NOT_FOUND: 404,
+    DuelError.NOT_PLAYER: 403,
+    DuelError.ALL_ANSWERED: 409,
+    DuelError.NO_QUESTIONS: 404,
+    DuelError.NOT_OPEN: 409,
+    DuelError.INVALID_ANSWER: 400,
+    DuelError.NOT_INVITED: 403,
+}
+
+
+class HttpError(Exception):
+    """Fehler, der direkt als HTTP-Antwort zurückgegeben wird"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class QuizServer:
+    """Implementiert die Endpunkte der Quiz-API auf Basis von QuizDatabase"""
+
+    def __init__(self, db, max_workers=8, max_pending=256):
+        self.db = db
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="quiz-db")
+        # Begrenzt die Anzahl wartender DB-Aufträge (Backpressure statt endloser Queue)
+        self.db_slots = asyncio.Semaphore(max_pending)
+        # Laufende Spiele; Punktestände kommen aus den Commits des Journals
+        self.engine = DuelEngine(db)
+
+        self.routes = [
+            ('POST', re.compile(r'^/auth/register$'), self.handle_register),
+            ('POST', re.compile(r'^/auth/login$'), self.handle_login),
+            ('GET', re.compile(r'^/categories$'), self.handle_categories),
+            ('GET', re.compile(r'^/difficulties$'), self.handle_difficulties),
+            ('POST', re.compile(r'^/games$'), self.handle_create_game),
+            ('POST', re.compile(r'^/games/(\d+)/join$'), self.handle_join_game),
+            ('GET', re.compile(r'^/games/(\d+)/question$'), self.handle_question),
+            ('POST', re.compile(r'^/games/(\d+)/answer$'), self.handle_answer),
+            ('GET', re.compile(r'^/games/(\d+)/status$'), self.handle_status),
+            ('GET', re.compile(r'^/statistics/user/(\d+)$'), self.handle_statistics),
+        ]
+
+    async def run_db(self, func, *args):
+        """Führt einen blockierenden DB-Aufruf im Thread-Pool aus"""
+        async with self.db_slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+
+    # --- HTTP-Schicht ---
+
+    async def handle_client(self, reader, writer):
+        """Bearbeitet eine (Keep-Alive) Verbindung"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT_SEC)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    self.write_response(writer, 400, {'error': "Ungültige Anfragezeile"}, False)
+                    break
+                method, target, version = parts
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get('connection', '').lower()
+                if version == 'HTTP/1.1':
+                    keep_alive = connection != 'close'
+                else:
+                    keep_alive = connection == 'keep-alive'
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > MAX_BODY_SIZE:
+                    self.write_response(writer, 413 if length > 0 else 400,
+                                        {'error': "Ungültige Content-Length"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, target, headers, body)
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def write_response(self, writer, status, payload, keep_alive):
+        data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(data)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode('latin-1') + data)
+
+    async def dispatch(self, method, target, headers, body):
+        """Sucht passende Route und ruft den Handler auf"""
+        path = target.split('?', 1)[0]
+        # Basis-URL aus der Spezifikation (/v1) ist optional
+        if path.startswith('/v1/'):
+            path = path[3:]
+
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            try:
+                request = {
+                    'headers': headers,
+                    'params': [int(g) for g in match.groups()],
+                    'body': body,
+                }
+                return await handler(request)
+            except HttpError as e:
+                return e.status, {'error': e.message}
+            except DuelError as e:
+                return DUEL_ERROR_STATUS[e.reason], {'error': e.message}
+            except Exception as e:
+                return 500, {'error': f"Fehler: {str(e)}"}
+
+        if path_matched:
+            return 405, {'error': "Methode nicht erlaubt"}
+        return 404, {'error': "Unbekannter Pfad"}
+
+    # --- Hilfsfunktionen ---
+
+    def parse_json(self, request, *fields):
+        try:
+            data = json.loads(request['body'] or b'{}')
+        except ValueError:
+            raise HttpError(400, "Ungültiges JSON")
+        if not isinstance(data, dict):
+            raise HttpError(400, "JSON-Objekt erwartet")
+        for field in fields:
+            if data.get(field) in (None, ''):
+                raise HttpError(400, f"Feld '{field}' fehlt")
+        return data
+
+    def parse_int(self, data, field):
+        value = data.get(field)
+        if not isinstance(value, int) or isinstance(value, bool):
+            raise HttpError(400, f"Feld '{field}' muss eine Zahl sein")
+        return value
+
+    async def authenticate(self, request):
+        """Prüft X-Session-Key und liefert (SpielerID, Username)"""
+        session_key = request['headers'].get('x-session-key')
+        if not session_key:
+            raise HttpError(401, "X-Session-Key fehlt")
+        # Aktive Sessions direkt aus dem Speicher, nur unbekannte Keys über den Thread-Pool
+        player = self.db.sessions.get(session_key)
+        if player is None:
+            player = await self.run_db(self.db.get_session_player, session_key)
+        if not player:
+            raise HttpError(401, "Ungültiger Session Key")
+        return player
+
+    def get_session(self, game_id, player_id=None):
+        return self.engine.get(game_id, player_id)
+
+    async def finish_session(self, session):
+        if not session.finished:
+            await self.run_db(self.engine.finish, session)
+
+    # --- Endpunkte ---
+
+    async def handle_register(self, request):
+        data = self.parse_json(request, 'username', 'password')
+        username = str(data['username']).strip()
+        password = str(data['password'])
+        if len(password) < 4:
+            raise HttpError(400, "Passwort muss mindestens 4 Zeichen haben!")
+
+        # Hashen im Prozess-Pool, ohne einen DB-Thread zu belegen
+        password_hash = await asyncio.wrap_future(self.db.passwords.hash_async(password))
+        success, message = await self.run_db(self.db.register_user, username, password, password_hash)
+        if not success:
+            raise HttpError(409, message)
+        player_id, name, session_time = await self.run_db(self.db.get_player, username)
+        return 201, {'id': player_id, 'username': name, 'sessionTime': session_time}
+
+    async def handle_login(self, request):
+        data = self.parse_json(request, 'username', 'password')
+        login = await self.run_db(self.db.get_login, str(data['username']).strip())
+        # Passwortprüfung im Prozess-Pool (wie QuizDatabase.create_session, aber ohne zu blockieren)
+        valid, new_hash = await asyncio.wrap_future(
+            self.db.passwords.verify_async(str(data['password']), login[2] if login else None)
+        )
+        if not valid:
+            raise HttpError(401, "Falsche Anmeldedaten!")
+        if new_hash:
+            await self.run_db(self.db.update_password_hash, login[0], login[2], new_hash)
+        session = await self.run_db(self.db.open_session, login[0], login[1])
+        return 200, {
+            'sessionKey': session['session_key'],
+            'sessionTime': session['session_time'].isoformat()
+        }
+
+    async def handle_categories(self, request):
+        categories = await self.run_db(self.db.get_categories)
+        return 200, [{'id': cat_id, 'name': name} for cat_id, name in categories]
+
+    async def handle_difficulties(self, request):
+        difficulties = await self.run_db(self.db.get_difficulties)
+        return 200, [
+            {'id': diff_id, 'name': name, 'level': level}
+            for diff_id, name, level in difficulties
+        ]
+
+    async def handle_create_game(self, request):
+        player_id, _ = await self.authenticate(request)
+        data = self.parse_json(request, 'categoryId', 'difficultyId')
+        category_id = self.parse_int(data, 'categoryId')
+        difficulty_id = self.parse_int(data, 'difficultyId')
+
+        mode = data.get('mode', 'single')
+        player_ids = data.get('playerIds') or [player_id]
+        if mode not in ('single', 'duel'):
+            raise HttpError(400, "mode muss 'single' oder 'duel' sein")
+        if not all(isinstance(p, int) for p in player_ids) or len(set(player_ids)) != len(player_ids):
+            raise HttpError(400, "playerIds ungültig")
+        if player_id not in player_ids:
+            raise HttpError(403, "Eigene Spieler-ID fehlt in playerIds")
+        if (mode == 'single') != (len(player_ids) == 1):
+            raise HttpError(400, "Anzahl der Spieler passt nicht zum Modus")
+        adaptive = data.get('adaptive', False)
+        if not isinstance(adaptive, bool):
+            raise HttpError(400, "Feld 'adaptive' muss true oder false sein")
+
+        # Gegner nehmen erst teil, wenn sie mit ihrer eigenen Session beitreten
+        invited_ids = [p for p in player_ids if p != player_id]
+        session = await self.run_db(
+            self.engine.create, [player_id], category_id, difficulty_id, 1, invited_ids, adaptive
+        )
+        return 201, self.game_info(session, invited_ids)
+
+    async def handle_join_game(self, request):
+        player_id, _ = await self.authenticate(request)
+        session = self.get_session(request['params'][0])
+        await self.run_db(self.engine.join, session, player_id)
+        return 200, self.game_info(session, sorted(session.invited))
+
+    def game_info(self, session, invited_ids):
+        config = session.config
+        return {
+            'gameId': session.game_id,
+            'config': {
+                'rounds': config['rounds'],
+                'questionsPerRound': config['questions_per_round'],
+                'maxTimeSeconds': config['max_time_sec']
+            },
+            'invitedPlayerIds': invited_ids,
+            'startTime': datetime.now().isoformat()
+        }
+
+    async def handle_question(self, request):
+        player_id, _ = await self.authenticate(request)
+        session = self.get_session(request['params'][0], player_id)
+
+        # Bereits ausgelieferte, noch unbeantwortete Frage erneut liefern
+        try:
+            question = self.engine.next_question(session, player_id)
+        except DuelError as e:
+            # Erst beenden, wenn auch der Gegner fertig ist (er kann noch mitten in einer Antwort sein)
+            if e.reason == DuelError.NO_QUESTIONS and session.all_done():
+                await self.finish_session(session)
+            raise
+
+        categories = dict(await self.run_db(self.db.get_categories))
+        difficulties = {d[0]: d for d in await self.run_db(self.db.get_difficulties)}
+        difficulty = difficulties.get(session.difficulty_id, (session.difficulty_id, None, None))
+
+        return 200, {
+            'id': question['id'],
+            'text': question['text'],
+            'category': {'id': session.category_id, 'name': categories.get(session.category_id)},
+            'difficulty': {'id': difficulty[0], 'name': difficulty[1], 'level': difficulty[2]},
+            'answers': [{'id': a_id, 'text': a_text} for a_id, a_text in question['answers']]
+        }
+
+    async def handle_answer(self, request):
+        player_id, _ = await self.authenticate(request)
+        session = self.get_session(request['params'][0], player_id)
+        data = self.parse_json(request, 'questionId')
+        question_id = self.parse_int(data, 'questionId')
+        selected_id = data.get('selectedAnswerId')  # None = Zeitüberschreitung
+
+        # Kein Worker-Thread nötig: das Journal bündelt Antworten aller Spiele
+        # und liefert den neuen Punktestand gleich mit (UPDATE ... RETURNING)
+        result = await asyncio.wrap_future(
+            self.engine.submit_answer(session, player_id, question_id, selected_id)
+        )
+        if result['done']:
+            await self.finish_session(session)
+
+        return 200, {
+            'correct': result['correct'],
+            'correctAnswerId': result['correct_id'],
+            'newScore': result['score']
+        }
+
+    async def handle_status(self, request):
+        await self.authenticate(request)
+        game_id = request['params'][0]
+        try:
+            # Laufendes Spiel: Punktestände aus dem Speicher der Engine
+            session = self.engine.get(game_id)
+        except DuelError:
+            pass
+        else:
+            return 200, {
+                'isFinished': False,
+                'scores': [{'username': name, 'score': score} for name, score in session.score_list()]
+            }
+        finished = await self.run_db(self.db.is_game_finished, game_id)
+        if finished is None:
+            raise HttpError(404, "Spiel nicht gefunden")
+        scores = await self.run_db(self.db.get_game_scores, game_id)
+        return 200, {
+            'isFinished': finished,
+            'scores': [{'username': name, 'score': score} for name, score in scores]
+        }
+
+    async def handle_statistics(self, request):
+        await self.authenticate(request)
+        stats = await self.run_db(self.db.get_user_statistics, request['params'][0])
+        return 200, {
+            'gamesPlayed': stats['games_played'],
+            'duelsWon': stats['duels_won'],
+            'correctAnswersPercentage': round(stats['percentage'], 2)
+        }
+
+    # --- Start/Stop ---
+
+    async def start(self, host, port):
+        return await asyncio.start_server(self.handle_client, host, port, backlog=1024)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.db.close()
+
+
+async def serve(host, port, db_path, workers, hash_workers=None, snapshot=False):
+    db = QuizDatabase(db_path, PasswordHasher(workers=hash_workers), snapshot=snapshot)
+    server = QuizServer(db, max_workers=workers)
+    tcp_server = await server.start(host, port)
+    print(f"Quiz API läuft auf http://{host}:{port}")
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        server.close()
+
+
+def main():
+    """Hauptfunktion"""
+    default_db = os.path.join(os.path.dirname(__file__), "../database/quiz_app.db")
+
+    parser = argparse.ArgumentParser(description="Quiz App REST-Server")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--db', default=default_db, help="Pfad zur SQLite-Datenbank")
+    parser.add_argument('--workers', type=int, default=8, help="Threads für Datenbankzugriffe")
+    parser.add_argument('--hash-workers', type=int, help="Prozesse für Passwort-Hashes (Standard: Anzahl Kerne)")
+    parser.add_argument('--snapshot', action='store_true', help="Fragen und Antworten per mmap aus der Bank-Datei (neben der DB) bedienen")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.db, args.workers, args.hash_workers, args.snapshot))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
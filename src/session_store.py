@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Session-Cache für X-Session-Key
+Hält aktive Sessions im Speicher vor Spieler.SessionKey/SessionTime: eine
+Prüfung ist ein Dict-Zugriff. Jede Anfrage verlängert die Session (gleitender
+Ablauf), die neue SessionTime schreibt ein Hintergrund-Thread gebündelt zurück
+und entfernt dabei abgelaufene Sessions aus Cache und Datenbank.
+"""
+
+import logging
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+
+SESSION_TTL_SEC = 30 * 60  # Session läuft nach so langer Inaktivität ab
+MAX_SESSIONS = 100000      # Größe des Caches (älteste fallen heraus, gelten in der DB weiter)
+WRITE_BACK_SEC = 10        # Abstand zwischen zwei Schreib-/Aufräumläufen
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """Aktive Sessions: SessionKey -> [SpielerID, Username, letzte Aktivität]
+
+    Die OrderedDict ist nach letzter Aktivität sortiert, abgelaufene Sessions
+    stehen daher immer vorne und werden ohne Durchsuchen entfernt. Nach einem
+    Neustart (oder wenn eine Session aus dem Cache gefallen ist) wird ein
+    unbekannter Key einmal in Spieler nachgeschlagen und danach wieder aus
+    dem Speicher bedient. Je Spieler gilt nur der zuletzt vergebene Key, wie
+    in der Spalte Spieler.SessionKey.
+    """
+
+    def __init__(self, pool, ttl_sec=SESSION_TTL_SEC, max_sessions=MAX_SESSIONS, write_back_sec=WRITE_BACK_SEC):
+        self.pool = pool
+        self.ttl = ttl_sec
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._by_player = {}
+        # Noch nicht geschriebene Aktivität: SessionKey -> Zeitpunkt
+        self._dirty = {}
+        self.hits = 0
+        self.loads = 0
+        self.expired = 0
+        self.writes = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(write_back_sec,), name="quiz-sessions", daemon=True)
+        self._thread.start()
+
+    def create(self, player_id, username):
+        """Vergibt einen neuen Session Key (ersetzt den bisherigen des Spielers)
+
+        Liefert (session_key, session_time). Der Key wird sofort gespeichert,
+        damit er auch nach einem Neustart gilt.
+        """
+        session_key = secrets.token_hex(32)
+        now = time.time()
+        session_time = datetime.fromtimestamp(now)
+        with self.pool.connection() as db:
+            db.cursor.execute(
+                "UPDATE Spieler SET SessionKey=?, SessionTime=? WHERE SpielerID=?",
+                (session_key, session_time, player_id)
+            )
+        with self._lock:
+            self._add(session_key, player_id, username, now)
+        return session_key, session_time
+
+    def get(self, session_key):
+        """(SpielerID, Username) aus dem Cache, sonst None - ohne Datenbankzugriff
+
+        Ein Treffer verlängert die Session.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.get(session_key)
+            if entry is None:
+                return None
+            if entry[2] < now - self.ttl:
+                self._remove(session_key)
+                return None
+            entry[2] = now
+            self._sessions.move_to_end(session_key)
+            self._dirty[session_key] = now
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def validate(self, session_key):
+        """Wie get(), schlägt unbekannte Keys aber in Spieler nach (None wenn ungültig)"""
+        player = self.get(session_key)
+        if player is not None or not session_key:
+            return player
+
+        now = time.time()
+        with self.pool.connection() as db:
+            row = db.cursor.execute(
+                "SELECT SpielerID, Username, SessionTime FROM Spieler WHERE SessionKey=?",
+                (session_key,)
+            ).fetchone()
+        if not row or self._timestamp(row[2]) < now - self.ttl:
+            return None
+        with self._lock:
+            self._add(session_key, row[0], row[1], now)
+            self._dirty[session_key] = now
+            self.loads += 1
+        return row[0], row[1]
+
+    def flush(self):
+        """Schreibt die letzte Aktivität aller benutzten Sessions als SessionTime"""
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+        try:
+            with self.pool.connection() as db:
+                db.cursor.executemany(
+                    "UPDATE Spieler SET SessionTime=? WHERE SessionKey=?",
+                    [(datetime.fromtimestamp(seen), session_key) for session_key, seen in dirty.items()]
+                )
+        except Exception:
+            # Nicht geschriebene Aktivität beim nächsten Lauf erneut versuchen
+            with self._lock:
+                for session_key, seen in dirty.items():
+                    self._dirty.setdefault(session_key, seen)
+            raise
+        with self._lock:
+            self.writes += len(dirty)
+        return len(dirty)
+
+    def expire(self):
+        """Entfernt alle abgelaufenen Sessions aus Cache und Datenbank (Anzahl im Cache)
+
+        Vorher flush() aufrufen, sonst gelten in der Datenbank noch alte Zeiten.
+        """
+        limit = time.time() - self.ttl
+        removed = 0
+        with self._lock:
+            while self._sessions:
+                session_key, entry = next(iter(self._sessions.items()))
+                if entry[2] >= limit:
+                    break
+                self._remove(session_key)
+                removed += 1
+            self.expired += removed
+        with self.pool.connection() as db:
+            db.cursor.execute(
+                "UPDATE Spieler SET SessionKey=NULL WHERE SessionKey IS NOT NULL AND SessionTime < ?",
+                (datetime.fromtimestamp(limit),)
+            )
+        return removed
+
+    def close(self):
+        """Beendet den Hintergrund-Thread und schreibt ausstehende Aktivität"""
+        if not self._stop.is_set():
+            self._stop.set()
+            self._thread.join()
+            self.flush()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'hits': self.hits,
+                'loads': self.loads,
+                'expired': self.expired,
+                'writes': self.writes,
+            }
+
+    # --- intern (Lock muss gehalten werden) ---
+
+    def _add(self, session_key, player_id, username, now):
+        old_key = self._by_player.get(player_id)
+        if old_key is not None and old_key != session_key:
+            self._remove(old_key)
+        self._sessions[session_key] = [player_id, username, now]
+        self._sessions.move_to_end(session_key)
+        self._by_player[player_id] = session_key
+        while len(self._sessions) > self.max_sessions:
+            # Ausstehende Aktivität bleibt in _dirty und wird trotzdem geschrieben
+            oldest, entry = self._sessions.popitem(last=False)
+            if self._by_player.get(entry[0]) == oldest:
+                del self._by_player[entry[0]]
+
+    def _remove(self, session_key):
+        entry = self._sessions.pop(session_key, None)
+        self._dirty.pop(session_key, None)
+        if entry is not None and self._by_player.get(entry[0]) == session_key:
+            del self._by_player[entry[0]]
+
+    @staticmethod
+    def _timestamp(value):
+        """SessionTime aus der Datenbank als Unix-Zeit (0 wenn unlesbar)"""
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except ValueError:
+            return 0.0
+
+    def _run(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.flush()
+                self.expire()
+            except Exception:
+                # Nächster Lauf versucht es erneut, Sessions im Speicher gelten weiter
+                logger.exception("Session-Cache: Schreiben fehlgeschlagen")
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Gemeinsame pytest-Einstellungen: Module aus src/ importierbar machen"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+"""
+Abfragepläne aller Produktionsabfragen (siehe src/check_query_plans.py)
+Jede Abfrage ist ein eigener Testfall; Komplettlesungen sind nur für die
+genau aufgeführten Anweisungen in KNOWN_FULL_SCANS erlaubt.
+"""
+
+import os
+import sqlite3
+import tempfile
+
+import pytest
+
+import check_query_plans as plans
+
+
+_tmp_dir = tempfile.TemporaryDirectory()
+DB_PATH = os.path.join(_tmp_dir.name, "plan_check.db")
+plans.create_database(DB_PATH)
+QUERIES = plans.collect_queries(DB_PATH)
+
+
+@pytest.fixture(scope="module")
+def conn():
+    conn = sqlite3.connect(DB_PATH)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize("label, sql, params", QUERIES, ids=[q[0] for q in QUERIES])
+def test_no_unexpected_full_scan(conn, label, sql, params):
+    assert plans.plan_failure(conn, sql, params) is None
+
+
+def test_triggers_are_checked():
+    assert any(label.startswith("trigger ") for label, _, _ in QUERIES)
+
+
+def test_known_full_scans_are_used(conn):
+    # Jeder Eintrag muss genau eine vorkommende Anweisung mit Scan beschreiben
+    scanning = {
+        plans.normalize(sql) for _, sql, params in QUERIES
+        if plans.full_scans(conn, sql, params)
+    }
+    assert set(plans.KNOWN_FULL_SCANS) <= scanning
+
+
+def test_normalize_replaces_literals():
+    assert plans.normalize("SELECT *\n  FROM RanglisteTag WHERE Tag >= '2024-01-01' LIMIT 10") == \
+        "SELECT * FROM RanglisteTag WHERE Tag >= ? LIMIT ?"
+
+
+def test_foreign_keys_indexed(conn):
+    assert plans.unindexed_foreign_keys(conn) == []